@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analytics.models import AlertStats
+
+
+class Command(BaseCommand):
+    help = "Refresh the mv_alert_stats materialized view (schedule every few minutes)"
+
+    def handle(self, *args, **options):
+        AlertStats.refresh()
+        self.stdout.write(self.style.SUCCESS("Refreshed mv_alert_stats"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE MATERIALIZED VIEW mv_alert_stats AS
+                SELECT date_trunc('hour', created_at) AS hour,
+                       alert_type,
+                       severity,
+                       status,
+                       COUNT(*) AS alert_count
+                FROM alerts
+                GROUP BY 1, 2, 3, 4;
+                CREATE UNIQUE INDEX mv_alert_stats_key
+                    ON mv_alert_stats (hour, alert_type, severity, status);
+            """,
+            reverse_sql='DROP MATERIALIZED VIEW IF EXISTS mv_alert_stats;',
+        ),
+        migrations.CreateModel(
+            name='AlertStats',
+            fields=[
+                ('pk', models.CompositePrimaryKey('hour', 'alert_type', 'severity', 'status', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('hour', models.DateTimeField()),
+                ('alert_type', models.CharField(choices=[('inventory', 'Inventory'), ('anomaly', 'Anomaly'), ('security', 'Security'), ('performance', 'Performance'), ('data_quality', 'Data Quality')], max_length=20)),
+                ('severity', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=10)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('acknowledged', 'Acknowledged'), ('resolved', 'Resolved'), ('ignored', 'Ignored')], max_length=15)),
+                ('alert_count', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'mv_alert_stats',
+                'ordering': ['-hour'],
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:32
+
+import django.contrib.postgres.indexes
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_alert_stats_view'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['metadata'], name='alert_metadata_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('item_id', 'metadata'), name='alert_metadata_item_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anomalydetection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['details'], name='anomaly_details_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['new_values'], name='audit_new_values_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
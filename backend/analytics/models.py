@@ -1,6 +1,9 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connection, models
+from django.db.models.fields.json import KeyTextTransform
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
+import uuid
 
 
 class Alert(models.Model):
@@ -45,12 +48,59 @@ class Alert(models.Model):
 
     class Meta:
         db_table = 'alerts'
+        indexes = [
+            GinIndex(fields=['metadata'], opclasses=['jsonb_path_ops'], name='alert_metadata_gin'),
+            models.Index(KeyTextTransform('item_id', 'metadata'), name='alert_metadata_item_id_idx'),
+        ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.alert_id} - {self.title} [{self.severity}]"
 
 
+class AlertStats(models.Model):
+    """
+    Hourly alert counts backed by the mv_alert_stats materialized view.
+    Dashboard queries should read from here instead of aggregating Alert.
+    """
+    pk = models.CompositePrimaryKey('hour', 'alert_type', 'severity', 'status')
+    hour = models.DateTimeField()
+    alert_type = models.CharField(max_length=20, choices=Alert.TYPE_CHOICES)
+    severity = models.CharField(max_length=10, choices=Alert.SEVERITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Alert.STATUS_CHOICES)
+    alert_count = models.PositiveIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'mv_alert_stats'
+        ordering = ['-hour']
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.alert_type}/{self.severity}/{self.status}: {self.alert_count}"
+
+    @classmethod
+    def refresh(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}')
+
+
+_RISK_LEVELS = ('low', 'low', 'medium', 'high', 'critical')
+
+
+class AnomalyDetectionQuerySet(models.QuerySet):
+    def with_risk_level(self):
+        """Annotate each detection with its risk level computed in SQL"""
+        return self.annotate(
+            annotated_risk_level=models.Case(
+                models.When(anomaly_score__gte=80, then=models.Value('critical')),
+                models.When(anomaly_score__gte=60, then=models.Value('high')),
+                models.When(anomaly_score__gte=40, then=models.Value('medium')),
+                default=models.Value('low'),
+                output_field=models.CharField()
+            )
+        )
+
+
 class AnomalyDetection(models.Model):
     ANOMALY_TYPE_CHOICES = [
         ('volume', 'Volume-based'),
@@ -74,8 +124,13 @@ class AnomalyDetection(models.Model):
     is_confirmed = models.BooleanField(default=False)
     detected_at = models.DateTimeField(auto_now_add=True)
     
+    objects = AnomalyDetectionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'anomaly_detections'
+        indexes = [
+            GinIndex(fields=['details'], opclasses=['jsonb_path_ops'], name='anomaly_details_gin'),
+        ]
         ordering = ['-detected_at']
 
     def __str__(self):
@@ -83,14 +138,12 @@ class AnomalyDetection(models.Model):
 
     @property
     def risk_level(self):
-        if self.anomaly_score >= 80:
-            return 'critical'
-        elif self.anomaly_score >= 60:
-            return 'high'
-        elif self.anomaly_score >= 40:
-            return 'medium'
-        else:
-            return 'low'
+        # Prefer the level annotated by AnomalyDetectionQuerySet.with_risk_level()
+        if hasattr(self, 'annotated_risk_level'):
+            return self.annotated_risk_level
+        
+        # Scores are bucketed in steps of 20: 0-39 low, 40-59 medium, 60-79 high, 80+ critical
+        return _RISK_LEVELS[min(int(self.anomaly_score) // 20, 4)]
 
 
 class Metric(models.Model):
@@ -182,6 +235,78 @@ class PerformanceReport(models.Model):
     def __str__(self):
         return f"{self.report_type.title()} Report {self.report_id}"
 
+    @classmethod
+    def generate(cls, report_type, period_start, period_end, generated_by='system'):
+        """
+        Build (or rebuild) the report for a period. Each source table is scanned
+        once with conditional aggregates (COUNT(*) FILTER (WHERE ...) on PostgreSQL).
+        """
+        from inventory.models import InventoryMovement
+        from orders.models import Order
+        from shipments.models import Shipment
+
+        Count, Q = models.Count, models.Q
+        in_period = Q(timestamp__gte=period_start, timestamp__lt=period_end)
+
+        movement_stats = InventoryMovement.objects.filter(in_period).aggregate(
+            total_transactions=Count('id'),
+            stock_in_count=Count('id', filter=Q(action='stock_in')),
+            stock_out_count=Count('id', filter=Q(action='stock_out')),
+            adjustment_count=Count('id', filter=Q(action='adjustment')),
+            transfer_count=Count('id', filter=Q(action='transfer')),
+        )
+
+        order_stats = Order.objects.filter(created_at__gte=period_start, created_at__lt=period_end).aggregate(
+            orders_created=Count('id'),
+            orders_completed=Count('id', filter=Q(status='delivered')),
+            orders_cancelled=Count('id', filter=Q(status='cancelled')),
+            average_order_value=models.Avg('total_value'),
+        )
+
+        shipment_stats = Shipment.objects.filter(created_at__gte=period_start, created_at__lt=period_end).aggregate(
+            shipments_created=Count('id'),
+            shipments_delivered=Count('id', filter=Q(status=Shipment.Status.DELIVERED)),
+            average_delivery=models.Avg(
+                models.F('actual_delivery_date') - models.F('shipped_date'),
+                filter=Q(shipped_date__isnull=False, actual_delivery_date__isnull=False),
+            ),
+        )
+
+        anomaly_stats = AnomalyDetection.objects.filter(
+            detected_at__gte=period_start, detected_at__lt=period_end
+        ).aggregate(
+            anomalies_detected=Count('id'),
+            critical_anomalies=Count('id', filter=Q(anomaly_score__gte=80)),
+        )
+
+        average_delivery = shipment_stats.pop('average_delivery')
+        average_delivery_days = (
+            Decimal(average_delivery.total_seconds() / 86400).quantize(Decimal('0.01'))
+            if average_delivery else Decimal('0.00')
+        )
+        average_order_value = order_stats.pop('average_order_value') or Decimal('0.00')
+
+        defaults = {
+            **movement_stats,
+            **order_stats,
+            **shipment_stats,
+            **anomaly_stats,
+            'average_order_value': Decimal(average_order_value).quantize(Decimal('0.01')),
+            'average_delivery_days': average_delivery_days,
+            'generated_by': generated_by,
+        }
+        report, _ = cls.objects.update_or_create(
+            report_type=report_type,
+            period_start=period_start,
+            period_end=period_end,
+            defaults=defaults,
+            create_defaults={
+                **defaults,
+                'report_id': f"RPT-{period_start:%Y%m%d}-{str(uuid.uuid4())[:8].upper()}",
+            },
+        )
+        return report
+
     @property
     def order_completion_rate(self):
         if self.orders_created == 0:
@@ -223,6 +348,7 @@ class AuditLog(models.Model):
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['entity_type', 'timestamp']),
             models.Index(fields=['action', 'timestamp']),
+            GinIndex(fields=['new_values'], opclasses=['jsonb_path_ops'], name='audit_new_values_gin'),
         ]
         ordering = ['-timestamp']
 
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:22
+
+from django.db import migrations, models
+
+
+def populate_total_stock(apps, schema_editor):
+    Item = apps.get_model('inventory', 'Item')
+    StockLevel = apps.get_model('inventory', 'StockLevel')
+
+    totals = StockLevel.objects.values('item').annotate(total=models.Sum('quantity'))
+    for row in totals:
+        Item.objects.filter(pk=row['item']).update(total_stock=max(row['total'] or 0, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='total_stock',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Sum of stock level quantities, maintained by InventoryService'),
+        ),
+        migrations.RunPython(populate_total_stock, migrations.RunPython.noop),
+    ]
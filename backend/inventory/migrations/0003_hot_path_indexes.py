@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_item_total_stock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['item', 'timestamp'], name='inventory_m_item_id_50d426_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['location', 'timestamp'], name='inventory_m_locatio_104951_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['action', 'timestamp'], name='inventory_m_action_b112ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['is_active', 'reorder_point'], name='items_is_acti_8bee21_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocklevel',
+            index=models.Index(fields=['item', 'location'], include=('quantity',), name='stock_levels_item_loc_qty_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['-timestamp', '-id'], name='inv_movements_keyset_idx'),
+        ),
+    ]
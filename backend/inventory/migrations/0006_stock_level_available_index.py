@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_movement_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stocklevel',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['item', '-quantity'], name='stock_levels_item_avail_idx'),
+        ),
+    ]
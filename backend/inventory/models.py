@@ -1,4 +1,6 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connections, models
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
@@ -13,6 +15,10 @@ class Supplier(models.Model):
 
     class Meta:
         db_table = 'suppliers'
+        indexes = [
+            # The country filter is a case-insensitive substring match, which needs trigrams
+            GinIndex(fields=['country'], opclasses=['gin_trgm_ops'], name='suppliers_country_trgm'),
+        ]
 
     def __str__(self):
         return self.name
@@ -65,6 +71,13 @@ class Location(models.Model):
     
     class Meta:
         db_table = 'locations'
+        indexes = [
+            models.Index(fields=['zone', 'code'], condition=models.Q(is_active=True), name='locations_active_zone_idx'),
+            models.Index(
+                fields=['location_type', 'zone', 'code'], condition=models.Q(is_active=True),
+                name='locations_active_type_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.code} ({self.zone})"
@@ -88,22 +101,25 @@ class Item(models.Model):
     is_high_value = models.BooleanField(default=False)
     reorder_point = models.PositiveIntegerField(default=0)
     max_stock_level = models.PositiveIntegerField(default=1000)
+    total_stock = models.PositiveIntegerField(default=0, db_index=True, editable=False,
+                                              help_text="Sum of stock level quantities, maintained by InventoryService")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         db_table = 'items'
+        indexes = [
+            models.Index(fields=['is_active', 'reorder_point']),
+            models.Index(fields=['category', 'name'], condition=models.Q(is_active=True), name='items_active_category_idx'),
+            models.Index(
+                fields=['name'], condition=models.Q(is_active=True, is_perishable=True), name='items_active_perishable_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.item_id} - {self.name}"
 
-    @property
-    def total_stock(self):
-        return self.stock_levels.aggregate(
-            total=models.Sum('quantity')
-        )['total'] or 0
-
     @property
     def needs_reorder(self):
         return self.total_stock <= self.reorder_point
@@ -118,11 +134,75 @@ class StockLevel(models.Model):
     class Meta:
         db_table = 'stock_levels'
         unique_together = ['item', 'location']
+        indexes = [
+            models.Index(fields=['item', 'location'], include=['quantity'], name='stock_levels_item_loc_qty_idx'),
+            # Picking allocation scans only locations that still hold stock
+            models.Index(
+                fields=['item', '-quantity'], name='stock_levels_item_avail_idx', condition=models.Q(quantity__gt=0)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.item.item_id} @ {self.location.code}: {self.quantity}"
 
 
+class InventoryMovementQuerySet(models.QuerySet):
+    RAW_INSERT_FIELDS = (
+        'item_id', 'location_id', 'action', 'quantity', 'previous_quantity', 'new_quantity',
+        'reference_id', 'notes', 'user', 'session_id', 'is_business_hours', 'shift', 'timestamp',
+    )
+    
+    def raw_bulk_insert(self, movements, page_size=500):
+        """
+        Insert unsaved movements with one multi-row INSERT per page, skipping
+        the ORM insert path. The statements still go through Django's cursor
+        wrapper, so they are logged and counted like any other query. Falls
+        back to bulk_create on other database backends.
+        """
+        connection = connections[self.db]
+        if connection.vendor != 'postgresql':
+            return self.bulk_create(movements, batch_size=page_size)
+        
+        timestamp = timezone.now()
+        for movement in movements:
+            movement.timestamp = timestamp
+        
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(field) for field in self.RAW_INSERT_FIELDS)
+        sql = f"INSERT INTO {quote_name(self.model._meta.db_table)} ({columns}) VALUES "
+        placeholders = f"({', '.join(['%s'] * len(self.RAW_INSERT_FIELDS))})"
+        
+        ids = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(movements), page_size):
+                page = movements[start:start + page_size]
+                params = [getattr(movement, field) for movement in page for field in self.RAW_INSERT_FIELDS]
+                cursor.execute(f"{sql}{', '.join([placeholders] * len(page))} RETURNING id", params)
+                ids.extend(cursor.fetchall())
+        
+        for movement, (pk,) in zip(movements, ids):
+            movement.pk = pk
+            movement._state.adding = False
+            movement._state.db = self.db
+        
+        return movements
+    
+    def with_risk_score(self):
+        """Annotate each movement with its risk score computed in SQL"""
+        return self.annotate(
+            risk_score=models.ExpressionWrapper(
+                models.Case(models.When(item__is_high_value=True, then=models.Value(3)), default=models.Value(0))
+                + models.Case(
+                    models.When(models.Q(quantity__gte=100) | models.Q(quantity__lte=-100), then=models.Value(2)),
+                    default=models.Value(0)
+                )
+                + models.Case(models.When(is_business_hours=False, then=models.Value(1)), default=models.Value(0))
+                + models.Case(models.When(item__is_perishable=True, then=models.Value(1)), default=models.Value(0)),
+                output_field=models.IntegerField()
+            )
+        )
+
+
 class InventoryMovement(models.Model):
     ACTION_CHOICES = [
         ('stock_in', 'Stock In'),
@@ -131,6 +211,9 @@ class InventoryMovement(models.Model):
         ('transfer', 'Transfer'),
     ]
     
+    # Movements scoring at least this much are flagged as high risk
+    HIGH_RISK_SCORE = 4
+    
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='movements')
     location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='movements')
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
@@ -145,8 +228,16 @@ class InventoryMovement(models.Model):
     is_business_hours = models.BooleanField(default=True)
     shift = models.CharField(max_length=20, blank=True)
 
+    objects = InventoryMovementQuerySet.as_manager()
+
     class Meta:
         db_table = 'inventory_movements'
+        indexes = [
+            models.Index(fields=['item', 'timestamp']),
+            models.Index(fields=['location', 'timestamp']),
+            models.Index(fields=['action', 'timestamp']),
+            models.Index(fields=['-timestamp', '-id'], name='inv_movements_keyset_idx'),
+        ]
         ordering = ['-timestamp']
 
     def __str__(self):
@@ -154,15 +245,14 @@ class InventoryMovement(models.Model):
 
     @property
     def is_high_risk(self):
-        risk_score = 0
+        # Prefer the score annotated by InventoryMovementQuerySet.with_risk_score()
+        if hasattr(self, 'risk_score'):
+            return self.risk_score >= self.HIGH_RISK_SCORE
         
-        if self.item.is_high_value:
-            risk_score += 3
-        if abs(self.quantity) >= 100:
-            risk_score += 2
-        if not self.is_business_hours:
-            risk_score += 1
-        if self.item.is_perishable:
-            risk_score += 1
-            
-        return risk_score >= 4
+        risk_score = (
+            3 * self.item.is_high_value
+            + 2 * (abs(self.quantity) >= 100)
+            + (not self.is_business_hours)
+            + self.item.is_perishable
+        )
+        return risk_score >= self.HIGH_RISK_SCORE
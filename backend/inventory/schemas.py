@@ -0,0 +1,52 @@
+"""
+Request schemas for the single stock movement endpoints.
+
+JSON bodies are decoded and validated with msgspec straight from the request
+body, which is much cheaper than running a DRF serializer on the write hot
+path. Errors are reported in the same {field: [messages]} shape.
+"""
+import re
+
+import msgspec
+from rest_framework.settings import api_settings
+
+
+class StockMovementIn(msgspec.Struct, kw_only=True):
+    item_id: str
+    location_id: int
+    quantity: int
+    reference_id: str | None = ''
+    notes: str | None = ''
+    
+    def __post_init__(self):
+        # Null text fields are stored blank
+        self.reference_id = self.reference_id or ''
+        self.notes = self.notes or ''
+
+
+class StockTransferIn(StockMovementIn, kw_only=True):
+    destination_location_id: int
+
+
+_MISSING_FIELD = re.compile(r"^Object missing required field `(?P<field>\w+)`")
+_FIELD_ERROR = re.compile(r"^(?P<message>.*) - at `\$\.(?P<field>\w+)`$")
+
+
+def decode(body, schema):
+    """Decode a JSON request body into the given schema, coercing numeric strings"""
+    data = msgspec.json.decode(body, type=schema, strict=False)
+    if data.quantity == 0:
+        raise msgspec.ValidationError("Quantity cannot be zero - at `$.quantity`")
+    return data
+
+
+def field_errors(error):
+    """Map a msgspec.ValidationError to the error dict a DRF serializer would return"""
+    message = str(error)
+    match = _MISSING_FIELD.match(message)
+    if match:
+        return {match['field']: ['This field is required.']}
+    match = _FIELD_ERROR.match(message)
+    if match:
+        return {match['field']: [match['message']]}
+    return {api_settings.NON_FIELD_ERRORS_KEY: [message]}
@@ -1,52 +1,109 @@
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
 from rest_framework import serializers
+from warehouse.serializers import CachedFieldsMixin
 from .models import Supplier, Category, Location, Item, StockLevel, InventoryMovement
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Supplier
-        fields = '__all__'
+        fields = ('id', 'name', 'contact_info', 'country', 'created_at', 'updated_at', 'is_active')
         read_only_fields = ('created_at', 'updated_at')
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = '__all__'
+        fields = ('id', 'name', 'description')
 
 
-class LocationSerializer(serializers.ModelSerializer):
+class LocationSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     utilization_percentage = serializers.ReadOnlyField()
     
     class Meta:
         model = Location
-        fields = '__all__'
+        fields = (
+            'id', 'utilization_percentage', 'code', 'zone', 'location_type', 'capacity', 'current_utilization',
+            'temperature_controlled', 'automated', 'is_active',
+        )
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
-    total_stock = serializers.ReadOnlyField()
     needs_reorder = serializers.ReadOnlyField()
     
     class Meta:
         model = Item
-        fields = '__all__'
+        fields = (
+            'id', 'category_name', 'supplier_name', 'needs_reorder', 'item_id', 'name', 'unit_cost', 'weight',
+            'dimensions', 'is_perishable', 'is_high_value', 'reorder_point', 'max_stock_level', 'total_stock',
+            'created_at', 'updated_at', 'is_active', 'category', 'supplier',
+        )
         read_only_fields = ('created_at', 'updated_at')
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load the related names used by the serializer in bulk"""
+        return queryset.select_related('category', 'supplier').only(
+            'id', 'item_id', 'name', 'category__name', 'supplier__name', 'unit_cost', 'weight', 'dimensions',
+            'is_perishable', 'is_high_value', 'reorder_point', 'max_stock_level', 'total_stock',
+            'created_at', 'updated_at', 'is_active',
+        )
 
 
-class StockLevelSerializer(serializers.ModelSerializer):
+class ItemListSerializer(serializers.Serializer):
+    """
+    Compact item representation for list endpoints.
+    Serializes the dict rows produced by setup_eager_loading, so no Item,
+    Category or Supplier instances are built for the list.
+    """
+    id = serializers.IntegerField(read_only=True)
+    item_id = serializers.CharField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    category = serializers.IntegerField(read_only=True)
+    category_name = serializers.CharField(read_only=True)
+    supplier = serializers.IntegerField(read_only=True)
+    supplier_name = serializers.CharField(read_only=True)
+    unit_cost = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    is_perishable = serializers.BooleanField(read_only=True)
+    is_high_value = serializers.BooleanField(read_only=True)
+    reorder_point = serializers.IntegerField(read_only=True)
+    total_stock = serializers.IntegerField(read_only=True)
+    needs_reorder = serializers.BooleanField(read_only=True)
+    is_active = serializers.BooleanField(read_only=True)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Select the list columns as plain dicts, joining category and supplier names in SQL"""
+        return queryset.values(
+            'id', 'item_id', 'name', 'category', 'supplier', 'unit_cost', 'is_perishable',
+            'is_high_value', 'reorder_point', 'total_stock', 'is_active',
+            category_name=F('category__name'),
+            supplier_name=F('supplier__name'),
+            needs_reorder=ExpressionWrapper(Q(total_stock__lte=F('reorder_point')), output_field=BooleanField()),
+        )
+
+
+class StockLevelSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_id_display = serializers.CharField(source='item.item_id', read_only=True)
     location_code = serializers.CharField(source='location.code', read_only=True)
     
     class Meta:
         model = StockLevel
-        fields = '__all__'
+        fields = ('id', 'item_name', 'item_id_display', 'location_code', 'quantity', 'last_updated', 'item', 'location')
         read_only_fields = ('last_updated',)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join only the item and location columns used by the serializer"""
+        return queryset.select_related('item', 'location').only(
+            'id', 'quantity', 'last_updated', 'item__name', 'item__item_id', 'location__code'
+        )
 
 
-class InventoryMovementSerializer(serializers.ModelSerializer):
+class InventoryMovementSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_id_display = serializers.CharField(source='item.item_id', read_only=True)
     location_code = serializers.CharField(source='location.code', read_only=True)
@@ -54,8 +111,34 @@ class InventoryMovementSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = InventoryMovement
-        fields = '__all__'
+        fields = (
+            'id', 'item_name', 'item_id_display', 'location_code', 'is_high_risk', 'action', 'quantity',
+            'previous_quantity', 'new_quantity', 'reference_id', 'notes', 'user', 'session_id', 'timestamp',
+            'is_business_hours', 'shift', 'item', 'location',
+        )
         read_only_fields = ('timestamp',)
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load related objects and the risk score used by the serializer in bulk"""
+        return queryset.select_related('item', 'location').only(
+            'id', 'action', 'quantity', 'previous_quantity', 'new_quantity', 'reference_id', 'notes', 'user',
+            'session_id', 'timestamp', 'is_business_hours', 'shift', 'item__name', 'item__item_id', 'location__code'
+        ).with_risk_score()
+
+
+class InventoryMovementListSerializer(InventoryMovementSerializer):
+    """
+    Movement representation for list endpoints, without free-text columns
+    """
+    class Meta(InventoryMovementSerializer.Meta):
+        fields = None
+        exclude = ('notes', 'session_id')
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Skip loading the columns the list representation leaves out"""
+        return super().setup_eager_loading(queryset).defer('notes', 'session_id')
 
 
 class StockMovementSerializer(serializers.Serializer):
@@ -103,4 +186,27 @@ class BulkStockMovementSerializer(serializers.Serializer):
             raise serializers.ValidationError("At least one movement is required")
         if len(value) > 100:
             raise serializers.ValidationError("Maximum 100 movements allowed per bulk operation")
+        
+        # Resolve every referenced item and location with one IN query each
+        item_ids = {movement['item_id'] for movement in value}
+        location_ids = {movement['location_id'] for movement in value}
+        location_ids.update(
+            movement['destination_location_id'] for movement in value if movement.get('destination_location_id')
+        )
+        
+        items = Item.objects.filter(is_active=True).in_bulk(item_ids, field_name='item_id')
+        locations = Location.objects.filter(is_active=True).in_bulk(location_ids)
+        
+        errors = []
+        missing_items = sorted(item_ids - items.keys())
+        if missing_items:
+            errors.append(f"Items not found: {', '.join(missing_items)}")
+        missing_locations = sorted(location_ids - locations.keys())
+        if missing_locations:
+            errors.append(f"Locations not found: {', '.join(map(str, missing_locations))}")
+        if errors:
+            raise serializers.ValidationError(errors)
+        
+        self.context['items'] = items
+        self.context['locations'] = locations
         return value
\ No newline at end of file
@@ -1,11 +1,24 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, NamedTuple, Optional
 
 from .models import Item, Location, StockLevel, InventoryMovement
 
 
+# Work shift by hour of day: night 22-6, morning 6-14, afternoon 14-22
+_SHIFT_BY_HOUR = ('night',) * 6 + ('morning',) * 8 + ('afternoon',) * 8 + ('night',) * 2
+
+
+class TimeContext(NamedTuple):
+    is_business_hours: bool
+    shift: str
+
+
 class InventoryService:
     """
     Service class for inventory operations with business logic and validation
@@ -14,35 +27,33 @@ class InventoryService:
     @staticmethod
     @transaction.atomic
     def stock_in(item_id: str, location_id: int, quantity: int, 
-                 reference_id: str = '', notes: str = '', user: str = '') -> InventoryMovement:
+                 reference_id: str = '', notes: str = '', user: str = '',
+                 item: Optional[Item] = None, location: Optional[Location] = None) -> InventoryMovement:
         """
-        Stock in operation - adds items to inventory
+        Stock in operation - adds items to inventory.
+        Pass already loaded item/location objects to skip the lookups.
         """
         if quantity <= 0:
             raise ValueError("Quantity must be positive for stock in operations")
         
-        item = get_object_or_404(Item, item_id=item_id, is_active=True)
-        location = get_object_or_404(Location, id=location_id, is_active=True)
+        item = item or InventoryService._get_item(item_id)
+        location = location or InventoryService._get_location(location_id)
         
-        # Get or create stock level
-        stock_level, created = StockLevel.objects.get_or_create(
-            item=item,
-            location=location,
-            defaults={'quantity': 0}
-        )
+        # Get or create stock level (locked so previous/new quantities stay accurate)
+        stock_level = InventoryService._lock_stock_level(item, location)
         
         previous_quantity = stock_level.quantity
         new_quantity = previous_quantity + quantity
         
-        # Update stock level
-        stock_level.quantity = new_quantity
-        stock_level.save()
+        # Update stock level and location utilization
+        InventoryService._update_stock_level(stock_level, quantity)
+        InventoryService._update_utilization(location, quantity)
         
-        # Update location utilization
-        location.current_utilization += quantity
-        location.save()
+        # Update denormalized item total
+        InventoryService._update_total_stock(item, quantity)
         
         # Create movement record
+        time_context = InventoryService._compute_time_context()
         movement = InventoryMovement.objects.create(
             item=item,
             location=location,
@@ -53,8 +64,8 @@ class InventoryService:
             reference_id=reference_id,
             notes=notes,
             user=user,
-            is_business_hours=InventoryService._is_business_hours(),
-            shift=InventoryService._get_current_shift()
+            is_business_hours=time_context.is_business_hours,
+            shift=time_context.shift
         )
         
         return movement
@@ -62,19 +73,21 @@ class InventoryService:
     @staticmethod
     @transaction.atomic
     def stock_out(item_id: str, location_id: int, quantity: int,
-                  reference_id: str = '', notes: str = '', user: str = '') -> InventoryMovement:
+                  reference_id: str = '', notes: str = '', user: str = '',
+                  item: Optional[Item] = None, location: Optional[Location] = None) -> InventoryMovement:
         """
-        Stock out operation - removes items from inventory
+        Stock out operation - removes items from inventory.
+        Pass already loaded item/location objects to skip the lookups.
         """
         if quantity <= 0:
             raise ValueError("Quantity must be positive for stock out operations")
         
-        item = get_object_or_404(Item, item_id=item_id, is_active=True)
-        location = get_object_or_404(Location, id=location_id, is_active=True)
+        item = item or InventoryService._get_item(item_id)
+        location = location or InventoryService._get_location(location_id)
         
         # Get stock level
         try:
-            stock_level = StockLevel.objects.get(item=item, location=location)
+            stock_level = InventoryService._lock_stock_level(item, location, create=False)
         except StockLevel.DoesNotExist:
             raise ValueError(f"No stock available for item {item_id} at location {location.code}")
         
@@ -85,15 +98,15 @@ class InventoryService:
         if new_quantity < 0:
             raise ValueError(f"Insufficient stock. Available: {previous_quantity}, Requested: {quantity}")
         
-        # Update stock level
-        stock_level.quantity = new_quantity
-        stock_level.save()
+        # Update stock level and location utilization
+        InventoryService._update_stock_level(stock_level, -quantity)
+        InventoryService._update_utilization(location, -quantity)
         
-        # Update location utilization
-        location.current_utilization = max(0, location.current_utilization - quantity)
-        location.save()
+        # Update denormalized item total
+        InventoryService._update_total_stock(item, -quantity)
         
         # Create movement record (quantity is negative for stock out)
+        time_context = InventoryService._compute_time_context()
         movement = InventoryMovement.objects.create(
             item=item,
             location=location,
@@ -104,8 +117,8 @@ class InventoryService:
             reference_id=reference_id,
             notes=notes,
             user=user,
-            is_business_hours=InventoryService._is_business_hours(),
-            shift=InventoryService._get_current_shift()
+            is_business_hours=time_context.is_business_hours,
+            shift=time_context.shift
         )
         
         return movement
@@ -113,9 +126,12 @@ class InventoryService:
     @staticmethod
     @transaction.atomic
     def stock_transfer(item_id: str, from_location_id: int, to_location_id: int, quantity: int,
-                       reference_id: str = '', notes: str = '', user: str = '') -> List[InventoryMovement]:
+                       reference_id: str = '', notes: str = '', user: str = '',
+                       item: Optional[Item] = None, from_location: Optional[Location] = None,
+                       to_location: Optional[Location] = None) -> List[InventoryMovement]:
         """
-        Stock transfer operation - moves items between locations
+        Stock transfer operation - moves items between locations.
+        Pass already loaded item/location objects to skip the lookups.
         """
         if quantity <= 0:
             raise ValueError("Quantity must be positive for transfer operations")
@@ -123,61 +139,92 @@ class InventoryService:
         if from_location_id == to_location_id:
             raise ValueError("Source and destination locations cannot be the same")
         
-        item = get_object_or_404(Item, item_id=item_id, is_active=True)
-        from_location = get_object_or_404(Location, id=from_location_id, is_active=True)
-        to_location = get_object_or_404(Location, id=to_location_id, is_active=True)
+        item = item or InventoryService._get_item(item_id)
+        from_location = from_location or InventoryService._get_location(from_location_id)
+        to_location = to_location or InventoryService._get_location(to_location_id)
         
         # Check capacity at destination
         if to_location.current_utilization + quantity > to_location.capacity:
             raise ValueError(f"Destination location {to_location.code} does not have sufficient capacity")
         
-        # Stock out from source location
-        stock_out_movement = InventoryService.stock_out(
-            item_id=item_id,
-            location_id=from_location_id,
-            quantity=quantity,
-            reference_id=reference_id,
-            notes=f"Transfer to {to_location.code}. {notes}",
-            user=user
-        )
+        # Lock both stock levels so the movement records see consistent quantities
+        try:
+            from_stock_level = InventoryService._lock_stock_level(item, from_location, create=False)
+        except StockLevel.DoesNotExist:
+            raise ValueError(f"No stock available for item {item_id} at location {from_location.code}")
         
-        # Stock in to destination location
-        stock_in_movement = InventoryService.stock_in(
-            item_id=item_id,
-            location_id=to_location_id,
-            quantity=quantity,
-            reference_id=reference_id,
-            notes=f"Transfer from {from_location.code}. {notes}",
-            user=user
-        )
+        if from_stock_level.quantity < quantity:
+            raise ValueError(f"Insufficient stock. Available: {from_stock_level.quantity}, Requested: {quantity}")
         
-        # Update movement actions to indicate transfer
-        stock_out_movement.action = 'transfer'
-        stock_in_movement.action = 'transfer'
-        stock_out_movement.save()
-        stock_in_movement.save()
+        to_stock_level = InventoryService._lock_stock_level(item, to_location)
+        
+        from_previous_quantity = from_stock_level.quantity
+        to_previous_quantity = to_stock_level.quantity
+        
+        # Move the quantity between both rows in a single UPDATE ... CASE statement
+        StockLevel.objects.filter(pk__in=[from_stock_level.pk, to_stock_level.pk]).update(
+            quantity=F('quantity') + Case(
+                When(pk=from_stock_level.pk, then=Value(-quantity)),
+                default=Value(quantity),
+                output_field=IntegerField()
+            ),
+            last_updated=timezone.now()
+        )
+        from_stock_level.quantity -= quantity
+        to_stock_level.quantity += quantity
+        InventoryService._update_utilization(from_location, -quantity)
+        InventoryService._update_utilization(to_location, quantity)
+        
+        # Create both movement records directly as transfers
+        is_business_hours, shift = InventoryService._compute_time_context()
+        stock_out_movement, stock_in_movement = InventoryMovement.objects.bulk_create([
+            InventoryMovement(
+                item=item,
+                location=from_location,
+                action='transfer',
+                quantity=-quantity,
+                previous_quantity=from_previous_quantity,
+                new_quantity=from_stock_level.quantity,
+                reference_id=reference_id,
+                notes=f"Transfer to {to_location.code}. {notes}",
+                user=user,
+                is_business_hours=is_business_hours,
+                shift=shift
+            ),
+            InventoryMovement(
+                item=item,
+                location=to_location,
+                action='transfer',
+                quantity=quantity,
+                previous_quantity=to_previous_quantity,
+                new_quantity=to_stock_level.quantity,
+                reference_id=reference_id,
+                notes=f"Transfer from {from_location.code}. {notes}",
+                user=user,
+                is_business_hours=is_business_hours,
+                shift=shift
+            ),
+        ])
         
         return [stock_out_movement, stock_in_movement]
     
     @staticmethod
     @transaction.atomic
     def stock_adjustment(item_id: str, location_id: int, quantity_change: int,
-                         reference_id: str = '', notes: str = '', user: str = '') -> InventoryMovement:
+                         reference_id: str = '', notes: str = '', user: str = '',
+                         item: Optional[Item] = None, location: Optional[Location] = None) -> InventoryMovement:
         """
-        Stock adjustment operation - corrects inventory levels
+        Stock adjustment operation - corrects inventory levels.
+        Pass already loaded item/location objects to skip the lookups.
         """
         if quantity_change == 0:
             raise ValueError("Quantity change cannot be zero for adjustment operations")
         
-        item = get_object_or_404(Item, item_id=item_id, is_active=True)
-        location = get_object_or_404(Location, id=location_id, is_active=True)
+        item = item or InventoryService._get_item(item_id)
+        location = location or InventoryService._get_location(location_id)
         
-        # Get or create stock level
-        stock_level, created = StockLevel.objects.get_or_create(
-            item=item,
-            location=location,
-            defaults={'quantity': 0}
-        )
+        # Get or create stock level (locked so previous/new quantities stay accurate)
+        stock_level = InventoryService._lock_stock_level(item, location)
         
         previous_quantity = stock_level.quantity
         new_quantity = previous_quantity + quantity_change
@@ -186,15 +233,15 @@ class InventoryService:
         if new_quantity < 0:
             raise ValueError(f"Adjustment would result in negative stock. Current: {previous_quantity}, Change: {quantity_change}")
         
-        # Update stock level
-        stock_level.quantity = new_quantity
-        stock_level.save()
+        # Update stock level and location utilization
+        InventoryService._update_stock_level(stock_level, quantity_change)
+        InventoryService._update_utilization(location, quantity_change)
         
-        # Update location utilization
-        location.current_utilization = max(0, location.current_utilization + quantity_change)
-        location.save()
+        # Update denormalized item total
+        InventoryService._update_total_stock(item, quantity_change)
         
         # Create movement record
+        time_context = InventoryService._compute_time_context()
         movement = InventoryMovement.objects.create(
             item=item,
             location=location,
@@ -205,17 +252,24 @@ class InventoryService:
             reference_id=reference_id,
             notes=notes,
             user=user,
-            is_business_hours=InventoryService._is_business_hours(),
-            shift=InventoryService._get_current_shift()
+            is_business_hours=time_context.is_business_hours,
+            shift=time_context.shift
         )
         
         return movement
     
     @staticmethod
     @transaction.atomic
-    def bulk_movements(movements_data: List[Dict[str, Any]], user: str = '') -> List[InventoryMovement]:
+    def bulk_movements(movements_data: List[Dict[str, Any]], user: str = '',
+                       items: Optional[Dict[str, Item]] = None,
+                       locations: Optional[Dict[int, Location]] = None) -> List[InventoryMovement]:
         """
-        Bulk inventory movements operation
+        Bulk inventory movements operation.
+        Loads all referenced rows up front, applies the movements in memory
+        and writes the results back with bulk queries. Items (keyed by item_id)
+        and locations (keyed by pk) already resolved by the caller are reused.
+        Totals and utilization are written as deltas, so concurrent movements
+        on the same item or location are not lost.
         """
         if not movements_data:
             raise ValueError("No movements provided")
@@ -223,80 +277,259 @@ class InventoryService:
         if len(movements_data) > 100:
             raise ValueError("Maximum 100 movements allowed per bulk operation")
         
+        if items is None:
+            item_ids = {movement_data['item_id'] for movement_data in movements_data}
+            items = Item.objects.filter(is_active=True).in_bulk(item_ids, field_name='item_id')
+        
+        if locations is None:
+            location_ids = {movement_data['location_id'] for movement_data in movements_data}
+            location_ids.update(
+                movement_data['destination_location_id']
+                for movement_data in movements_data
+                if movement_data.get('destination_location_id')
+            )
+            locations = Location.objects.filter(is_active=True).in_bulk(location_ids)
+        stock_levels = {
+            (stock_level.item_id, stock_level.location_id): stock_level
+            for stock_level in StockLevel.objects.select_for_update(of=('self',), no_key=True).filter(
+                item__in=items.values(), location__in=locations.values()
+            )
+        }
+        
+        is_business_hours, shift = InventoryService._compute_time_context()
+        
         movements = []
+        changed_stock_levels = {}
+        utilization_deltas = {}
+        total_stock_deltas = {}
+        
+        def get_item(item_id):
+            if item_id not in items:
+                raise Http404("No Item matches the given query.")
+            return items[item_id]
+        
+        def get_location(location_id):
+            if location_id not in locations:
+                raise Http404("No Location matches the given query.")
+            return locations[location_id]
+        
+        def get_stock_level(item, location, create=True):
+            key = (item.pk, location.pk)
+            if key not in stock_levels:
+                if not create:
+                    raise ValueError(f"No stock available for item {item.item_id} at location {location.code}")
+                stock_levels[key] = StockLevel(item=item, location=location, quantity=0)
+            return stock_levels[key]
+        
+        def apply(item, location, stock_level, action, delta, reference_id, notes):
+            previous_quantity = stock_level.quantity
+            InventoryService._apply_delta(stock_level, location, delta)
+            changed_stock_levels[(item.pk, location.pk)] = stock_level
+            utilization_deltas[location.pk] = utilization_deltas.get(location.pk, 0) + delta
+            total_stock_deltas[item.pk] = total_stock_deltas.get(item.pk, 0) + delta
+            
+            movements.append(InventoryMovement(
+                item=item,
+                location=location,
+                action=action,
+                quantity=delta,
+                previous_quantity=previous_quantity,
+                new_quantity=stock_level.quantity,
+                reference_id=reference_id,
+                notes=notes,
+                user=user,
+                is_business_hours=is_business_hours,
+                shift=shift
+            ))
         
         for movement_data in movements_data:
             action = movement_data['action']
+            quantity = movement_data['quantity']
+            reference_id = movement_data.get('reference_id', '')
+            notes = movement_data.get('notes', '')
+            
+            if action not in ('stock_in', 'stock_out', 'transfer', 'adjustment'):
+                raise ValueError(f"Invalid action: {action}")
+            
+            item = get_item(movement_data['item_id'])
+            location = get_location(movement_data['location_id'])
             
             if action == 'stock_in':
-                movement = InventoryService.stock_in(
-                    item_id=movement_data['item_id'],
-                    location_id=movement_data['location_id'],
-                    quantity=abs(movement_data['quantity']),
-                    reference_id=movement_data.get('reference_id', ''),
-                    notes=movement_data.get('notes', ''),
-                    user=user
-                )
-                movements.append(movement)
+                quantity = abs(quantity)
+                if quantity <= 0:
+                    raise ValueError("Quantity must be positive for stock in operations")
+                
+                stock_level = get_stock_level(item, location)
+                apply(item, location, stock_level, 'stock_in', quantity, reference_id, notes)
             
             elif action == 'stock_out':
-                movement = InventoryService.stock_out(
-                    item_id=movement_data['item_id'],
-                    location_id=movement_data['location_id'],
-                    quantity=abs(movement_data['quantity']),
-                    reference_id=movement_data.get('reference_id', ''),
-                    notes=movement_data.get('notes', ''),
-                    user=user
-                )
-                movements.append(movement)
+                quantity = abs(quantity)
+                if quantity <= 0:
+                    raise ValueError("Quantity must be positive for stock out operations")
+                
+                stock_level = get_stock_level(item, location, create=False)
+                if stock_level.quantity < quantity:
+                    raise ValueError(f"Insufficient stock. Available: {stock_level.quantity}, Requested: {quantity}")
+                apply(item, location, stock_level, 'stock_out', -quantity, reference_id, notes)
             
             elif action == 'transfer':
-                transfer_movements = InventoryService.stock_transfer(
-                    item_id=movement_data['item_id'],
-                    from_location_id=movement_data['location_id'],
-                    to_location_id=movement_data['destination_location_id'],
-                    quantity=abs(movement_data['quantity']),
-                    reference_id=movement_data.get('reference_id', ''),
-                    notes=movement_data.get('notes', ''),
-                    user=user
-                )
-                movements.extend(transfer_movements)
+                quantity = abs(quantity)
+                if quantity <= 0:
+                    raise ValueError("Quantity must be positive for transfer operations")
+                
+                to_location = get_location(movement_data['destination_location_id'])
+                if location.pk == to_location.pk:
+                    raise ValueError("Source and destination locations cannot be the same")
+                if to_location.current_utilization + quantity > to_location.capacity:
+                    raise ValueError(f"Destination location {to_location.code} does not have sufficient capacity")
+                
+                from_stock_level = get_stock_level(item, location, create=False)
+                if from_stock_level.quantity < quantity:
+                    raise ValueError(f"Insufficient stock. Available: {from_stock_level.quantity}, Requested: {quantity}")
+                
+                apply(item, location, from_stock_level, 'transfer', -quantity,
+                      reference_id, f"Transfer to {to_location.code}. {notes}")
+                apply(item, to_location, get_stock_level(item, to_location), 'transfer', quantity,
+                      reference_id, f"Transfer from {location.code}. {notes}")
             
             elif action == 'adjustment':
-                movement = InventoryService.stock_adjustment(
-                    item_id=movement_data['item_id'],
-                    location_id=movement_data['location_id'],
-                    quantity_change=movement_data['quantity'],
-                    reference_id=movement_data.get('reference_id', ''),
-                    notes=movement_data.get('notes', ''),
-                    user=user
-                )
-                movements.append(movement)
-            
+                if quantity == 0:
+                    raise ValueError("Quantity change cannot be zero for adjustment operations")
+                
+                stock_level = get_stock_level(item, location)
+                if stock_level.quantity + quantity < 0:
+                    raise ValueError(
+                        f"Adjustment would result in negative stock. Current: {stock_level.quantity}, Change: {quantity}"
+                    )
+                apply(item, location, stock_level, 'adjustment', quantity, reference_id, notes)
+        
+        # Write everything back in bulk
+        now = timezone.now()
+        new_stock_levels = []
+        existing_stock_levels = []
+        for stock_level in changed_stock_levels.values():
+            stock_level.last_updated = now
+            if stock_level.pk is None:
+                new_stock_levels.append(stock_level)
             else:
-                raise ValueError(f"Invalid action: {action}")
+                existing_stock_levels.append(stock_level)
+        
+        StockLevel.objects.bulk_create(new_stock_levels)
+        StockLevel.objects.bulk_update(existing_stock_levels, ['quantity', 'last_updated'])
+        
+        # Apply all utilization and item total deltas with one UPDATE ... CASE statement each
+        utilization_deltas = {location_pk: delta for location_pk, delta in utilization_deltas.items() if delta}
+        if utilization_deltas:
+            Location.objects.filter(pk__in=utilization_deltas).update(
+                current_utilization=Greatest(Value(0), F('current_utilization') + Case(
+                    *[When(pk=location_pk, then=Value(delta)) for location_pk, delta in utilization_deltas.items()],
+                    output_field=IntegerField()
+                ))
+            )
+        
+        total_stock_deltas = {item_pk: delta for item_pk, delta in total_stock_deltas.items() if delta}
+        if total_stock_deltas:
+            Item.objects.filter(pk__in=total_stock_deltas).update(
+                total_stock=F('total_stock') + Case(
+                    *[When(pk=item_pk, then=Value(delta)) for item_pk, delta in total_stock_deltas.items()],
+                    output_field=IntegerField()
+                ),
+                updated_at=now
+            )
+        
+        return InventoryMovement.objects.raw_bulk_insert(movements)
+    
+    @staticmethod
+    def _get_item(item_id: str) -> Item:
+        return get_object_or_404(Item, item_id=item_id, is_active=True)
+    
+    @staticmethod
+    def _get_location(location_id: int) -> Location:
+        return get_object_or_404(Location, id=location_id, is_active=True)
+    
+    @staticmethod
+    def _lock_stock_level(item: Item, location: Location, create: bool = True) -> StockLevel:
+        """
+        Fetch a stock level under a FOR NO KEY UPDATE row lock.
+        On a miss the row is inserted inside a savepoint; if a concurrent
+        transaction inserted it first, the locking SELECT is retried.
+        """
+        locked = StockLevel.objects.select_for_update(of=('self',), no_key=True)
+        try:
+            return locked.get(item=item, location=location)
+        except StockLevel.DoesNotExist:
+            if not create:
+                raise
         
-        return movements
+        try:
+            with transaction.atomic():
+                return StockLevel.objects.create(item=item, location=location, quantity=0)
+        except IntegrityError:
+            return locked.get(item=item, location=location)
     
     @staticmethod
-    def _is_business_hours() -> bool:
+    def _apply_delta(stock_level: StockLevel, location: Location, delta: int) -> None:
         """
-        Check if current time is within business hours (8 AM - 6 PM)
+        Apply a quantity delta to an already loaded stock level and its location
+        """
+        stock_level.quantity += delta
+        location.current_utilization = max(0, location.current_utilization + delta)
+    
+    @staticmethod
+    def _update_stock_level(stock_level: StockLevel, delta: int) -> None:
+        """
+        Apply a quantity delta to a stock level with a single UPDATE
+        """
+        StockLevel.objects.filter(pk=stock_level.pk).update(
+            quantity=F('quantity') + delta,
+            last_updated=timezone.now()
+        )
+        stock_level.quantity += delta
+    
+    @staticmethod
+    def _update_utilization(location: Location, delta: int) -> None:
+        """
+        Apply a utilization delta to a location with a single UPDATE, never going below zero
+        """
+        Location.objects.filter(pk=location.pk).update(
+            current_utilization=Greatest(Value(0), F('current_utilization') + delta)
+        )
+        location.current_utilization = max(0, location.current_utilization + delta)
+    
+    @staticmethod
+    def _update_total_stock(item: Item, delta: int) -> None:
+        """
+        Apply a stock delta to the denormalized item total in a single UPDATE.
+        updated_at is bumped too so conditional GETs on items see the change.
         """
         now = timezone.now()
+        Item.objects.filter(pk=item.pk).update(total_stock=F('total_stock') + delta, updated_at=now)
+        item.total_stock += delta
+        item.updated_at = now
+    
+    @staticmethod
+    def _compute_time_context(now: Optional[datetime] = None) -> TimeContext:
+        """
+        Compute business hours flag and shift once for a batch of movements
+        """
+        now = now or timezone.now()
+        return TimeContext(
+            is_business_hours=InventoryService._is_business_hours(now),
+            shift=InventoryService._get_current_shift(now)
+        )
+    
+    @staticmethod
+    def _is_business_hours(now: Optional[datetime] = None) -> bool:
+        """
+        Check if current time is within business hours (8 AM - 6 PM)
+        """
+        now = now or timezone.now()
         return 8 <= now.hour < 18
     
     @staticmethod
-    def _get_current_shift() -> str:
+    def _get_current_shift(now: Optional[datetime] = None) -> str:
         """
         Get current work shift based on time
         """
-        now = timezone.now()
-        hour = now.hour
-        
-        if 6 <= hour < 14:
-            return 'morning'
-        elif 14 <= hour < 22:
-            return 'afternoon'
-        else:
-            return 'night'
\ No newline at end of file
+        now = now or timezone.now()
+        return _SHIFT_BY_HOUR[now.hour]
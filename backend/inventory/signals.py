@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from warehouse.cache import bump_list_cache_version
+from .models import Supplier, Category
+
+
+@receiver([post_save, post_delete], sender=Supplier)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_cached_lists(sender, **kwargs):
+    bump_list_cache_version(sender)
@@ -2,20 +2,64 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ParseError, ValidationError
 from django.db import transaction
+from django.db.models import F, Max
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from datetime import date, datetime, time, timedelta
+import msgspec
 
+from warehouse.mixins import CachedListMixin, ConditionalGetMixin, QueryParamFilterMixin
+from warehouse.pagination import MovementCursorPagination
 from warehouse.permissions import IsAdmin, IsWorker, IsAdminOrReadOnly, IsWorkerOrReadOnly
 from .models import Supplier, Category, Location, Item, StockLevel, InventoryMovement
 from .serializers import (
     SupplierSerializer, CategorySerializer, LocationSerializer, ItemSerializer,
-    StockLevelSerializer, InventoryMovementSerializer, StockMovementSerializer,
-    BulkStockMovementSerializer
+    ItemListSerializer, StockLevelSerializer, InventoryMovementSerializer,
+    InventoryMovementListSerializer, BulkStockMovementSerializer, StockMovementSerializer
 )
+from . import schemas
 from .services import InventoryService
 
+# Rows fetched per round trip when streaming unpaginated result sets
+ITERATOR_CHUNK_SIZE = 2000
 
-class SupplierViewSet(viewsets.ModelViewSet):
+
+def _start_of_day(value, param):
+    """Parse an ISO date query parameter into an aware datetime at midnight"""
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({param: 'Enter a date in YYYY-MM-DD format.'})
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _movement_data(request, schema, action):
+    """
+    Validated fields of a single stock movement request. JSON bodies are
+    decoded straight into the msgspec schema; other content types go through
+    StockMovementSerializer. Invalid input raises the serializer's field errors.
+    """
+    if request.content_type.partition(';')[0].strip().lower() == 'application/json':
+        try:
+            return schemas.decode(request.body, schema)
+        except msgspec.ValidationError as e:
+            raise ValidationError(schemas.field_errors(e))
+        except msgspec.DecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
+    
+    data = request.data.copy()
+    data.setdefault('action', action)
+    serializer = StockMovementSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return schema(**{
+        field: serializer.validated_data[field]
+        for field in schema.__struct_fields__ if field in serializer.validated_data
+    })
+
+
+class SupplierViewSet(CachedListMixin, ConditionalGetMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing suppliers.
     Admin: Full CRUD access
@@ -24,16 +68,14 @@ class SupplierViewSet(viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
     permission_classes = [IsAdminOrReadOnly]
+    filter_map = {'country': 'country__icontains'}
     
     def get_queryset(self):
-        queryset = Supplier.objects.filter(is_active=True)
-        country = self.request.query_params.get('country')
-        if country:
-            queryset = queryset.filter(country__icontains=country)
+        queryset = self.filter_by_query_params(Supplier.objects.filter(is_active=True))
         return queryset.order_by('name')
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing product categories.
     Admin: Full CRUD access
@@ -44,7 +86,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing warehouse locations.
     Admin: Full CRUD access
@@ -53,24 +95,17 @@ class LocationViewSet(viewsets.ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = [IsAdminOrReadOnly]
+    filter_map = {'zone': 'zone', 'type': 'location_type'}
     
     def get_queryset(self):
-        queryset = Location.objects.filter(is_active=True)
-        zone = self.request.query_params.get('zone')
-        location_type = self.request.query_params.get('type')
-        
-        if zone:
-            queryset = queryset.filter(zone=zone)
-        if location_type:
-            queryset = queryset.filter(location_type=location_type)
-            
+        queryset = self.filter_by_query_params(Location.objects.filter(is_active=True))
         return queryset.order_by('zone', 'code')
     
     @action(detail=True, methods=['get'])
     def utilization(self, request, pk=None):
         """Get location utilization details"""
         location = self.get_object()
-        stock_levels = StockLevel.objects.filter(location=location)
+        stock_levels = StockLevelSerializer.setup_eager_loading(StockLevel.objects.filter(location=location))
         
         data = {
             'location': LocationSerializer(location).data,
@@ -83,7 +118,7 @@ class LocationViewSet(viewsets.ModelViewSet):
         return Response(data)
 
 
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(ConditionalGetMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing inventory items.
     Admin & Worker: Full CRUD access
@@ -91,26 +126,28 @@ class ItemViewSet(viewsets.ModelViewSet):
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
     permission_classes = [IsWorkerOrReadOnly]
+    etag_aggregates = {
+        **ConditionalGetMixin.etag_aggregates,
+        'supplier_modified': Max('supplier__updated_at'),
+    }
+    # Categories have no updated_at; renaming one still changes category_name
+    etag_versioned_models = (Category,)
+    filter_map = {
+        'category': 'category__name',
+        'supplier': 'supplier__id',
+        'is_perishable': 'is_perishable',
+        'is_high_value': 'is_high_value',
+    }
+    boolean_filter_params = ('is_perishable', 'is_high_value')
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ItemListSerializer
+        return ItemSerializer
     
     def get_queryset(self):
-        queryset = Item.objects.filter(is_active=True).select_related('category', 'supplier')
-        
-        # Filtering
-        category = self.request.query_params.get('category')
-        supplier = self.request.query_params.get('supplier')
-        is_perishable = self.request.query_params.get('is_perishable')
-        is_high_value = self.request.query_params.get('is_high_value')
-        needs_reorder = self.request.query_params.get('needs_reorder')
-        
-        if category:
-            queryset = queryset.filter(category__name=category)
-        if supplier:
-            queryset = queryset.filter(supplier__id=supplier)
-        if is_perishable is not None:
-            queryset = queryset.filter(is_perishable=is_perishable.lower() == 'true')
-        if is_high_value is not None:
-            queryset = queryset.filter(is_high_value=is_high_value.lower() == 'true')
-        
+        queryset = self.get_serializer_class().setup_eager_loading(Item.objects.filter(is_active=True))
+        queryset = self.filter_by_query_params(queryset)
         return queryset.order_by('name')
     
     @action(detail=True, methods=['get'])
@@ -123,22 +160,24 @@ class ItemViewSet(viewsets.ModelViewSet):
             'total_stock': item.total_stock,
             'reorder_point': item.reorder_point,
             'needs_reorder': item.needs_reorder,
-            'stock_levels': StockLevelSerializer(item.stock_levels.all(), many=True).data
+            'stock_levels': StockLevelSerializer(
+                # The reverse relation reuses the loaded item, so only the location is joined
+                item.stock_levels.select_related('location').only(
+                    'id', 'quantity', 'last_updated', 'item', 'location__code'
+                ),
+                many=True
+            ).data
         })
     
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Get items with low stock that need reordering"""
-        items = []
-        for item in self.get_queryset():
-            if item.needs_reorder:
-                items.append(item)
-        
-        serializer = self.get_serializer(items, many=True)
+        items = self.get_queryset().filter(total_stock__lte=F('reorder_point'))
+        serializer = self.get_serializer(items.iterator(chunk_size=ITERATOR_CHUNK_SIZE), many=True)
         return Response(serializer.data)
 
 
-class StockLevelViewSet(viewsets.ReadOnlyModelViewSet):
+class StockLevelViewSet(QueryParamFilterMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing stock levels.
     Read-only access for all authenticated users.
@@ -146,26 +185,14 @@ class StockLevelViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = StockLevel.objects.all()
     serializer_class = StockLevelSerializer
     permission_classes = [IsAuthenticated]
+    filter_map = {'item_id': 'item__item_id', 'location_id': 'location__id', 'zone': 'location__zone'}
     
     def get_queryset(self):
-        queryset = StockLevel.objects.select_related('item', 'location')
-        
-        # Filtering
-        item_id = self.request.query_params.get('item_id')
-        location_id = self.request.query_params.get('location_id')
-        zone = self.request.query_params.get('zone')
-        
-        if item_id:
-            queryset = queryset.filter(item__item_id=item_id)
-        if location_id:
-            queryset = queryset.filter(location__id=location_id)
-        if zone:
-            queryset = queryset.filter(location__zone=zone)
-        
+        queryset = self.filter_by_query_params(StockLevelSerializer.setup_eager_loading(StockLevel.objects.all()))
         return queryset.order_by('item__name', 'location__code')
 
 
-class InventoryMovementViewSet(viewsets.ModelViewSet):
+class InventoryMovementViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing inventory movements.
     Admin & Worker: Create/Read access
@@ -174,28 +201,35 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
     queryset = InventoryMovement.objects.all()
     serializer_class = InventoryMovementSerializer
     permission_classes = [IsWorkerOrReadOnly]
+    pagination_class = MovementCursorPagination
+    filter_map = {
+        'item_id': 'item__item_id',
+        'location_id': 'location__id',
+        'action': 'action',
+    }
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return InventoryMovementListSerializer
+        return InventoryMovementSerializer
     
     def get_queryset(self):
-        queryset = InventoryMovement.objects.select_related('item', 'location').order_by('-timestamp')
+        queryset = self.get_serializer_class().setup_eager_loading(InventoryMovement.objects.all()).order_by('-timestamp')
+        queryset = self.filter_by_query_params(queryset)
+        if not self.request.query_params:
+            return queryset
         
-        # Filtering
-        item_id = self.request.query_params.get('item_id')
-        location_id = self.request.query_params.get('location_id')
-        action = self.request.query_params.get('action')
+        # Compare timestamp against day boundaries so the timestamp indexes stay usable
         date_from = self.request.query_params.get('date_from')
         date_to = self.request.query_params.get('date_to')
-        high_risk_only = self.request.query_params.get('high_risk')
-        
-        if item_id:
-            queryset = queryset.filter(item__item_id=item_id)
-        if location_id:
-            queryset = queryset.filter(location__id=location_id)
-        if action:
-            queryset = queryset.filter(action=action)
         if date_from:
-            queryset = queryset.filter(timestamp__date__gte=date_from)
+            queryset = queryset.filter(timestamp__gte=_start_of_day(date_from, 'date_from'))
         if date_to:
-            queryset = queryset.filter(timestamp__date__lte=date_to)
+            queryset = queryset.filter(timestamp__lt=_start_of_day(date_to, 'date_to') + timedelta(days=1))
+        
+        high_risk_only = self.request.query_params.get('high_risk')
+        if high_risk_only and high_risk_only.lower() == 'true':
+            queryset = queryset.filter(risk_score__gte=InventoryMovement.HIGH_RISK_SCORE)
         
         return queryset
     
@@ -204,96 +238,84 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
         Override permissions - only admins can delete movements
         """
         if self.action == 'destroy':
-            self.permission_classes = [IsAdmin]
+            return [IsAdmin()]
         return super().get_permissions()
     
     @action(detail=False, methods=['get'])
     def high_risk(self, request):
         """Get high-risk movements"""
-        movements = []
-        for movement in self.get_queryset():
-            if movement.is_high_risk:
-                movements.append(movement)
-        
-        serializer = self.get_serializer(movements, many=True)
+        movements = self.get_queryset().filter(risk_score__gte=InventoryMovement.HIGH_RISK_SCORE)
+        serializer = self.get_serializer(movements.iterator(chunk_size=ITERATOR_CHUNK_SIZE), many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'], permission_classes=[IsWorker])
     def stock_in(self, request):
         """Stock in operation"""
-        serializer = StockMovementSerializer(data=request.data)
-        if serializer.is_valid():
-            try:
-                movement = InventoryService.stock_in(
-                    item_id=serializer.validated_data['item_id'],
-                    location_id=serializer.validated_data['location_id'],
-                    quantity=abs(serializer.validated_data['quantity']),  # Ensure positive
-                    reference_id=serializer.validated_data.get('reference_id', ''),
-                    notes=serializer.validated_data.get('notes', ''),
-                    user=request.user.username
-                )
-                return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = _movement_data(request, schemas.StockMovementIn, 'stock_in')
+        try:
+            movement = InventoryService.stock_in(
+                item_id=data.item_id,
+                location_id=data.location_id,
+                quantity=abs(data.quantity),  # Ensure positive
+                reference_id=data.reference_id,
+                notes=data.notes,
+                user=request.user.username
+            )
+            return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'], permission_classes=[IsWorker])
     def stock_out(self, request):
         """Stock out operation"""
-        serializer = StockMovementSerializer(data=request.data)
-        if serializer.is_valid():
-            try:
-                movement = InventoryService.stock_out(
-                    item_id=serializer.validated_data['item_id'],
-                    location_id=serializer.validated_data['location_id'],
-                    quantity=abs(serializer.validated_data['quantity']),  # Ensure positive
-                    reference_id=serializer.validated_data.get('reference_id', ''),
-                    notes=serializer.validated_data.get('notes', ''),
-                    user=request.user.username
-                )
-                return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = _movement_data(request, schemas.StockMovementIn, 'stock_out')
+        try:
+            movement = InventoryService.stock_out(
+                item_id=data.item_id,
+                location_id=data.location_id,
+                quantity=abs(data.quantity),  # Ensure positive
+                reference_id=data.reference_id,
+                notes=data.notes,
+                user=request.user.username
+            )
+            return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'], permission_classes=[IsWorker])
     def transfer(self, request):
         """Stock transfer operation"""
-        serializer = StockMovementSerializer(data=request.data)
-        if serializer.is_valid():
-            try:
-                movements = InventoryService.stock_transfer(
-                    item_id=serializer.validated_data['item_id'],
-                    from_location_id=serializer.validated_data['location_id'],
-                    to_location_id=serializer.validated_data['destination_location_id'],
-                    quantity=abs(serializer.validated_data['quantity']),
-                    reference_id=serializer.validated_data.get('reference_id', ''),
-                    notes=serializer.validated_data.get('notes', ''),
-                    user=request.user.username
-                )
-                return Response(InventoryMovementSerializer(movements, many=True).data, status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = _movement_data(request, schemas.StockTransferIn, 'transfer')
+        try:
+            movements = InventoryService.stock_transfer(
+                item_id=data.item_id,
+                from_location_id=data.location_id,
+                to_location_id=data.destination_location_id,
+                quantity=abs(data.quantity),
+                reference_id=data.reference_id,
+                notes=data.notes,
+                user=request.user.username
+            )
+            return Response(InventoryMovementSerializer(movements, many=True).data, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'], permission_classes=[IsWorker])
     def adjustment(self, request):
         """Stock adjustment operation"""
-        serializer = StockMovementSerializer(data=request.data)
-        if serializer.is_valid():
-            try:
-                movement = InventoryService.stock_adjustment(
-                    item_id=serializer.validated_data['item_id'],
-                    location_id=serializer.validated_data['location_id'],
-                    quantity_change=serializer.validated_data['quantity'],
-                    reference_id=serializer.validated_data.get('reference_id', ''),
-                    notes=serializer.validated_data.get('notes', ''),
-                    user=request.user.username
-                )
-                return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = _movement_data(request, schemas.StockMovementIn, 'adjustment')
+        try:
+            movement = InventoryService.stock_adjustment(
+                item_id=data.item_id,
+                location_id=data.location_id,
+                quantity_change=data.quantity,
+                reference_id=data.reference_id,
+                notes=data.notes,
+                user=request.user.username
+            )
+            return Response(InventoryMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'], permission_classes=[IsWorker])
     def bulk_movements(self, request):
@@ -303,7 +325,9 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
             try:
                 movements = InventoryService.bulk_movements(
                     movements_data=serializer.validated_data['movements'],
-                    user=request.user.username
+                    user=request.user.username,
+                    items=serializer.context['items'],
+                    locations=serializer.context['locations']
                 )
                 return Response(InventoryMovementSerializer(movements, many=True).data, status=status.HTTP_201_CREATED)
             except Exception as e:
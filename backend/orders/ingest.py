@@ -0,0 +1,114 @@
+"""
+Asynchronous order ingestion.
+
+High-volume clients submit orders through OrderViewSet.ingest, which
+validates the order, assigns its order_id and appends the envelope to a
+Redis stream. A single writer (manage.py process_orders) reads the stream
+in batches and writes orders, items and status records with bulk INSERTs,
+so request latency no longer depends on database write throughput.
+
+Without REDIS_URL the envelope is written immediately in the request.
+
+Envelopes that cannot be written even on their own are moved to a
+dead-letter stream with the error, so one bad message never stalls the
+stream.
+"""
+import json
+import logging
+from decimal import InvalidOperation
+
+from django.conf import settings
+from django.db import DataError, IntegrityError
+
+from .services import OrderService
+
+logger = logging.getLogger(__name__)
+
+STREAM = 'orders:ingest'
+DEAD_LETTER_STREAM = 'orders:ingest:dead'
+GROUP = 'order-writers'
+BATCH_SIZE = 500
+BLOCK_MS = 1000
+
+# Failures caused by the message itself; anything else (a lost database
+# connection) stops the consumer so the batch is replayed on restart
+MESSAGE_ERRORS = (IntegrityError, DataError, InvalidOperation, ValueError, KeyError, TypeError)
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None and settings.REDIS_URL:
+        import redis
+
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def publish(envelope):
+    """
+    Queue an envelope from OrderService.prepare_order_envelope for writing
+    """
+    client = get_client()
+    if client is None:
+        OrderService.bulk_create_orders([envelope])
+        return
+
+    client.xadd(STREAM, {'envelope': json.dumps(envelope)})
+
+
+def consume(consumer, batch_size=BATCH_SIZE, block_ms=BLOCK_MS):
+    """
+    Write queued envelopes until interrupted. Messages are acknowledged only
+    after their batch commits, and pending messages from a previous run are
+    replayed first; bulk_create_orders skips order_ids that already exist.
+    A batch that fails is retried one envelope at a time.
+    """
+    client = get_client()
+    if client is None:
+        raise RuntimeError("REDIS_URL must be set to consume the order stream")
+
+    try:
+        client.xgroup_create(STREAM, GROUP, id='0', mkstream=True)
+    except Exception as exc:
+        if 'BUSYGROUP' not in str(exc):
+            raise
+
+    # '0' re-reads this consumer's unacknowledged messages, '>' reads new ones
+    last_id = '0'
+    while True:
+        response = client.xreadgroup(GROUP, consumer, {STREAM: last_id}, count=batch_size, block=block_ms)
+        messages = response[0][1] if response else []
+
+        if not messages:
+            last_id = '>'
+            continue
+
+        message_ids = [message_id for message_id, _ in messages]
+        try:
+            orders = OrderService.bulk_create_orders([json.loads(fields[b'envelope']) for _, fields in messages])
+        except MESSAGE_ERRORS:
+            logger.warning("Batch of %d queued orders failed, writing them one at a time", len(messages), exc_info=True)
+            orders = _write_individually(client, messages)
+        client.xack(STREAM, GROUP, *message_ids)
+        logger.info("Wrote %d of %d queued orders", len(orders), len(messages))
+
+
+def _write_individually(client, messages):
+    """
+    Write each message in its own transaction, moving the ones that still
+    fail to the dead-letter stream
+    """
+    orders = []
+    for message_id, fields in messages:
+        try:
+            orders.extend(OrderService.bulk_create_orders([json.loads(fields[b'envelope'])]))
+        except MESSAGE_ERRORS as exc:
+            logger.exception("Moving queued order %s to %s", message_id, DEAD_LETTER_STREAM)
+            client.xadd(DEAD_LETTER_STREAM, {
+                'envelope': fields[b'envelope'],
+                'message_id': message_id,
+                'error': f"{type(exc).__name__}: {exc}",
+            })
+    return orders
@@ -0,0 +1,20 @@
+import socket
+
+from django.core.management.base import BaseCommand
+
+from orders import ingest
+
+
+class Command(BaseCommand):
+    help = "Write orders queued by the ingest endpoint in batches (run a single instance)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=ingest.BATCH_SIZE)
+        parser.add_argument('--consumer', default=socket.gethostname())
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Consuming {ingest.STREAM} as {options['consumer']}")
+        try:
+            ingest.consume(options['consumer'], batch_size=options['batch_size'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Stopped"))
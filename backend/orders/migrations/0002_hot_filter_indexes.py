@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_active_partial_indexes'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'priority'], name='orders_status_5df973_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-order_date'], name='orders_order_d_ed0d8f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'status'], name='orders_custome_58f6c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pickingtask',
+            index=models.Index(fields=['status', 'assigned_to'], name='picking_tas_status_0e51e0_idx'),
+        ),
+    ]
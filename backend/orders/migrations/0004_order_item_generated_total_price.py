@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-15 17:46
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_keyset_index'),
+    ]
+
+    operations = [
+        # A regular column cannot be altered into a generated one, so it is
+        # dropped and re-added; existing rows are recomputed by PostgreSQL.
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='total_price',
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='total_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('unit_price')), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+    ]
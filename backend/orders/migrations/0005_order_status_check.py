@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_item_generated_total_price'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['pending', 'confirmed', 'processing', 'picking', 'packed', 'shipped', 'delivered', 'cancelled', 'returned'])), name='order_status_valid'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-15 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_stock_level_available_index'),
+        ('orders', '0005_order_status_check'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'required_date'], name='orders_status_required_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'status'], name='orders_created_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pickingtask',
+            index=models.Index(fields=['order', 'status'], name='picking_tasks_order_status_idx'),
+        ),
+    ]
@@ -20,6 +20,27 @@ class Customer(models.Model):
         return f"{self.customer_id} - {self.name}"
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_total_items(self):
+        """Annotate each order with its total ordered quantity computed in SQL"""
+        return self.annotate(
+            annotated_total_items=models.functions.Coalesce(models.Sum('order_items__quantity'), 0)
+        )
+    
+    def with_is_overdue(self):
+        """Annotate each order with whether it is overdue, evaluated against the database clock"""
+        return self.annotate(
+            annotated_is_overdue=models.Case(
+                models.When(
+                    models.Q(required_date__lt=models.functions.Now()) & ~models.Q(status__in=Order.CLOSED_STATUSES),
+                    then=models.Value(True)
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField()
+            )
+        )
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -40,6 +61,25 @@ class Order(models.Model):
         ('urgent', 'Urgent'),
     ]
     
+    # Orders in these statuses can no longer be overdue
+    CLOSED_STATUSES = ('shipped', 'delivered', 'cancelled')
+    
+    # Orders in these statuses are still being fulfilled
+    ACTIVE_STATUSES = ('pending', 'confirmed', 'processing', 'picking', 'packed')
+    
+    # Statuses each status may move to; cancelled and returned are final
+    STATUS_TRANSITIONS = {
+        'pending': frozenset({'confirmed', 'cancelled'}),
+        'confirmed': frozenset({'processing', 'cancelled'}),
+        'processing': frozenset({'picking', 'cancelled'}),
+        'picking': frozenset({'packed', 'cancelled'}),
+        'packed': frozenset({'shipped'}),
+        'shipped': frozenset({'delivered'}),
+        'delivered': frozenset({'returned'}),
+        'cancelled': frozenset(),
+        'returned': frozenset(),
+    }
+    
     order_id = models.CharField(max_length=50, unique=True)
     customer = models.ForeignKey(Customer, on_delete=models.PROTECT, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -53,22 +93,51 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'priority']),
+            models.Index(fields=['-order_date']),
+            models.Index(fields=['customer', 'status']),
+            models.Index(fields=['-created_at', '-id'], name='orders_keyset_idx'),
+            models.Index(fields=['status', 'required_date'], name='orders_status_required_idx'),
+            models.Index(fields=['created_at', 'status'], name='orders_created_status_idx'),
+        ]
+        constraints = [
+            # Transitions are applied with conditional UPDATEs in OrderService;
+            # the database additionally rejects any status outside STATUS_CHOICES
+            models.CheckConstraint(
+                condition=models.Q(status__in=[
+                    'pending', 'confirmed', 'processing', 'picking', 'packed',
+                    'shipped', 'delivered', 'cancelled', 'returned',
+                ]),
+                name='order_status_valid'
+            ),
+        ]
 
     def __str__(self):
         return f"Order {self.order_id} - {self.customer.name}"
 
     @property
     def is_overdue(self):
+        # Prefer the flag annotated by OrderQuerySet.with_is_overdue()
+        if hasattr(self, 'annotated_is_overdue'):
+            return self.annotated_is_overdue
+        
         if not self.required_date:
             return False
         from django.utils import timezone
-        return timezone.now() > self.required_date and self.status not in ['shipped', 'delivered', 'cancelled']
+        return timezone.now() > self.required_date and self.status not in self.CLOSED_STATUSES
 
     @property
     def total_items(self):
+        # Prefer the total annotated by OrderQuerySet.with_total_items()
+        if hasattr(self, 'annotated_total_items'):
+            return self.annotated_total_items
+        
         return self.order_items.aggregate(
             total=models.Sum('quantity')
         )['total'] or 0
@@ -79,7 +148,11 @@ class OrderItem(models.Model):
     item = models.ForeignKey('inventory.Item', on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
-    total_price = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    total_price = models.GeneratedField(
+        expression=models.F('quantity') * models.F('unit_price'),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True
+    )
     picked_quantity = models.PositiveIntegerField(default=0)
     packed_quantity = models.PositiveIntegerField(default=0)
     notes = models.TextField(blank=True)
@@ -91,10 +164,6 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.order.order_id} - {self.item.name} x{self.quantity}"
 
-    def save(self, *args, **kwargs):
-        self.total_price = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
-
     @property
     def is_fully_picked(self):
         return self.picked_quantity >= self.quantity
@@ -146,6 +215,10 @@ class PickingTask(models.Model):
     class Meta:
         db_table = 'picking_tasks'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'assigned_to']),
+            models.Index(fields=['order', 'status'], name='picking_tasks_order_status_idx'),
+        ]
 
     def __str__(self):
         return f"Pick {self.task_id} - {self.order.order_id}"
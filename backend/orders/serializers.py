@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import BooleanField, ExpressionWrapper, F, Prefetch
 from django.utils import timezone
 from decimal import Decimal
 
@@ -8,20 +9,23 @@ from .models import Customer, Order, OrderItem, OrderStatus, PickingTask
 class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
-        fields = '__all__'
+        fields = ('id', 'customer_id', 'name', 'email', 'phone', 'address', 'country', 'created_at', 'is_active')
         read_only_fields = ('created_at',)
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_id_display = serializers.CharField(source='item.item_id', read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     is_fully_picked = serializers.ReadOnlyField()
     is_fully_packed = serializers.ReadOnlyField()
     
     class Meta:
         model = OrderItem
-        fields = '__all__'
-        read_only_fields = ('total_price',)
+        fields = (
+            'id', 'order', 'item', 'item_name', 'item_id_display', 'quantity', 'unit_price', 'total_price',
+            'picked_quantity', 'packed_quantity', 'notes', 'is_fully_picked', 'is_fully_packed',
+        )
     
     def validate(self, data):
         """Validate order item data"""
@@ -42,9 +46,26 @@ class OrderSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Order
-        fields = '__all__'
+        fields = (
+            'id', 'customer_name', 'order_items', 'is_overdue', 'total_items', 'order_id', 'status', 'priority',
+            'order_date', 'required_date', 'shipped_date', 'total_value', 'currency', 'notes',
+            'created_at', 'updated_at', 'customer',
+        )
         read_only_fields = ('created_at', 'updated_at')
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load the customer, line items and computed totals used by the serializer in bulk"""
+        return queryset.select_related('customer').only(
+            'id', 'order_id', 'customer__name', 'status', 'priority', 'order_date', 'required_date',
+            'shipped_date', 'total_value', 'currency', 'notes', 'created_at', 'updated_at'
+        ).prefetch_related(
+            Prefetch('order_items', queryset=OrderItem.objects.select_related('item').only(
+                'id', 'order', 'item__name', 'item__item_id', 'quantity', 'unit_price', 'total_price',
+                'picked_quantity', 'packed_quantity', 'notes'
+            ))
+        ).with_total_items().with_is_overdue()
+    
     def validate(self, data):
         """Validate order data"""
         required_date = data.get('required_date')
@@ -61,7 +82,7 @@ class OrderSerializer(serializers.ModelSerializer):
 class OrderStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderStatus
-        fields = '__all__'
+        fields = ('id', 'from_status', 'to_status', 'changed_by', 'reason', 'timestamp', 'order')
         read_only_fields = ('timestamp',)
 
 
@@ -74,9 +95,38 @@ class PickingTaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = PickingTask
-        fields = '__all__'
+        fields = (
+            'id', 'order_id_display', 'item_name', 'item_id_display', 'location_code', 'is_completed', 'task_id',
+            'quantity_to_pick', 'quantity_picked', 'status', 'assigned_to', 'assigned_at', 'started_at',
+            'completed_at', 'notes', 'created_at', 'order', 'order_item', 'location',
+        )
         read_only_fields = ('created_at',)
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join the order, item and location read by the serializer, loading only the displayed columns"""
+        return queryset.select_related('order', 'order_item__item', 'location').only(
+            'id', 'task_id', 'quantity_to_pick', 'quantity_picked', 'status', 'assigned_to', 'assigned_at',
+            'started_at', 'completed_at', 'notes', 'created_at', 'order__order_id', 'order_item__item__name',
+            'order_item__item__item_id', 'location__code'
+        )
+    
+    @classmethod
+    def list_values(cls, queryset):
+        """
+        Select the serializer's output as plain dicts for read-only polling
+        endpoints, so no model instances or field objects are built per row
+        """
+        return queryset.values(
+            'id', 'task_id', 'quantity_to_pick', 'quantity_picked', 'status', 'assigned_to', 'assigned_at',
+            'started_at', 'completed_at', 'notes', 'created_at', 'order', 'order_item', 'location',
+            order_id_display=F('order__order_id'),
+            item_name=F('order_item__item__name'),
+            item_id_display=F('order_item__item__item_id'),
+            location_code=F('location__code'),
+            is_completed=ExpressionWrapper(F('quantity_picked') >= F('quantity_to_pick'), output_field=BooleanField()),
+        )
+    
     def validate(self, data):
         """Validate picking task data"""
         quantity_to_pick = data.get('quantity_to_pick', 0)
@@ -119,6 +169,10 @@ class OrderCreateSerializer(serializers.Serializer):
             if Decimal(str(item_data['unit_price'])) <= 0:
                 raise serializers.ValidationError("Item unit price must be positive")
         
+        item_ids = [item_data['item_id'] for item_data in value]
+        if len(set(item_ids)) != len(item_ids):
+            raise serializers.ValidationError("Each item may appear only once per order")
+        
         return value
 
 
@@ -137,20 +191,7 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
         
         current_status = order.status
         
-        # Define valid status transitions
-        valid_transitions = {
-            'pending': ['confirmed', 'cancelled'],
-            'confirmed': ['processing', 'cancelled'],
-            'processing': ['picking', 'cancelled'],
-            'picking': ['packed', 'cancelled'],
-            'packed': ['shipped'],
-            'shipped': ['delivered'],
-            'delivered': ['returned'],
-            'cancelled': [],  # Cannot transition from cancelled
-            'returned': []    # Cannot transition from returned
-        }
-        
-        if value not in valid_transitions.get(current_status, []):
+        if value not in Order.STATUS_TRANSITIONS.get(current_status, frozenset()):
             raise serializers.ValidationError(
                 f"Cannot transition from {current_status} to {value}"
             )
@@ -1,14 +1,28 @@
 from django.db import transaction
+from django.db.models import Avg, Count, F, Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from decimal import Decimal
 from typing import List, Dict, Any
+import secrets
 import uuid
 
 from .models import Customer, Order, OrderItem, OrderStatus, PickingTask
 from inventory.models import Item, Location, StockLevel
 from inventory.services import InventoryService
 
+# Stock level rows fetched per round trip when allocating picking tasks
+STOCK_SCAN_CHUNK_SIZE = 500
+
+# Rows per INSERT statement when writing ingested orders
+BULK_BATCH_SIZE = 500
+
+# Keys reported by get_order_statistics, built once at import time
+_STATUS_KEYS = tuple(choice[0] for choice in Order.STATUS_CHOICES)
+_PRIORITY_KEYS = tuple(choice[0] for choice in Order.PRIORITY_CHOICES)
+
 
 class OrderService:
     """
@@ -27,24 +41,29 @@ class OrderService:
         customer = get_object_or_404(Customer, customer_id=customer_id, is_active=True)
         
         # Generate order ID
-        order_id = f"ORD-{timezone.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+        order_id = OrderService._generate_order_id()
         
         # Calculate total value
         total_value = Decimal('0.00')
         validated_items = []
         
+        # Resolve all line items with a single query
+        item_ids = {item_data['item_id'] for item_data in items_data}
+        items = Item.objects.filter(is_active=True).in_bulk(item_ids, field_name='item_id')
+        missing_items = sorted(item_ids - items.keys())
+        if missing_items:
+            raise Http404(f"Items not found: {', '.join(missing_items)}")
+        
         for item_data in items_data:
-            item = get_object_or_404(Item, item_id=item_data['item_id'], is_active=True)
+            item = items[item_data['item_id']]
             quantity = int(item_data['quantity'])
             unit_price = Decimal(str(item_data['unit_price']))
-            total_price = quantity * unit_price
-            total_value += total_price
+            total_value += quantity * unit_price
             
             validated_items.append({
                 'item': item,
                 'quantity': quantity,
                 'unit_price': unit_price,
-                'total_price': total_price,
                 'notes': item_data.get('notes', '')
             })
         
@@ -60,15 +79,16 @@ class OrderService:
         )
         
         # Create order items
-        for item_data in validated_items:
-            OrderItem.objects.create(
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
                 item=item_data['item'],
                 quantity=item_data['quantity'],
                 unit_price=item_data['unit_price'],
-                total_price=item_data['total_price'],
                 notes=item_data['notes']
             )
+            for item_data in validated_items
+        ], batch_size=500)
         
         # Create initial status record
         OrderStatus.objects.create(
@@ -81,46 +101,124 @@ class OrderService:
         return order
     
     @staticmethod
-    @transaction.atomic
-    def update_order_status(order_id: str, new_status: str, user: str, reason: str = '') -> OrderStatus:
+    def prepare_order_envelope(customer_id: str, items_data: List[Dict], priority: str = 'normal',
+                               required_date: timezone.datetime = None, currency: str = 'USD',
+                               notes: str = '', user: str = '') -> Dict[str, Any]:
         """
-        Update order status with validation
+        Validate an order for asynchronous ingestion and assign its order_id.
+        The returned envelope is JSON serializable and is written later by
+        bulk_create_orders.
         """
-        order = get_object_or_404(Order, order_id=order_id)
-        old_status = order.status
+        if not Customer.objects.filter(customer_id=customer_id, is_active=True).exists():
+            raise Http404(f"Customer not found: {customer_id}")
         
-        # Validate status transition (handled by serializer, but double-check here)
-        valid_transitions = {
-            'pending': ['confirmed', 'cancelled'],
-            'confirmed': ['processing', 'cancelled'],
-            'processing': ['picking', 'cancelled'],
-            'picking': ['packed', 'cancelled'],
-            'packed': ['shipped'],
-            'shipped': ['delivered'],
-            'delivered': ['returned'],
-            'cancelled': [],
-            'returned': []
-        }
+        item_ids = {item_data['item_id'] for item_data in items_data}
+        if len(item_ids) != len(items_data):
+            raise ValueError("Each item may appear only once per order")
         
-        if new_status not in valid_transitions.get(old_status, []):
-            raise ValueError(f"Cannot transition from {old_status} to {new_status}")
+        found_item_ids = set(
+            Item.objects.filter(item_id__in=item_ids, is_active=True).values_list('item_id', flat=True)
+        )
+        missing_items = sorted(item_ids - found_item_ids)
+        if missing_items:
+            raise Http404(f"Items not found: {', '.join(missing_items)}")
+        
+        lines = [
+            {
+                'item_id': item_data['item_id'],
+                'quantity': int(item_data['quantity']),
+                'unit_price': str(Decimal(str(item_data['unit_price']))),
+                'notes': item_data.get('notes', '')
+            }
+            for item_data in items_data
+        ]
+        total_value = sum((line['quantity'] * Decimal(line['unit_price']) for line in lines), Decimal('0.00'))
         
-        # Update order status
-        order.status = new_status
-        if new_status == 'shipped':
-            order.shipped_date = timezone.now()
-        order.save()
+        return {
+            'order_id': OrderService._generate_order_id(),
+            'customer_id': customer_id,
+            'priority': priority,
+            'required_date': required_date.isoformat() if required_date else None,
+            'currency': currency,
+            'notes': notes,
+            'total_value': str(total_value),
+            'user': user,
+            'items': lines
+        }
+    
+    @staticmethod
+    @transaction.atomic
+    def bulk_create_orders(envelopes: List[Dict[str, Any]]) -> List[Order]:
+        """
+        Create a batch of orders prepared by prepare_order_envelope.
+        Orders, their items and initial status records are each written with
+        one bulk INSERT. Envelopes whose order_id already exists are skipped,
+        so redelivered messages are harmless. An envelope whose customer or
+        items were deactivated after it was queued raises ValueError, so the
+        consumer dead-letters it rather than dropping an accepted order.
+        """
+        envelopes = {envelope['order_id']: envelope for envelope in envelopes}
+        for order_id in Order.objects.filter(order_id__in=envelopes).values_list('order_id', flat=True):
+            del envelopes[order_id]
         
-        # Create status history record
-        status_record = OrderStatus.objects.create(
-            order=order,
-            from_status=old_status,
-            to_status=new_status,
-            changed_by=user,
-            reason=reason
+        customers = Customer.objects.filter(is_active=True).in_bulk(
+            {envelope['customer_id'] for envelope in envelopes.values()}, field_name='customer_id'
+        )
+        items = Item.objects.filter(is_active=True).in_bulk(
+            {line['item_id'] for envelope in envelopes.values() for line in envelope['items']},
+            field_name='item_id'
         )
         
-        return status_record
+        orders = []
+        for envelope in envelopes.values():
+            customer = customers.get(envelope['customer_id'])
+            if customer is None or any(line['item_id'] not in items for line in envelope['items']):
+                raise ValueError(f"Order {envelope['order_id']}: customer or items are no longer active")
+            
+            orders.append(Order(
+                order_id=envelope['order_id'],
+                customer=customer,
+                priority=envelope['priority'],
+                required_date=parse_datetime(envelope['required_date']) if envelope['required_date'] else None,
+                total_value=Decimal(envelope['total_value']),
+                currency=envelope['currency'],
+                notes=envelope['notes']
+            ))
+        
+        Order.objects.bulk_create(orders, batch_size=BULK_BATCH_SIZE)
+        
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                item=items[line['item_id']],
+                quantity=line['quantity'],
+                unit_price=Decimal(line['unit_price']),
+                notes=line['notes']
+            )
+            for order in orders
+            for line in envelopes[order.order_id]['items']
+        ], batch_size=BULK_BATCH_SIZE)
+        
+        OrderStatus.objects.bulk_create([
+            OrderStatus(
+                order=order,
+                to_status='pending',
+                changed_by=envelopes[order.order_id]['user'],
+                reason='Order created'
+            )
+            for order in orders
+        ], batch_size=BULK_BATCH_SIZE)
+        
+        return orders
+    
+    @staticmethod
+    @transaction.atomic
+    def update_order_status(order_id: str, new_status: str, user: str, reason: str = '') -> OrderStatus:
+        """
+        Update order status with validation
+        """
+        order = get_object_or_404(Order.objects.only('order_id', 'status'), order_id=order_id)
+        return OrderService._apply_status_transition(order, new_status, user, reason)
     
     @staticmethod
     @transaction.atomic
@@ -128,12 +226,12 @@ class OrderService:
         """
         Cancel an order
         """
-        order = get_object_or_404(Order, order_id=order_id)
+        order = get_object_or_404(Order.objects.only('order_id', 'status'), order_id=order_id)
         
         if order.status in ['shipped', 'delivered', 'cancelled', 'returned']:
             raise ValueError(f"Cannot cancel order with status {order.status}")
         
-        return OrderService.update_order_status(order_id, 'cancelled', user, reason)
+        return OrderService._apply_status_transition(order, 'cancelled', user, reason)
     
     @staticmethod
     @transaction.atomic
@@ -146,42 +244,48 @@ class OrderService:
         if order.status != 'processing':
             raise ValueError("Order must be in processing status to create picking tasks")
         
+        # Each item appears on at most one line of an order
+        order_items = {order_item.item_id: order_item for order_item in order.order_items.select_related('item')}
+        remaining = {item_id: order_item.quantity for item_id, order_item in order_items.items()}
+        
+        # Stream stock for every ordered item, largest stock first, so items
+        # stored in many locations are never fully materialized
+        stock_levels = StockLevel.objects.filter(
+            item_id__in=order_items, quantity__gt=0
+        ).select_related('location').only('item', 'quantity', 'location__code').order_by('item_id', '-quantity')
+        
+        today = timezone.now()
+        task_date = f"{today.year:04d}{today.month:02d}{today.day:02d}"
         picking_tasks = []
         
-        for order_item in order.order_items.all():
-            # Find locations with available stock
-            stock_levels = StockLevel.objects.filter(
-                item=order_item.item,
-                quantity__gt=0
-            ).order_by('-quantity')
-            
-            remaining_quantity = order_item.quantity
+        for stock_level in stock_levels.iterator(chunk_size=STOCK_SCAN_CHUNK_SIZE):
+            remaining_quantity = remaining[stock_level.item_id]
+            if remaining_quantity <= 0:
+                continue
             
-            for stock_level in stock_levels:
-                if remaining_quantity <= 0:
-                    break
-                
-                quantity_to_pick = min(remaining_quantity, stock_level.quantity)
-                
-                # Generate task ID
-                task_id = f"PICK-{timezone.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
-                
-                picking_task = PickingTask.objects.create(
-                    task_id=task_id,
-                    order=order,
-                    order_item=order_item,
-                    location=stock_level.location,
-                    quantity_to_pick=quantity_to_pick
-                )
-                
-                picking_tasks.append(picking_task)
-                remaining_quantity -= quantity_to_pick
+            quantity_to_pick = min(remaining_quantity, stock_level.quantity)
             
-            if remaining_quantity > 0:
+            picking_tasks.append(PickingTask(
+                order=order,
+                order_item=order_items[stock_level.item_id],
+                location=stock_level.location,
+                quantity_to_pick=quantity_to_pick
+            ))
+            remaining[stock_level.item_id] -= quantity_to_pick
+        
+        for item_id, order_item in order_items.items():
+            if remaining[item_id] > 0:
                 raise ValueError(f"Insufficient stock for item {order_item.item.item_id}")
         
+        # One random draw for the whole batch, sliced into an 8 digit suffix per task
+        suffixes = secrets.token_hex(4 * len(picking_tasks)).upper()
+        for index, picking_task in enumerate(picking_tasks):
+            picking_task.task_id = f"PICK-{task_date}-{suffixes[index * 8:index * 8 + 8]}"
+        
+        PickingTask.objects.bulk_create(picking_tasks, batch_size=500)
+        
         # Update order status to picking
-        OrderService.update_order_status(order_id, 'picking', user, 'Picking tasks created')
+        OrderService._apply_status_transition(order, 'picking', user, 'Picking tasks created')
         
         return picking_tasks
     
@@ -191,18 +295,13 @@ class OrderService:
         """
         Assign a picking task to a worker
         """
-        task = get_object_or_404(PickingTask, task_id=task_id)
-        
-        if task.status != 'pending':
-            raise ValueError(f"Cannot assign task with status {task.status}")
-        
-        task.status = 'assigned'
-        task.assigned_to = assigned_to
-        task.assigned_at = timezone.now()
-        task.notes = notes
-        task.save()
+        assigned = PickingTask.objects.filter(task_id=task_id, status='pending').update(
+            status='assigned', assigned_to=assigned_to, assigned_at=timezone.now(), notes=notes
+        )
+        if not assigned:
+            OrderService._raise_picking_task_conflict(task_id, 'assign', 'pending')
         
-        return task
+        return OrderService._get_picking_task(task_id)
     
     @staticmethod
     @transaction.atomic
@@ -210,19 +309,13 @@ class OrderService:
         """
         Start a picking task
         """
-        task = get_object_or_404(PickingTask, task_id=task_id)
-        
-        if task.status != 'assigned':
-            raise ValueError(f"Cannot start task with status {task.status}")
-        
-        if task.assigned_to != user:
-            raise ValueError("Task is not assigned to this user")
-        
-        task.status = 'in_progress'
-        task.started_at = timezone.now()
-        task.save()
+        started = PickingTask.objects.filter(task_id=task_id, status='assigned', assigned_to=user).update(
+            status='in_progress', started_at=timezone.now()
+        )
+        if not started:
+            OrderService._raise_picking_task_conflict(task_id, 'start', 'assigned', user=user)
         
-        return task
+        return OrderService._get_picking_task(task_id)
     
     @staticmethod
     @transaction.atomic
@@ -230,33 +323,27 @@ class OrderService:
         """
         Complete a picking task and update inventory
         """
-        task = get_object_or_404(PickingTask, task_id=task_id)
-        
-        if task.status != 'in_progress':
-            raise ValueError(f"Cannot complete task with status {task.status}")
-        
-        if task.assigned_to != user:
-            raise ValueError("Task is not assigned to this user")
-        
-        if quantity_picked > task.quantity_to_pick:
-            raise ValueError("Picked quantity cannot exceed quantity to pick")
+        # Update task, guarded on its state, assignee and quantity
+        completed = PickingTask.objects.filter(
+            task_id=task_id, status='in_progress', assigned_to=user, quantity_to_pick__gte=quantity_picked
+        ).update(status='completed', quantity_picked=quantity_picked, completed_at=timezone.now(), notes=notes)
+        if not completed:
+            OrderService._raise_picking_task_conflict(
+                task_id, 'complete', 'in_progress', user=user, quantity_picked=quantity_picked
+            )
         
-        # Update task
-        task.quantity_picked = quantity_picked
-        task.status = 'completed'
-        task.completed_at = timezone.now()
-        task.notes = notes
-        task.save()
+        task = OrderService._get_picking_task(task_id)
         
-        # Update order item picked quantity
-        task.order_item.picked_quantity += quantity_picked
-        task.order_item.save()
+        # Update order item picked quantity without a read-modify-write race
+        OrderItem.objects.filter(pk=task.order_item_id).update(
+            picked_quantity=F('picked_quantity') + quantity_picked
+        )
         
         # Create inventory movement for stock out
         if quantity_picked > 0:
             InventoryService.stock_out(
                 item_id=task.order_item.item.item_id,
-                location_id=task.location.id,
+                location_id=task.location_id,
                 quantity=quantity_picked,
                 reference_id=task.order.order_id,
                 notes=f"Picked for order {task.order.order_id}",
@@ -265,20 +352,17 @@ class OrderService:
         
         # Check if all picking tasks for the order are completed
         order = task.order
-        total_tasks = order.picking_tasks.count()
-        completed_tasks = order.picking_tasks.filter(status='completed').count()
+        task_counts = order.picking_tasks.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed'))
+        )
         
-        if total_tasks == completed_tasks:
+        if task_counts['total'] == task_counts['completed']:
             # Check if all items are fully picked
-            all_picked = all(
-                item.picked_quantity >= item.quantity
-                for item in order.order_items.all()
-            )
+            all_picked = not order.order_items.filter(picked_quantity__lt=F('quantity')).exists()
             
             if all_picked:
-                OrderService.update_order_status(
-                    order.order_id, 'packed', user, 'All items picked'
-                )
+                OrderService._apply_status_transition(order, 'packed', user, 'All items picked')
         
         return task
     
@@ -295,37 +379,31 @@ class OrderService:
         if date_to:
             queryset = queryset.filter(created_at__lte=date_to)
         
-        total_orders = queryset.count()
-        
-        # Orders by status
-        orders_by_status = {}
-        for status_choice in Order.STATUS_CHOICES:
-            status = status_choice[0]
-            count = queryset.filter(status=status).count()
-            orders_by_status[status] = count
+        # Counts, average value and overdue count in one aggregate query
+        totals = queryset.aggregate(
+            total_orders=Count('id'),
+            completed_orders=Count('id', filter=Q(status='delivered')),
+            average_order_value=Avg('total_value'),
+            overdue_orders=Count('id', filter=Q(
+                required_date__lt=timezone.now(),
+                status__in=Order.ACTIVE_STATUSES
+            ))
+        )
+        total_orders = totals['total_orders']
         
-        # Orders by priority
-        orders_by_priority = {}
-        for priority_choice in Order.PRIORITY_CHOICES:
-            priority = priority_choice[0]
-            count = queryset.filter(priority=priority).count()
-            orders_by_priority[priority] = count
+        # Orders by status and priority, one GROUP BY query each
+        grouped = queryset.order_by()
+        orders_by_status = dict.fromkeys(_STATUS_KEYS, 0)
+        orders_by_status.update(grouped.values_list('status').annotate(Count('id')))
+        orders_by_priority = dict.fromkeys(_PRIORITY_KEYS, 0)
+        orders_by_priority.update(grouped.values_list('priority').annotate(Count('id')))
         
         # Completion rate
-        completed_orders = queryset.filter(status='delivered').count()
-        completion_rate = (completed_orders / total_orders * 100) if total_orders > 0 else 0
+        completion_rate = (totals['completed_orders'] / total_orders * 100) if total_orders > 0 else 0
         
         # Average order value
-        total_value = queryset.aggregate(
-            total=models.Sum('total_value')
-        )['total'] or Decimal('0.00')
-        average_order_value = (total_value / total_orders) if total_orders > 0 else Decimal('0.00')
-        
-        # Overdue orders
-        overdue_orders = queryset.filter(
-            required_date__lt=timezone.now(),
-            status__in=['pending', 'confirmed', 'processing', 'picking', 'packed']
-        ).count()
+        average_order_value = totals['average_order_value'] or Decimal('0.00')
+        overdue_orders = totals['overdue_orders']
         
         # Pending picking tasks
         pending_picking_tasks = PickingTask.objects.filter(
@@ -347,15 +425,21 @@ class OrderService:
         """
         Check stock availability for an order
         """
-        order = get_object_or_404(Order, order_id=order_id)
+        # Line items and their stored stock totals in one query; the order
+        # itself is only looked up when it has no lines to report
+        order_items = list(OrderItem.objects.filter(order__order_id=order_id).select_related('item').only(
+            'quantity', 'item__item_id', 'item__name', 'item__total_stock'
+        ))
+        if not order_items and not Order.objects.filter(order_id=order_id).exists():
+            raise Http404(f"Order {order_id} not found")
         
         availability = {
-            'order_id': order.order_id,
+            'order_id': order_id,
             'items': [],
             'fully_available': True
         }
         
-        for order_item in order.order_items.all():
+        for order_item in order_items:
             total_stock = order_item.item.total_stock
             required_quantity = order_item.quantity
             available_quantity = min(total_stock, required_quantity)
@@ -375,4 +459,71 @@ class OrderService:
             if shortage > 0:
                 availability['fully_available'] = False
         
-        return availability
\ No newline at end of file
+        return availability
+    
+    @staticmethod
+    def _generate_order_id() -> str:
+        today = timezone.now()
+        return f"ORD-{today.year:04d}{today.month:02d}{today.day:02d}-{uuid.uuid4().hex[:8].upper()}"
+    
+    @staticmethod
+    def _apply_status_transition(order: Order, new_status: str, user: str, reason: str = '') -> OrderStatus:
+        """
+        Move an already fetched order to new_status and record the change.
+        Must run inside the caller's transaction.
+        """
+        old_status = order.status
+        
+        # Validate status transition (handled by serializer, but double-check here)
+        if new_status not in Order.STATUS_TRANSITIONS.get(old_status, frozenset()):
+            raise ValueError(f"Cannot transition from {old_status} to {new_status}")
+        
+        # Apply the transition only if no concurrent request changed the status first
+        now = timezone.now()
+        changes = {'status': new_status, 'updated_at': now}
+        if new_status == 'shipped':
+            changes['shipped_date'] = now
+        if not Order.objects.filter(pk=order.pk, status=old_status).update(**changes):
+            raise ValueError(f"Order {order.order_id} status was changed concurrently, please retry")
+        order.status = new_status
+        
+        # Create status history record
+        status_record = OrderStatus.objects.create(
+            order=order,
+            from_status=old_status,
+            to_status=new_status,
+            changed_by=user,
+            reason=reason
+        )
+        
+        return status_record
+    
+    @staticmethod
+    def _get_picking_task(task_id: str) -> PickingTask:
+        """
+        Fetch a picking task with the relations its serializer reads
+        """
+        return get_object_or_404(
+            PickingTask.objects.select_related('order', 'order_item__item', 'location'), task_id=task_id
+        )
+    
+    @staticmethod
+    def _raise_picking_task_conflict(task_id: str, verb: str, required_status: str,
+                                     user: str = None, quantity_picked: int = None) -> None:
+        """
+        Explain why a guarded picking task UPDATE matched no row
+        """
+        task = get_object_or_404(
+            PickingTask.objects.only('status', 'assigned_to', 'quantity_to_pick'), task_id=task_id
+        )
+        
+        if task.status != required_status:
+            raise ValueError(f"Cannot {verb} task with status {task.status}")
+        
+        if user is not None and task.assigned_to != user:
+            raise ValueError("Task is not assigned to this user")
+        
+        if quantity_picked is not None and quantity_picked > task.quantity_to_pick:
+            raise ValueError("Picked quantity cannot exceed quantity to pick")
+        
+        raise ValueError(f"Task {task_id} was changed concurrently, please retry")
\ No newline at end of file
@@ -1,12 +1,13 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db import models
+from datetime import datetime
+from functools import lru_cache
 
 from .models import Customer, Order, OrderItem, OrderStatus, PickingTask
 from .serializers import (
@@ -16,23 +17,46 @@ from .serializers import (
     PickingTaskUpdateSerializer, OrderFilterSerializer, OrderReportSerializer
 )
 from .services import OrderService
-from warehouse.permissions import IsAdmin, IsWorker, IsAdminOrWorker
+from . import ingest as order_ingest
+from warehouse.mixins import QueryParamFilterMixin
+from warehouse.permissions import IsAdmin, IsWorker, IsAdminOrWorker, get_group_names
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+@lru_cache(maxsize=1024)
+def _parse_iso_datetime(value):
+    # Dashboards poll with the same few ranges, so parsed values are reused
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _datetime_param(value, param):
+    """Parse an ISO date or datetime query parameter into an aware datetime"""
+    try:
+        return _parse_iso_datetime(value)
+    except ValueError:
+        raise ValidationError({param: 'Enter a valid ISO 8601 date or datetime.'})
+
+
+class CustomerViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing customers
     """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated, IsAdminOrWorker]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['country', 'is_active']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_map = {'country': 'country', 'is_active': 'is_active'}
+    boolean_filter_params = ('is_active',)
     search_fields = ['name', 'customer_id', 'email', 'contact_person']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
     lookup_field = 'customer_id'
     
+    def get_queryset(self):
+        return self.filter_by_query_params(Customer.objects.all())
+    
     def get_permissions(self):
         """
         Admin: Full CRUD access
@@ -49,20 +73,20 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def orders(self, request, customer_id=None):
         """Get all orders for a customer"""
         customer = self.get_object()
-        orders = Order.objects.filter(customer=customer)
+        orders = OrderSerializer.setup_eager_loading(Order.objects.filter(customer=customer))
         serializer = OrderSerializer(orders, many=True)
         return Response(serializer.data)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing orders
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsAdminOrWorker]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'customer']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_map = {'customer': 'customer_id'}
     search_fields = ['order_id', 'customer__name', 'notes']
     ordering_fields = ['created_at', 'required_date', 'total_value']
     ordering = ['-created_at']
@@ -73,7 +97,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         Admin: Full CRUD access
         Worker: Read and update access (status changes)
         """
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'ingest', 'destroy']:
             permission_classes = [IsAuthenticated, IsAdmin]
         else:
             permission_classes = [IsAuthenticated, IsAdminOrWorker]
@@ -82,7 +106,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter orders based on query parameters"""
-        queryset = Order.objects.select_related('customer').prefetch_related('order_items')
+        queryset = self.filter_by_query_params(OrderSerializer.setup_eager_loading(Order.objects.all()))
         
         # Apply custom filters
         status_filter = self.request.query_params.get('status')
@@ -102,15 +126,15 @@ class OrderViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(customer__customer_id=customer_id_filter)
         
         if date_from:
-            queryset = queryset.filter(created_at__gte=date_from)
+            queryset = queryset.filter(created_at__gte=_datetime_param(date_from, 'date_from'))
         
         if date_to:
-            queryset = queryset.filter(created_at__lte=date_to)
+            queryset = queryset.filter(created_at__lte=_datetime_param(date_to, 'date_to'))
         
         if overdue_only == 'true':
             queryset = queryset.filter(
                 required_date__lt=timezone.now(),
-                status__in=['pending', 'confirmed', 'processing', 'picking', 'packed']
+                status__in=Order.ACTIVE_STATUSES
             )
         
         return queryset
@@ -120,25 +144,37 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = OrderCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        try:
-            order = OrderService.create_order(
-                customer_id=serializer.validated_data['customer_id'],
-                items_data=serializer.validated_data['items'],
-                priority=serializer.validated_data.get('priority', 'normal'),
-                required_date=serializer.validated_data.get('required_date'),
-                currency=serializer.validated_data.get('currency', 'USD'),
-                notes=serializer.validated_data.get('notes', ''),
-                user=request.user.username
-            )
-            
-            response_serializer = OrderSerializer(order)
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        order = OrderService.create_order(
+            customer_id=serializer.validated_data['customer_id'],
+            items_data=serializer.validated_data['items'],
+            priority=serializer.validated_data.get('priority', 'normal'),
+            required_date=serializer.validated_data.get('required_date'),
+            currency=serializer.validated_data.get('currency', 'USD'),
+            notes=serializer.validated_data.get('notes', ''),
+            user=request.user.username
+        )
+        
+        response_serializer = OrderSerializer(order)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def ingest(self, request):
+        """Queue an order for batched writing and return its order_id"""
+        serializer = OrderCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        envelope = OrderService.prepare_order_envelope(
+            customer_id=serializer.validated_data['customer_id'],
+            items_data=serializer.validated_data['items'],
+            priority=serializer.validated_data.get('priority', 'normal'),
+            required_date=serializer.validated_data.get('required_date'),
+            currency=serializer.validated_data.get('currency', 'USD'),
+            notes=serializer.validated_data.get('notes', ''),
+            user=request.user.username
+        )
+        order_ingest.publish(envelope)
+        
+        return Response({'order_id': envelope['order_id']}, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['post'])
     def update_status(self, request, order_id=None):
@@ -150,22 +186,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         
-        try:
-            status_record = OrderService.update_order_status(
-                order_id=order.order_id,
-                new_status=serializer.validated_data['status'],
-                user=request.user.username,
-                reason=serializer.validated_data.get('reason', '')
-            )
-            
-            response_serializer = OrderStatusSerializer(status_record)
-            return Response(response_serializer.data)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        status_record = OrderService.update_order_status(
+            order_id=order.order_id,
+            new_status=serializer.validated_data['status'],
+            user=request.user.username,
+            reason=serializer.validated_data.get('reason', '')
+        )
+        
+        response_serializer = OrderStatusSerializer(status_record)
+        return Response(response_serializer.data)
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, order_id=None):
@@ -173,41 +202,27 @@ class OrderViewSet(viewsets.ModelViewSet):
         order = self.get_object()
         reason = request.data.get('reason', 'Order cancelled by user')
         
-        try:
-            status_record = OrderService.cancel_order(
-                order_id=order.order_id,
-                user=request.user.username,
-                reason=reason
-            )
-            
-            response_serializer = OrderStatusSerializer(status_record)
-            return Response(response_serializer.data)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        status_record = OrderService.cancel_order(
+            order_id=order.order_id,
+            user=request.user.username,
+            reason=reason
+        )
+        
+        response_serializer = OrderStatusSerializer(status_record)
+        return Response(response_serializer.data)
     
     @action(detail=True, methods=['post'])
     def create_picking_tasks(self, request, order_id=None):
         """Create picking tasks for an order"""
         order = self.get_object()
         
-        try:
-            picking_tasks = OrderService.create_picking_tasks(
-                order_id=order.order_id,
-                user=request.user.username
-            )
-            
-            serializer = PickingTaskSerializer(picking_tasks, many=True)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        picking_tasks = OrderService.create_picking_tasks(
+            order_id=order.order_id,
+            user=request.user.username
+        )
+        
+        serializer = PickingTaskSerializer(picking_tasks, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['get'])
     def status_history(self, request, order_id=None):
@@ -231,27 +246,30 @@ class OrderViewSet(viewsets.ModelViewSet):
         date_to = request.query_params.get('date_to')
         
         if date_from:
-            date_from = timezone.datetime.fromisoformat(date_from)
+            date_from = _datetime_param(date_from, 'date_from')
         if date_to:
-            date_to = timezone.datetime.fromisoformat(date_to)
+            date_to = _datetime_param(date_to, 'date_to')
         
         stats = OrderService.get_order_statistics(date_from, date_to)
         serializer = OrderReportSerializer(stats)
         return Response(serializer.data)
 
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing order items
     """
-    queryset = OrderItem.objects.all()
+    queryset = OrderItem.objects.select_related('item')
     serializer_class = OrderItemSerializer
     permission_classes = [IsAuthenticated, IsAdminOrWorker]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['order', 'item']
+    filter_backends = [filters.OrderingFilter]
+    filter_map = {'order': 'order_id', 'item': 'item_id'}
     ordering_fields = ['created_at', 'quantity', 'total_price']
     ordering = ['created_at']
     
+    def get_queryset(self):
+        return self.filter_by_query_params(OrderItem.objects.select_related('item'))
+    
     def get_permissions(self):
         """
         Admin: Full CRUD access
@@ -265,15 +283,15 @@ class OrderItemViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class PickingTaskViewSet(viewsets.ModelViewSet):
+class PickingTaskViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing picking tasks
     """
     queryset = PickingTask.objects.all()
     serializer_class = PickingTaskSerializer
     permission_classes = [IsAuthenticated, IsAdminOrWorker]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'assigned_to', 'order', 'location']
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_map = {'status': 'status', 'assigned_to': 'assigned_to', 'order': 'order_id', 'location': 'location_id'}
     search_fields = ['task_id', 'order__order_id', 'order_item__item__name']
     ordering_fields = ['created_at', 'assigned_at', 'completed_at']
     ordering = ['created_at']
@@ -281,16 +299,12 @@ class PickingTaskViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter tasks based on user role and assignment"""
-        queryset = PickingTask.objects.select_related(
-            'order', 'order_item', 'order_item__item', 'location'
-        )
+        queryset = self.filter_by_query_params(PickingTaskSerializer.setup_eager_loading(PickingTask.objects.all()))
         
         # Workers can only see their own assigned tasks or unassigned tasks
-        if hasattr(self.request.user, 'groups') and self.request.user.groups.filter(name='worker').exists():
-            queryset = queryset.filter(
-                models.Q(assigned_to=self.request.user.username) | 
-                models.Q(assigned_to__isnull=True)
-            )
+        if 'worker' in get_group_names(self.request.user):
+            # Unassigned tasks store an empty assignee, never NULL
+            queryset = queryset.filter(assigned_to__in=[self.request.user.username, ''])
         
         return queryset
     
@@ -301,42 +315,28 @@ class PickingTaskViewSet(viewsets.ModelViewSet):
         serializer = PickingTaskAssignSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        try:
-            updated_task = OrderService.assign_picking_task(
-                task_id=task.task_id,
-                assigned_to=serializer.validated_data['assigned_to'],
-                user=request.user.username,
-                notes=serializer.validated_data.get('notes', '')
-            )
-            
-            response_serializer = PickingTaskSerializer(updated_task)
-            return Response(response_serializer.data)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        updated_task = OrderService.assign_picking_task(
+            task_id=task.task_id,
+            assigned_to=serializer.validated_data['assigned_to'],
+            user=request.user.username,
+            notes=serializer.validated_data.get('notes', '')
+        )
+        
+        response_serializer = PickingTaskSerializer(updated_task)
+        return Response(response_serializer.data)
     
     @action(detail=True, methods=['post'])
     def start(self, request, task_id=None):
         """Start a picking task"""
         task = self.get_object()
         
-        try:
-            updated_task = OrderService.start_picking_task(
-                task_id=task.task_id,
-                user=request.user.username
-            )
-            
-            response_serializer = PickingTaskSerializer(updated_task)
-            return Response(response_serializer.data)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        updated_task = OrderService.start_picking_task(
+            task_id=task.task_id,
+            user=request.user.username
+        )
+        
+        response_serializer = PickingTaskSerializer(updated_task)
+        return Response(response_serializer.data)
     
     @action(detail=True, methods=['post'])
     def complete(self, request, task_id=None):
@@ -348,53 +348,47 @@ class PickingTaskViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         
-        try:
-            updated_task = OrderService.complete_picking_task(
-                task_id=task.task_id,
-                quantity_picked=serializer.validated_data['quantity_picked'],
-                user=request.user.username,
-                notes=serializer.validated_data.get('notes', '')
-            )
-            
-            response_serializer = PickingTaskSerializer(updated_task)
-            return Response(response_serializer.data)
-            
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        updated_task = OrderService.complete_picking_task(
+            task_id=task.task_id,
+            quantity_picked=serializer.validated_data['quantity_picked'],
+            user=request.user.username,
+            notes=serializer.validated_data.get('notes', '')
+        )
+        
+        response_serializer = PickingTaskSerializer(updated_task)
+        return Response(response_serializer.data)
     
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
         """Get tasks assigned to current user"""
-        tasks = PickingTask.objects.filter(
+        tasks = PickingTaskSerializer.list_values(PickingTask.objects.filter(
             assigned_to=request.user.username,
             status__in=['assigned', 'in_progress']
-        ).select_related('order', 'order_item', 'order_item__item', 'location')
+        ))
         
-        serializer = PickingTaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return Response(list(tasks))
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending (unassigned) picking tasks"""
-        tasks = PickingTask.objects.filter(
+        tasks = PickingTaskSerializer.list_values(PickingTask.objects.filter(
             status='pending'
-        ).select_related('order', 'order_item', 'order_item__item', 'location')
+        ))
         
-        serializer = PickingTaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return Response(list(tasks))
 
 
-class OrderStatusViewSet(viewsets.ReadOnlyModelViewSet):
+class OrderStatusViewSet(QueryParamFilterMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing order status history
     """
     queryset = OrderStatus.objects.all()
     serializer_class = OrderStatusSerializer
     permission_classes = [IsAuthenticated, IsAdminOrWorker]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['order', 'from_status', 'to_status']
+    filter_backends = [filters.OrderingFilter]
+    filter_map = {'order': 'order_id', 'from_status': 'from_status', 'to_status': 'to_status'}
     ordering_fields = ['timestamp']
     ordering = ['-timestamp']
+    
+    def get_queryset(self):
+        return self.filter_by_query_params(OrderStatus.objects.all())
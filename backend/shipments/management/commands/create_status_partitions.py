@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from shipments.models import ShipmentStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly shipment_status_history partitions, moving in any "
+        "rows already held by the default partition (schedule at least monthly)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3)
+
+    def handle(self, *args, **options):
+        created = ShipmentStatus.create_partitions(months_ahead=options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-15 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliveryattempt',
+            name='attempt_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='priority',
+            field=models.CharField(choices=[('standard', 'Standard'), ('expedited', 'Expedited'), ('next_day', 'Next Day'), ('same_day', 'Same Day')], db_index=True, default='standard', max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='shipped_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['status', '-created_at'], name='shipments_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['carrier', 'status'], name='shipments_carrier_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['destination_country', 'destination_postal_code'], name='shipments_destination_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['estimated_delivery_date'], name='shipments_eta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipmentstatus',
+            index=models.Index(fields=['shipment', '-timestamp'], name='shipment_status_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipmentstatus',
+            index=models.Index(fields=['-timestamp'], name='shipment_status_recent_idx'),
+        ),
+    ]
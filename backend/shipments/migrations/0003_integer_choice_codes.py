@@ -0,0 +1,128 @@
+# Generated by Django 5.2.4 on 2026-10-15 19:20
+
+from django.db import migrations, models
+
+SHIPMENT_STATUSES = [
+    'pending', 'picked_up', 'in_transit', 'out_for_delivery', 'delivered',
+    'failed_delivery', 'returned', 'lost', 'cancelled',
+]
+SHIPMENT_PRIORITIES = ['standard', 'expedited', 'next_day', 'same_day']
+STATUS_SOURCES = ['manual', 'api', 'webhook']
+DELIVERY_OUTCOMES = [
+    'successful', 'failed_no_one_home', 'failed_refused', 'failed_address_issue', 'failed_other',
+]
+
+# (table, column, values, original max_length, nullable); a value's code is
+# its position in the list
+CODED_COLUMNS = [
+    ('shipments', 'status', SHIPMENT_STATUSES, 20, False),
+    ('shipments', 'priority', SHIPMENT_PRIORITIES, 15, False),
+    ('shipment_status_history', 'from_status', SHIPMENT_STATUSES, 20, True),
+    ('shipment_status_history', 'to_status', SHIPMENT_STATUSES, 20, False),
+    ('shipment_status_history', 'source', STATUS_SOURCES, 50, False),
+    ('delivery_attempts', 'outcome', DELIVERY_OUTCOMES, 30, False),
+]
+
+# Constraint names as Django generates them for PositiveSmallIntegerField
+CHECK_CONSTRAINTS = {
+    ('shipments', 'status'): 'shipments_status_3663fb77_check',
+    ('shipments', 'priority'): 'shipments_priority_e83bcfac_check',
+    ('shipment_status_history', 'from_status'): 'shipment_status_history_from_status_b675f44f_check',
+    ('shipment_status_history', 'to_status'): 'shipment_status_history_to_status_72fd1a01_check',
+    ('shipment_status_history', 'source'): 'shipment_status_history_source_b7bdac97_check',
+    ('delivery_attempts', 'outcome'): 'delivery_attempts_outcome_c0f58177_check',
+}
+
+STATUS_CHOICES = [
+    (0, 'Pending'), (1, 'Picked Up'), (2, 'In Transit'), (3, 'Out for Delivery'), (4, 'Delivered'),
+    (5, 'Failed Delivery'), (6, 'Returned'), (7, 'Lost'), (8, 'Cancelled'),
+]
+
+
+def _encode_sql():
+    """
+    Cast each column in place with ALTER COLUMN ... TYPE smallint USING CASE,
+    rewriting each table once. Unknown values map to NULL, so they fail the
+    NOT NULL columns instead of being silently coded; the empty from_status
+    of a shipment's first status event becomes NULL.
+    """
+    statements = ['DROP INDEX IF EXISTS "shipments_priority_e83bcfac_like"']
+    for table, column, values, _, nullable in CODED_COLUMNS:
+        cases = ' '.join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(values))
+        if nullable:
+            statements.append(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" DROP NOT NULL')
+        statements.append(
+            f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE smallint USING CASE "{column}" {cases} END'
+        )
+        statements.append(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{CHECK_CONSTRAINTS[table, column]}" CHECK ("{column}" >= 0)'
+        )
+    return statements
+
+
+def _decode_sql():
+    statements = []
+    for table, column, values, max_length, nullable in CODED_COLUMNS:
+        array = ', '.join(f"'{value}'" for value in values)
+        value = f'(ARRAY[{array}])["{column}" + 1]'
+        if nullable:
+            value = f"COALESCE({value}, '')"
+        statements.append(f'ALTER TABLE "{table}" DROP CONSTRAINT "{CHECK_CONSTRAINTS[table, column]}"')
+        statements.append(
+            f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE varchar({max_length}) USING {value}'
+        )
+        if nullable:
+            statements.append(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET NOT NULL')
+    statements.append(
+        'CREATE INDEX "shipments_priority_e83bcfac_like" ON "shipments" ("priority" varchar_pattern_ops)'
+    )
+    return statements
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        # Django would cast with "column"::smallint, which cannot read the
+        # stored strings, so the database side is written out by hand
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(_encode_sql(), _decode_sql()),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='shipment',
+                    name='status',
+                    field=models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=0),
+                ),
+                migrations.AlterField(
+                    model_name='shipment',
+                    name='priority',
+                    field=models.PositiveSmallIntegerField(choices=[(0, 'Standard'), (1, 'Expedited'), (2, 'Next Day'), (3, 'Same Day')], db_index=True, default=0),
+                ),
+                migrations.AlterField(
+                    model_name='shipmentstatus',
+                    name='from_status',
+                    field=models.PositiveSmallIntegerField(blank=True, choices=STATUS_CHOICES, null=True),
+                ),
+                migrations.AlterField(
+                    model_name='shipmentstatus',
+                    name='to_status',
+                    field=models.PositiveSmallIntegerField(choices=STATUS_CHOICES),
+                ),
+                migrations.AlterField(
+                    model_name='shipmentstatus',
+                    name='source',
+                    field=models.PositiveSmallIntegerField(choices=[(0, 'Manual'), (1, 'API'), (2, 'Webhook')], default=0),
+                ),
+                migrations.AlterField(
+                    model_name='deliveryattempt',
+                    name='outcome',
+                    field=models.PositiveSmallIntegerField(choices=[(0, 'Successful'), (1, 'Failed - No One Home'), (2, 'Failed - Refused'), (3, 'Failed - Address Issue'), (4, 'Failed - Other')]),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-15 19:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0003_integer_choice_codes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shipmentstatus',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
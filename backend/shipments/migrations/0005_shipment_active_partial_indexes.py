@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0004_shipment_status_explicit_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(('status__in', [1, 2, 3])), fields=['estimated_delivery_date'], name='ship_active_eta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(('status', 0)), fields=['created_at'], name='ship_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.4 on 2026-10-15 20:10
+
+import django.core.validators
+import django.db.models.expressions
+from decimal import Decimal
+from django.db import migrations, models
+
+# "LxWxH" text in cm, tolerating spaces, a "cm" unit and × or * separators
+SPLIT_DIMENSIONS = r"""
+    WITH parts AS (
+        SELECT id, regexp_split_to_array(regexp_replace(lower(dimensions), '\s|cm', '', 'g'), '[x×*]') AS parts
+        FROM shipments
+    ),
+    parsed AS (
+        SELECT id,
+               CASE WHEN parts[1] ~ '^[0-9]{1,6}(\.[0-9]+)?$' THEN round(parts[1]::numeric, 2) END AS length_cm,
+               CASE WHEN parts[2] ~ '^[0-9]{1,6}(\.[0-9]+)?$' THEN round(parts[2]::numeric, 2) END AS width_cm,
+               CASE WHEN parts[3] ~ '^[0-9]{1,6}(\.[0-9]+)?$' THEN round(parts[3]::numeric, 2) END AS height_cm
+        FROM parts
+        WHERE array_length(parts, 1) = 3
+    )
+    UPDATE shipments
+    SET length_cm = parsed.length_cm,
+        width_cm = parsed.width_cm,
+        height_cm = parsed.height_cm
+    FROM parsed
+    WHERE shipments.id = parsed.id
+"""
+
+# Unparsed rows would lose their dimensions, so stop and name them instead
+CHECK_DIMENSIONS = r"""
+    DO $$
+    DECLARE
+        unparsed text;
+    BEGIN
+        SELECT string_agg(format('%s %L', id, dimensions), ', ' ORDER BY id) INTO unparsed
+        FROM (
+            SELECT id, dimensions FROM shipments
+            WHERE length_cm IS NULL OR width_cm IS NULL OR height_cm IS NULL
+            ORDER BY id
+            LIMIT 20
+        ) AS rows;
+        IF unparsed IS NOT NULL THEN
+            RAISE EXCEPTION 'Shipment dimensions are not "LxWxH" in cm, fix them and migrate again: %', unparsed;
+        END IF;
+    END $$;
+"""
+
+JOIN_DIMENSIONS = "UPDATE shipments SET dimensions = length_cm || 'x' || width_cm || 'x' || height_cm"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0005_shipment_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='length_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='width_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='height_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        # Nullable while removed, so migrating back can re-add the column to
+        # existing rows before JOIN_DIMENSIONS fills it in
+        migrations.AlterField(
+            model_name='shipment',
+            name='dimensions',
+            field=models.CharField(help_text='LxWxH in cm', max_length=100, null=True),
+        ),
+        migrations.RunSQL(SPLIT_DIMENSIONS, JOIN_DIMENSIONS),
+        migrations.RunSQL(CHECK_DIMENSIONS, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='shipment',
+            name='length_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='width_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='height_cm',
+            field=models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))]),
+        ),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='dimensions',
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='volume_cm3',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('length_cm'), '*', models.F('width_cm')), '*', models.F('height_cm')), output_field=models.DecimalField(decimal_places=6, max_digits=24)),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-15 20:25
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+TO_MINOR_UNITS = """
+    UPDATE shipments
+    SET shipping_cost_cents = round(shipping_cost * 100)::bigint,
+        insurance_value_cents = round(insurance_value * 100)::bigint,
+        weight_g = round(weight * 1000)::integer
+"""
+
+FROM_MINOR_UNITS = """
+    UPDATE shipments
+    SET shipping_cost = shipping_cost_cents / 100.0,
+        insurance_value = insurance_value_cents / 100.0,
+        weight = weight_g / 1000.0
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0006_shipment_dimension_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='shipping_cost_cents',
+            field=models.BigIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='insurance_value_cents',
+            field=models.BigIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='weight_g',
+            field=models.PositiveIntegerField(default=0, validators=[django.core.validators.MinValueValidator(1)]),
+            preserve_default=False,
+        ),
+        # Nullable while removed, so migrating back can re-add the columns to
+        # existing rows before FROM_MINOR_UNITS fills them in
+        migrations.AlterField(
+            model_name='shipment',
+            name='shipping_cost',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))]),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='weight',
+            field=models.DecimalField(decimal_places=3, max_digits=8, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.001'))]),
+        ),
+        migrations.RunSQL(TO_MINOR_UNITS, FROM_MINOR_UNITS),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='shipping_cost',
+        ),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='insurance_value',
+        ),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='weight',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-15 20:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('shipments', '0007_shipment_integer_money_and_weight'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='shipment',
+            index=django.contrib.postgres.indexes.HashIndex(fields=['tracking_number'], name='shipments_tracking_hash'),
+        ),
+    ]
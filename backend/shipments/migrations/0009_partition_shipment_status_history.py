@@ -0,0 +1,127 @@
+# Generated by Django 5.2.4 on 2026-10-15 20:55
+
+from django.db import migrations
+
+# Constraint names follow Django's, so both directions leave the table in the
+# shape earlier migrations expect.
+COLUMNS = """
+        shipment_id bigint NOT NULL
+            CONSTRAINT shipment_status_history_shipment_id_07d5af84_fk_shipments_id
+            REFERENCES shipments (id) DEFERRABLE INITIALLY DEFERRED,
+        from_status smallint NULL
+            CONSTRAINT shipment_status_history_from_status_b675f44f_check CHECK (from_status >= 0),
+        to_status smallint NOT NULL
+            CONSTRAINT shipment_status_history_to_status_72fd1a01_check CHECK (to_status >= 0),
+        location varchar(255) NOT NULL,
+        notes text NOT NULL,
+        timestamp timestamp with time zone NOT NULL,
+        source smallint NOT NULL
+            CONSTRAINT shipment_status_history_source_b7bdac97_check CHECK (source >= 0)
+"""
+
+# The primary key of a partitioned table must include the partition key, so
+# the table is rebuilt with PRIMARY KEY (id, timestamp). Monthly partitions
+# cover existing rows and the next three months; later months are created by
+# manage.py create_status_partitions.
+#
+# Copied rows are checked against shipments straight away: deferred checks
+# left pending in the transaction would block building the indexes.
+PARTITION_TABLE = """
+    ALTER TABLE shipment_status_history RENAME TO shipment_status_history_old;
+    ALTER INDEX shipment_status_history_pkey RENAME TO shipment_status_history_old_pkey;
+    ALTER SEQUENCE shipment_status_history_id_seq RENAME TO shipment_status_history_old_id_seq;
+    DROP INDEX shipment_status_timeline_idx;
+    DROP INDEX shipment_status_recent_idx;
+
+    CREATE TABLE shipment_status_history (
+        id bigint GENERATED BY DEFAULT AS IDENTITY,
+        {columns},
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+
+    CREATE TABLE shipment_status_history_default PARTITION OF shipment_status_history DEFAULT;
+
+    DO $$
+    DECLARE
+        month date;
+    BEGIN
+        FOR month IN
+            SELECT generate_series(
+                date_trunc('month', LEAST(COALESCE(MIN(timestamp), now()), now())),
+                date_trunc('month', now()) + interval '3 months',
+                interval '1 month'
+            )::date
+            FROM shipment_status_history_old
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF shipment_status_history FOR VALUES FROM (%L) TO (%L)',
+                'shipment_status_history_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                month, month + interval '1 month'
+            );
+        END LOOP;
+    END $$;
+
+    SET CONSTRAINTS ALL IMMEDIATE;
+    INSERT INTO shipment_status_history
+        (id, shipment_id, from_status, to_status, location, notes, timestamp, source)
+    SELECT id, shipment_id, from_status, to_status, location, notes, timestamp, source
+    FROM shipment_status_history_old;
+
+    DROP TABLE shipment_status_history_old;
+
+    SELECT setval(
+        pg_get_serial_sequence('shipment_status_history', 'id'),
+        COALESCE((SELECT MAX(id) FROM shipment_status_history), 0) + 1,
+        false
+    );
+
+    CREATE INDEX shipment_status_timeline_idx ON shipment_status_history (shipment_id, timestamp DESC);
+    CREATE INDEX shipment_status_recent_idx ON shipment_status_history (timestamp DESC);
+""".format(columns=COLUMNS.strip())
+
+UNPARTITION_TABLE = """
+    ALTER TABLE shipment_status_history RENAME TO shipment_status_history_partitioned;
+    ALTER INDEX shipment_status_history_pkey RENAME TO shipment_status_history_partitioned_pkey;
+    ALTER SEQUENCE shipment_status_history_id_seq RENAME TO shipment_status_history_partitioned_id_seq;
+    DROP INDEX shipment_status_timeline_idx;
+    DROP INDEX shipment_status_recent_idx;
+
+    CREATE TABLE shipment_status_history (
+        id bigint GENERATED BY DEFAULT AS IDENTITY
+            CONSTRAINT shipment_status_history_pkey PRIMARY KEY,
+        {columns}
+    );
+
+    SET CONSTRAINTS ALL IMMEDIATE;
+    INSERT INTO shipment_status_history
+        (id, shipment_id, from_status, to_status, location, notes, timestamp, source)
+    SELECT id, shipment_id, from_status, to_status, location, notes, timestamp, source
+    FROM shipment_status_history_partitioned;
+
+    DROP TABLE shipment_status_history_partitioned CASCADE;
+
+    SELECT setval(
+        pg_get_serial_sequence('shipment_status_history', 'id'),
+        COALESCE((SELECT MAX(id) FROM shipment_status_history), 0) + 1,
+        false
+    );
+
+    CREATE INDEX shipment_status_history_shipment_id_07d5af84 ON shipment_status_history (shipment_id);
+    CREATE INDEX shipment_status_timeline_idx ON shipment_status_history (shipment_id, timestamp DESC);
+    CREATE INDEX shipment_status_recent_idx ON shipment_status_history (timestamp DESC);
+""".format(columns=COLUMNS.strip())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0008_shipment_tracking_hash_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_TABLE, UNPARTITION_TABLE),
+        migrations.AlterModelOptions(
+            name='shipmentstatus',
+            options={'managed': False, 'ordering': ['-timestamp']},
+        ),
+    ]
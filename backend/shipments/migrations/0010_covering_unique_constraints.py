@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-15 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0009_partition_shipment_status_history'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='shipmentitem',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='deliveryattempt',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='shipmentitem',
+            constraint=models.UniqueConstraint(fields=('shipment', 'order_item'), include=('quantity_shipped',), name='uniq_shipment_item'),
+        ),
+        migrations.AddConstraint(
+            model_name='deliveryattempt',
+            constraint=models.UniqueConstraint(fields=('shipment', 'attempt_number'), include=('outcome', 'attempt_date'), name='uniq_delivery_attempt'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-15 21:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0010_covering_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='is_in_transit_db',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('status__in', [1, 2, 3])), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(('is_in_transit_db', True)), fields=['is_in_transit_db'], name='in_transit_idx'),
+        ),
+    ]
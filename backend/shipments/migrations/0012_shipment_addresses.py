@@ -0,0 +1,122 @@
+# Generated by Django 5.2.4 on 2026-10-15 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# hash matches Address.compute_hash: sha256 of country, postal code and text
+# joined by the unit separator (0x1f)
+ADDRESS_HASH = "sha256(convert_to({country} || chr(31) || {postal_code} || chr(31) || {text}, 'UTF8'))"
+
+ORIGIN_HASH = ADDRESS_HASH.format(country="''", postal_code="''", text='s.origin_address_text')
+DESTINATION_HASH = ADDRESS_HASH.format(
+    country='s.destination_country', postal_code='s.destination_postal_code', text='s.destination_address_text'
+)
+
+POPULATE_ADDRESSES = f"""
+    INSERT INTO addresses (full_text, country, postal_code, hash)
+    SELECT DISTINCT s.origin_address_text, '', '', {ORIGIN_HASH}
+    FROM shipments s
+    ON CONFLICT (hash) DO NOTHING;
+
+    INSERT INTO addresses (full_text, country, postal_code, hash)
+    SELECT DISTINCT s.destination_address_text, s.destination_country, s.destination_postal_code, {DESTINATION_HASH}
+    FROM shipments s
+    ON CONFLICT (hash) DO NOTHING;
+
+    UPDATE shipments s
+    SET origin_address_id = a.id
+    FROM addresses a
+    WHERE a.hash = {ORIGIN_HASH};
+
+    UPDATE shipments s
+    SET destination_address_id = a.id
+    FROM addresses a
+    WHERE a.hash = {DESTINATION_HASH};
+
+    -- Check the new foreign keys now: ALTER TABLE refuses to run on shipments
+    -- while deferred checks are still pending
+    SET CONSTRAINTS ALL IMMEDIATE;
+"""
+
+RESTORE_ADDRESS_TEXT = """
+    UPDATE shipments s
+    SET origin_address_text = origin.full_text,
+        destination_address_text = destination.full_text
+    FROM addresses origin, addresses destination
+    WHERE origin.id = s.origin_address_id
+      AND destination.id = s.destination_address_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0011_shipment_is_in_transit_db'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_text', models.TextField()),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('postal_code', models.CharField(blank=True, max_length=20)),
+                ('hash', models.BinaryField(editable=False, max_length=32, unique=True)),
+            ],
+            options={
+                'db_table': 'addresses',
+            },
+        ),
+        migrations.RenameField(
+            model_name='shipment',
+            old_name='origin_address',
+            new_name='origin_address_text',
+        ),
+        migrations.RenameField(
+            model_name='shipment',
+            old_name='destination_address',
+            new_name='destination_address_text',
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='origin_address',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='shipments.address'),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='destination_address',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='shipments.address'),
+        ),
+        # Reversed, the text columns come back empty until RESTORE_ADDRESS_TEXT
+        # runs, so they may only be NOT NULL again after it
+        migrations.AlterField(
+            model_name='shipment',
+            name='origin_address_text',
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='destination_address_text',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunSQL(POPULATE_ADDRESSES, RESTORE_ADDRESS_TEXT),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='origin_address_text',
+        ),
+        migrations.RemoveField(
+            model_name='shipment',
+            name='destination_address_text',
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='origin_address',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='shipments.address'),
+        ),
+        migrations.AlterField(
+            model_name='shipment',
+            name='destination_address',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='shipments.address'),
+        ),
+    ]
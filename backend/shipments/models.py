@@ -1,6 +1,13 @@
-from django.db import models
+from django.contrib.postgres.indexes import HashIndex
+from django.db import connection, models, transaction
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from django.utils.functional import cached_property
+from datetime import timedelta
 from decimal import Decimal
+from functools import lru_cache
+import hashlib
+import string
 
 
 class Carrier(models.Model):
@@ -17,80 +24,304 @@ class Carrier(models.Model):
     def __str__(self):
         return f"{self.code} - {self.name}"
 
+    @classmethod
+    def get_cached(cls, pk):
+        """
+        Carrier by primary key, cached in-process. Carriers change rarely;
+        saving or deleting one clears this process's cache.
+        """
+        return _get_cached_carrier(pk)
+
+    def save(self, *args, **kwargs):
+        # The template may have changed, so rebuild the formatter on next use
+        self.__dict__.pop('_tracking_formatter', None)
+        super().save(*args, **kwargs)
+
+    @cached_property
+    def _tracking_formatter(self):
+        # Specialised to this template: joining its literal parts, with {{ and }}
+        # already unescaped, around the tracking number skips format string
+        # parsing on every call. Other fields or format specs use str.format.
+        template = self.tracking_url_template
+        parts = ['']
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            parts[-1] += literal
+            if field is None:
+                continue
+            if field != 'tracking_number' or format_spec or conversion:
+                return lambda tracking_number: template.format(tracking_number=tracking_number)
+            parts.append('')
+        return lambda tracking_number: tracking_number.join(parts)
+
     def get_tracking_url(self, tracking_number):
         if self.tracking_url_template and tracking_number:
-            return self.tracking_url_template.format(tracking_number=tracking_number)
+            return self._tracking_formatter(tracking_number)
         return None
 
 
+@lru_cache(maxsize=256)
+def _get_cached_carrier(pk):
+    return Carrier.objects.get(pk=pk)
+
+
+class AddressManager(models.Manager):
+    def get_or_create_address(self, full_text, country='', postal_code=''):
+        """Shared Address row for the given text, created on first use"""
+        address, _ = self.get_or_create(
+            hash=Address.compute_hash(full_text, country, postal_code),
+            defaults={'full_text': full_text, 'country': country, 'postal_code': postal_code}
+        )
+        return address
+
+
+class Address(models.Model):
+    """
+    Deduplicated shipping address. Warehouses and repeat customers appear on
+    many shipments, which reference one row instead of repeating the text.
+    """
+    full_text = models.TextField()
+    country = models.CharField(max_length=100, blank=True)
+    postal_code = models.CharField(max_length=20, blank=True)
+    hash = models.BinaryField(max_length=32, unique=True, editable=False)
+
+    objects = AddressManager()
+
+    class Meta:
+        db_table = 'addresses'
+
+    def __str__(self):
+        return self.full_text
+
+    @staticmethod
+    def compute_hash(full_text, country='', postal_code=''):
+        # Must match the SQL used to populate addresses in migration 0012
+        return hashlib.sha256(f"{country}\x1f{postal_code}\x1f{full_text}".encode()).digest()
+
+
+class ShipmentQuerySet(models.QuerySet):
+    def active(self):
+        """Shipments in transit, served by the ship_active_eta_idx partial index"""
+        return self.filter(status__in=Shipment.IN_TRANSIT_STATUSES)
+
+    def pending(self):
+        """Shipments not yet picked up, served by the ship_pending_idx partial index"""
+        return self.filter(status=Shipment.Status.PENDING)
+
+    def for_list(self):
+        """
+        Load only the columns shown in shipment lists. The carrier and order
+        keys stay in the projection because the default manager joins them.
+        """
+        return self.only(
+            'id', 'shipment_id', 'tracking_number', 'status', 'priority', 'carrier', 'order',
+            'created_at', 'estimated_delivery_date'
+        )
+
+    def with_addresses(self):
+        """Join the origin and destination addresses"""
+        return self.select_related('origin_address', 'destination_address')
+
+    def delivered_with_dates(self):
+        """Shipments with both a shipped and an actual delivery date"""
+        return self.filter(shipped_date__isnull=False, actual_delivery_date__isnull=False)
+
+    def delivery_durations(self, chunk_size=5000):
+        """Stream (id, shipped_date, actual_delivery_date) tuples for delivered shipments"""
+        return self.delivered_with_dates().order_by().values_list(
+            'id', 'shipped_date', 'actual_delivery_date'
+        ).iterator(chunk_size=chunk_size)
+
+    def average_delivery_time(self):
+        """Mean time from shipping to delivery as a timedelta, computed in SQL"""
+        return self.delivered_with_dates().aggregate(
+            average=models.Avg(models.F('actual_delivery_date') - models.F('shipped_date'))
+        )['average']
+
+    def with_items(self):
+        """Prefetch the shipped order items and their inventory items in one query"""
+        # The parent shipment is already loaded, so drop it from the default join
+        items = ShipmentItem.objects.select_related(None).select_related('order_item__item')
+        return self.prefetch_related(models.Prefetch('shipment_items', queryset=items))
+
+
+class ShipmentManager(models.Manager.from_queryset(ShipmentQuerySet)):
+    def get_queryset(self):
+        # __str__ and tracking_url read the carrier, list views the order
+        return super().get_queryset().select_related('carrier', 'order')
+
+
+class ShipmentRelatedManager(models.Manager):
+    def get_queryset(self):
+        # __str__ of status history and delivery attempts reads the shipment
+        return super().get_queryset().select_related('shipment')
+
+
+class ShipmentStatusManager(ShipmentRelatedManager):
+    BULK_BATCH_SIZE = 1000
+
+    def bulk_record(self, events):
+        """
+        Write status events in bulk. Each event is a dict of ShipmentStatus
+        field values and should carry the time the event arrived as timestamp.
+        """
+        return self.bulk_create([self.model(**event) for event in events], batch_size=self.BULK_BATCH_SIZE)
+
+    def for_shipments(self, shipment_ids):
+        """Status history of several shipments in one query, newest first"""
+        return self.filter(shipment_id__in=shipment_ids).order_by('shipment_id', '-timestamp')
+
+
+class ShipmentItemManager(models.Manager):
+    def get_queryset(self):
+        # __str__ reads the shipment and the ordered item's name
+        return super().get_queryset().select_related('shipment', 'order_item__item')
+
+    def bulk_attach(self, shipment, order_item_quantities):
+        """
+        Add (order_item, quantity_shipped) pairs to a shipment with batched
+        INSERTs. Items already on the shipment are left unchanged.
+        """
+        return self.bulk_create(
+            [
+                self.model(shipment=shipment, order_item=order_item, quantity_shipped=quantity)
+                for order_item, quantity in order_item_quantities
+            ],
+            batch_size=500,
+            ignore_conflicts=True
+        )
+
+
+class DeliveryAttemptManager(ShipmentRelatedManager):
+    def bulk_import(self, attempts):
+        """
+        Write delivery attempts from a carrier manifest with batched INSERTs.
+        Each attempt is a dict of DeliveryAttempt field values; attempts
+        already recorded for a shipment are skipped.
+        """
+        return self.bulk_create(
+            [self.model(**attempt) for attempt in attempts], batch_size=500, ignore_conflicts=True
+        )
+
+
 class Shipment(models.Model):
-    STATUS_CHOICES = [
-        ('pending', 'Pending'),
-        ('picked_up', 'Picked Up'),
-        ('in_transit', 'In Transit'),
-        ('out_for_delivery', 'Out for Delivery'),
-        ('delivered', 'Delivered'),
-        ('failed_delivery', 'Failed Delivery'),
-        ('returned', 'Returned'),
-        ('lost', 'Lost'),
-        ('cancelled', 'Cancelled'),
-    ]
-
-    PRIORITY_CHOICES = [
-        ('standard', 'Standard'),
-        ('expedited', 'Expedited'),
-        ('next_day', 'Next Day'),
-        ('same_day', 'Same Day'),
-    ]
+    class Status(models.IntegerChoices):
+        PENDING = 0, 'Pending'
+        PICKED_UP = 1, 'Picked Up'
+        IN_TRANSIT = 2, 'In Transit'
+        OUT_FOR_DELIVERY = 3, 'Out for Delivery'
+        DELIVERED = 4, 'Delivered'
+        FAILED_DELIVERY = 5, 'Failed Delivery'
+        RETURNED = 6, 'Returned'
+        LOST = 7, 'Lost'
+        CANCELLED = 8, 'Cancelled'
+
+    class Priority(models.IntegerChoices):
+        STANDARD = 0, 'Standard'
+        EXPEDITED = 1, 'Expedited'
+        NEXT_DAY = 2, 'Next Day'
+        SAME_DAY = 3, 'Same Day'
+
+    IN_TRANSIT_STATUSES = frozenset({Status.PICKED_UP, Status.IN_TRANSIT, Status.OUT_FOR_DELIVERY})
     
     shipment_id = models.CharField(max_length=50, unique=True)
     order = models.ForeignKey('orders.Order', on_delete=models.PROTECT, related_name='shipments')
     carrier = models.ForeignKey(Carrier, on_delete=models.PROTECT)
     tracking_number = models.CharField(max_length=100, unique=True)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    priority = models.CharField(max_length=15, choices=PRIORITY_CHOICES, default='standard')
+    status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.PENDING)
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.STANDARD, db_index=True)
+    is_in_transit_db = models.GeneratedField(
+        expression=models.Q(status__in=sorted(IN_TRANSIT_STATUSES)),
+        output_field=models.BooleanField(),
+        db_persist=True
+    )
     
     # Shipping details
-    shipping_cost = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.00'))])
-    weight = models.DecimalField(max_digits=8, decimal_places=3, validators=[MinValueValidator(Decimal('0.001'))])
-    dimensions = models.CharField(max_length=100, help_text="LxWxH in cm")
+    # Money in cents and weight in grams, stored as integers
+    shipping_cost_cents = models.BigIntegerField(validators=[MinValueValidator(0)])
+    weight_g = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    length_cm = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    width_cm = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    height_cm = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    volume_cm3 = models.GeneratedField(
+        expression=models.F('length_cm') * models.F('width_cm') * models.F('height_cm'),
+        output_field=models.DecimalField(max_digits=24, decimal_places=6),
+        db_persist=True
+    )
     
     # Addresses
-    origin_address = models.TextField()
-    destination_address = models.TextField()
+    origin_address = models.ForeignKey(Address, on_delete=models.PROTECT, related_name='+')
+    destination_address = models.ForeignKey(Address, on_delete=models.PROTECT, related_name='+')
     destination_country = models.CharField(max_length=100)
     destination_postal_code = models.CharField(max_length=20)
     
     # Dates
-    shipped_date = models.DateTimeField(null=True, blank=True)
+    shipped_date = models.DateTimeField(null=True, blank=True, db_index=True)
     estimated_delivery_date = models.DateTimeField(null=True, blank=True)
     actual_delivery_date = models.DateTimeField(null=True, blank=True)
     
     # Additional info
     signature_required = models.BooleanField(default=False)
-    insurance_value = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    insurance_value_cents = models.BigIntegerField(default=0, validators=[MinValueValidator(0)])
     special_instructions = models.TextField(blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShipmentManager()
+
     class Meta:
         db_table = 'shipments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='shipments_status_created_idx'),
+            models.Index(fields=['carrier', 'status'], name='shipments_carrier_status_idx'),
+            models.Index(fields=['destination_country', 'destination_postal_code'], name='shipments_destination_idx'),
+            models.Index(fields=['estimated_delivery_date'], name='shipments_eta_idx'),
+            # Partial indexes over the few shipments still moving; the predicates
+            # are Status codes and must match ShipmentQuerySet.active() and pending()
+            models.Index(
+                fields=['estimated_delivery_date'], name='ship_active_eta_idx',
+                condition=models.Q(status__in=[1, 2, 3]),
+            ),
+            models.Index(fields=['created_at'], name='ship_pending_idx', condition=models.Q(status=0)),
+            models.Index(fields=['is_in_transit_db'], name='in_transit_idx', condition=models.Q(is_in_transit_db=True)),
+            # Webhooks only look shipments up by exact tracking number
+            HashIndex(fields=['tracking_number'], name='shipments_tracking_hash'),
+        ]
 
     def __str__(self):
         return f"Shipment {self.shipment_id} - {self.tracking_number}"
 
     @property
     def is_delivered(self):
-        return self.status == 'delivered'
+        return self.status == self.Status.DELIVERED
 
     @property
     def is_in_transit(self):
-        return self.status in ['picked_up', 'in_transit', 'out_for_delivery']
+        # Same predicate as is_in_transit_db, but also correct before the row is saved
+        return self.status in self.IN_TRANSIT_STATUSES
+
+    @property
+    def shipping_cost(self):
+        return Decimal(self.shipping_cost_cents).scaleb(-2)
+
+    @property
+    def insurance_value(self):
+        return Decimal(self.insurance_value_cents).scaleb(-2)
+
+    @property
+    def weight(self):
+        """Weight in kg"""
+        return Decimal(self.weight_g).scaleb(-3)
+
+    @property
+    def dimensions(self):
+        """Deprecated "LxWxH" string in cm; use length_cm, width_cm and height_cm"""
+        return f"{self.length_cm}x{self.width_cm}x{self.height_cm}"
 
     @property
     def delivery_performance_days(self):
+        # Per shipment only; use Shipment.objects.average_delivery_time() for aggregates
         if self.shipped_date and self.actual_delivery_date:
             return (self.actual_delivery_date - self.shipped_date).days
         return None
@@ -104,53 +335,116 @@ class ShipmentItem(models.Model):
     shipment = models.ForeignKey(Shipment, on_delete=models.CASCADE, related_name='shipment_items')
     order_item = models.ForeignKey('orders.OrderItem', on_delete=models.PROTECT)
     quantity_shipped = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+
+    objects = ShipmentItemManager()
     
     class Meta:
         db_table = 'shipment_items'
-        unique_together = ['shipment', 'order_item']
+        constraints = [
+            # Covers quantity_shipped so item lists are served by index-only scans
+            models.UniqueConstraint(
+                fields=['shipment', 'order_item'], include=['quantity_shipped'], name='uniq_shipment_item'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.shipment.shipment_id} - {self.order_item.item.name} x{self.quantity_shipped}"
 
 
 class ShipmentStatus(models.Model):
+    class Source(models.IntegerChoices):
+        MANUAL = 0, 'Manual'
+        API = 1, 'API'
+        WEBHOOK = 2, 'Webhook'
+
     shipment = models.ForeignKey(Shipment, on_delete=models.CASCADE, related_name='status_history')
-    from_status = models.CharField(max_length=20, blank=True)
-    to_status = models.CharField(max_length=20)
+    from_status = models.PositiveSmallIntegerField(choices=Shipment.Status.choices, null=True, blank=True)
+    to_status = models.PositiveSmallIntegerField(choices=Shipment.Status.choices)
     location = models.CharField(max_length=255, blank=True)
     notes = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
-    source = models.CharField(max_length=50, default='manual', help_text="manual, api, webhook")
+    timestamp = models.DateTimeField(default=timezone.now)
+    source = models.PositiveSmallIntegerField(choices=Source.choices, default=Source.MANUAL)
+
+    objects = ShipmentStatusManager()
 
     class Meta:
+        # Range partitioned by month on timestamp, see migration 0009
+        managed = False
         db_table = 'shipment_status_history'
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['shipment', '-timestamp'], name='shipment_status_timeline_idx'),
+            models.Index(fields=['-timestamp'], name='shipment_status_recent_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.shipment.tracking_number}: {self.from_status} → {self.to_status}"
+        return f"{self.shipment.tracking_number}: {self.get_from_status_display()} → {self.get_to_status_display()}"
+
+    @classmethod
+    def create_partitions(cls, months_ahead=3):
+        """
+        Create the monthly partitions from the current month through
+        months_ahead months from now. Returns the names of new partitions.
+        Rows outside every monthly partition land in the default partition;
+        any that fall in a new month are moved into its partition, since
+        Postgres refuses to attach a range the default partition still holds.
+        """
+        table = cls._meta.db_table
+        month = timezone.now().date().replace(day=1)
+        created = []
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for _ in range(months_ahead + 1):
+                next_month = (month + timedelta(days=32)).replace(day=1)
+                partition = f"{table}_y{month:%Y}m{month:%m}"
+                cursor.execute("SELECT to_regclass(%s)", [partition])
+                if cursor.fetchone()[0] is None:
+                    cursor.execute(
+                        f"CREATE TEMPORARY TABLE {partition}_moved ON COMMIT DROP AS "
+                        f"WITH moved AS (DELETE FROM {table}_default "
+                        f"WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+                        f"SELECT * FROM moved",
+                        [month, next_month],
+                    )
+                    cursor.execute(
+                        f"CREATE TABLE {partition} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+                    )
+                    cursor.execute(f"INSERT INTO {table} SELECT * FROM {partition}_moved")
+                    cursor.execute(f"DROP TABLE {partition}_moved")
+                    created.append(partition)
+                month = next_month
+
+        return created
 
 
 class DeliveryAttempt(models.Model):
-    OUTCOME_CHOICES = [
-        ('successful', 'Successful'),
-        ('failed_no_one_home', 'Failed - No One Home'),
-        ('failed_refused', 'Failed - Refused'),
-        ('failed_address_issue', 'Failed - Address Issue'),
-        ('failed_other', 'Failed - Other'),
-    ]
+    class Outcome(models.IntegerChoices):
+        SUCCESSFUL = 0, 'Successful'
+        FAILED_NO_ONE_HOME = 1, 'Failed - No One Home'
+        FAILED_REFUSED = 2, 'Failed - Refused'
+        FAILED_ADDRESS_ISSUE = 3, 'Failed - Address Issue'
+        FAILED_OTHER = 4, 'Failed - Other'
     
     shipment = models.ForeignKey(Shipment, on_delete=models.CASCADE, related_name='delivery_attempts')
     attempt_number = models.PositiveIntegerField()
-    attempt_date = models.DateTimeField()
-    outcome = models.CharField(max_length=30, choices=OUTCOME_CHOICES)
+    attempt_date = models.DateTimeField(db_index=True)
+    outcome = models.PositiveSmallIntegerField(choices=Outcome.choices)
     notes = models.TextField(blank=True)
     signature = models.CharField(max_length=255, blank=True)
     photo_proof_url = models.URLField(blank=True)
+
+    objects = DeliveryAttemptManager()
     
     class Meta:
         db_table = 'delivery_attempts'
-        unique_together = ['shipment', 'attempt_number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['shipment', 'attempt_number'], include=['outcome', 'attempt_date'],
+                name='uniq_delivery_attempt'
+            ),
+        ]
         ordering = ['attempt_number']
 
     def __str__(self):
-        return f"{self.shipment.tracking_number} - Attempt {self.attempt_number}: {self.outcome}"
+        return f"{self.shipment.tracking_number} - Attempt {self.attempt_number}: {self.get_outcome_display()}"
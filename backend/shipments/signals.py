@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Carrier, _get_cached_carrier
+
+
+@receiver([post_save, post_delete], sender=Carrier)
+def invalidate_cached_carriers(sender, **kwargs):
+    _get_cached_carrier.cache_clear()
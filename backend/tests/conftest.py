@@ -1,12 +1,29 @@
 """
 Test configuration and fixtures for the warehouse management system
 """
+import factory
 import pytest
+from decimal import Decimal
+from django.conf import settings
 from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_save, pre_save
 from django.test import Client
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from inventory.models import Category, InventoryMovement, Item, Location, StockLevel, Supplier
+
+
+def pytest_configure(config):
+    """
+    Hash test passwords with a single MD5 round instead of PBKDF2; the
+    session users and the login tests are the only places that hash
+    """
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 
 @pytest.fixture(scope='session')
 def django_db_setup(django_db_setup, django_db_blocker):
@@ -14,11 +31,116 @@ def django_db_setup(django_db_setup, django_db_blocker):
     Database setup for tests
     """
     with django_db_blocker.unblock():
+        _skip_durability(connection)
+        
         # Create user groups
         Group.objects.get_or_create(name='admin')
         Group.objects.get_or_create(name='worker')
 
 
+def _skip_durability(connection):
+    """
+    Test data is thrown away, so commits do not wait for the WAL flush and
+    tables skip the WAL entirely. Postgres only lets a table become unlogged
+    once every table referencing it is unlogged, so passes repeat until no
+    more tables can be converted; the partitioned status table and anything
+    it references stay logged.
+    """
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER DATABASE {quote_name(connection.settings_dict['NAME'])} SET synchronous_commit TO off")
+        cursor.execute("SET synchronous_commit TO off")
+        cursor.execute(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND relpersistence = 'p' AND relnamespace = 'public'::regnamespace"
+        )
+        pending = [table for table, in cursor.fetchall()]
+        
+        while pending:
+            remaining = []
+            for table in pending:
+                try:
+                    with transaction.atomic():
+                        cursor.execute(f"ALTER TABLE {quote_name(table)} SET UNLOGGED")
+                except DatabaseError:
+                    remaining.append(table)
+            if len(remaining) == len(pending):
+                break
+            pending = remaining
+
+
+class Migrator:
+    """
+    Applies migrations to a scratch database, so tests can seed rows under an
+    old schema and check how later migrations convert them
+    """
+    
+    def __init__(self, alias):
+        self.alias = alias
+        self.connection = connections[alias]
+    
+    def migrate(self, app_label, migration_name):
+        """
+        Migrate app_label forwards or backwards to migration_name and return
+        the historical models at that point
+        """
+        executor = MigrationExecutor(self.connection)
+        target = [(app_label, migration_name)]
+        executor.migrate(target)
+        return executor.loader.project_state(target).apps
+    
+    def execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            if cursor.description:
+                return cursor.fetchall()
+
+
+@pytest.fixture
+def migrator(django_db_setup, django_db_blocker):
+    """
+    Migrator on an empty scratch database, dropped after the test. The shared
+    test database stays at the latest migration.
+    """
+    alias = 'migrations'
+    name = f"{connection.settings_dict['NAME']}_migrations"
+    quoted_name = connection.ops.quote_name(name)
+    
+    with django_db_blocker.unblock():
+        with connection._nodb_cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {quoted_name}")
+            cursor.execute(f"CREATE DATABASE {quoted_name}")
+        connections.settings[alias] = {**connection.settings_dict, 'NAME': name}
+        try:
+            yield Migrator(alias)
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+            with connection._nodb_cursor() as cursor:
+                cursor.execute(f"DROP DATABASE {quoted_name}")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache so cached responses do not leak between tests
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def mute_signals():
+    """
+    Mute model save signals for the test. The receivers bump cached list
+    versions and clear the carrier cache, so only for tests that read neither.
+    """
+    with factory.django.mute_signals(pre_save, post_save):
+        yield
+
+
 @pytest.fixture
 def api_client():
     """
@@ -27,77 +149,97 @@ def api_client():
     return APIClient()
 
 
+SESSION_USERS = {
+    'admin': {'email': 'admin@warehouse.com', 'password': 'admin123', 'is_staff': True, 'group': 'admin'},
+    'worker': {'email': 'worker@warehouse.com', 'password': 'worker123', 'is_staff': False, 'group': 'worker'},
+    'user': {'email': 'user@warehouse.com', 'password': 'user123', 'is_staff': False, 'group': None},
+}
+
+
+@pytest.fixture(scope='session')
+def session_user_ids(django_db_setup, django_db_blocker):
+    """
+    Create the admin, worker and regular users once per session.
+    Returns their primary keys by username.
+    """
+    user_ids = {}
+    with django_db_blocker.unblock():
+        for username, spec in SESSION_USERS.items():
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                user = User.objects.create_user(
+                    username=username,
+                    email=spec['email'],
+                    password=spec['password'],
+                    is_staff=spec['is_staff']
+                )
+                if spec['group']:
+                    user.groups.add(Group.objects.get(name=spec['group']))
+            user_ids[username] = user.pk
+    return user_ids
+
+
+@pytest.fixture(scope='session')
+def access_tokens():
+    """
+    Access tokens minted during the session, by user id
+    """
+    return {}
+
+
+def _authenticate(client, user, access_tokens):
+    if user.pk not in access_tokens:
+        access_tokens[user.pk] = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_tokens[user.pk]}')
+    return client
+
+
 @pytest.fixture
-def admin_user(db):
+def admin_user(db, session_user_ids):
     """
-    Create admin user
+    Admin user, loaded fresh for each test
     """
-    user = User.objects.create_user(
-        username='admin',
-        email='admin@warehouse.com',
-        password='admin123',
-        is_staff=True
-    )
-    admin_group = Group.objects.get(name='admin')
-    user.groups.add(admin_group)
-    return user
+    return User.objects.get(pk=session_user_ids['admin'])
 
 
 @pytest.fixture
-def worker_user(db):
+def worker_user(db, session_user_ids):
     """
-    Create worker user
+    Worker user, loaded fresh for each test
     """
-    user = User.objects.create_user(
-        username='worker',
-        email='worker@warehouse.com',
-        password='worker123'
-    )
-    worker_group = Group.objects.get(name='worker')
-    user.groups.add(worker_group)
-    return user
+    return User.objects.get(pk=session_user_ids['worker'])
 
 
 @pytest.fixture
-def regular_user(db):
+def regular_user(db, session_user_ids):
     """
-    Create regular user (no special groups)
+    Regular user (no special groups), loaded fresh for each test
     """
-    return User.objects.create_user(
-        username='user',
-        email='user@warehouse.com',
-        password='user123'
-    )
+    return User.objects.get(pk=session_user_ids['user'])
 
 
 @pytest.fixture
-def admin_client(api_client, admin_user):
+def admin_client(api_client, admin_user, access_tokens):
     """
     API client authenticated as admin
     """
-    refresh = RefreshToken.for_user(admin_user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-    return api_client
+    return _authenticate(api_client, admin_user, access_tokens)
 
 
 @pytest.fixture
-def worker_client(api_client, worker_user):
+def worker_client(api_client, worker_user, access_tokens):
     """
     API client authenticated as worker
     """
-    refresh = RefreshToken.for_user(worker_user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-    return api_client
+    return _authenticate(api_client, worker_user, access_tokens)
 
 
 @pytest.fixture
-def user_client(api_client, regular_user):
+def user_client(api_client, regular_user, access_tokens):
     """
     API client authenticated as regular user
     """
-    refresh = RefreshToken.for_user(regular_user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-    return api_client
+    return _authenticate(api_client, regular_user, access_tokens)
 
 
 @pytest.fixture
@@ -105,4 +247,70 @@ def unauthenticated_client():
     """
     Unauthenticated API client
     """
-    return APIClient()
\ No newline at end of file
+    return APIClient()
+
+# Plain bulk-created rows for read-only list tests: one INSERT per model and
+# no Faker calls. Use the factories when a test needs specific field values.
+
+@pytest.fixture
+def suppliers_batch(db):
+    """
+    Three suppliers
+    """
+    return Supplier.objects.bulk_create([
+        Supplier(name=f"Supplier {index}", country='USA') for index in range(3)
+    ])
+
+
+@pytest.fixture
+def locations_batch(db):
+    """
+    Four storage locations
+    """
+    return Location.objects.bulk_create([
+        Location(code=f"BULK-{index:03d}", zone='A', location_type='storage', capacity=1000)
+        for index in range(4)
+    ])
+
+
+@pytest.fixture
+def items_batch(db):
+    """
+    Three items sharing one category and supplier
+    """
+    category = Category.objects.create(name='Other')
+    supplier = Supplier.objects.create(name='Bulk Supplier', country='USA')
+    return Item.objects.bulk_create([
+        Item(
+            item_id=f"BULK-ITEM-{index:03d}", name=f"Item {index}", category=category, supplier=supplier,
+            unit_cost=Decimal('9.99'), weight=Decimal('1.000'), dimensions='10x10x10'
+        )
+        for index in range(3)
+    ])
+
+
+@pytest.fixture
+def stock_levels_batch(items_batch, locations_batch):
+    """
+    One stock level per item, each at its own location
+    """
+    stock_levels = StockLevel.objects.bulk_create([
+        StockLevel(item=item, location=location, quantity=100)
+        for item, location in zip(items_batch, locations_batch)
+    ])
+    Item.objects.filter(pk__in=[item.pk for item in items_batch]).update(total_stock=100)
+    return stock_levels
+
+
+@pytest.fixture
+def movements_batch(items_batch, locations_batch):
+    """
+    One stock-in movement per item
+    """
+    return InventoryMovement.objects.bulk_create([
+        InventoryMovement(
+            item=item, location=location, action='stock_in', quantity=10, previous_quantity=0, new_quantity=10,
+            reference_id=f"REF-BULK-{index:03d}"
+        )
+        for index, (item, location) in enumerate(zip(items_batch, locations_batch))
+    ])
@@ -2,10 +2,22 @@
 Factory classes for creating test data
 """
 import factory
+from decimal import Decimal
+from functools import lru_cache
 from django.contrib.auth.models import User, Group
+from collections import Counter
+from django.db.models import F
 from factory.django import DjangoModelFactory
 
 from inventory.models import Supplier, Category, Location, Item, StockLevel, InventoryMovement
+from orders.models import Customer, Order
+from shipments.models import Address, Carrier, Shipment
+
+
+@lru_cache(maxsize=None)
+def _group(name):
+    # Groups are created once per session in django_db_setup and never rolled back
+    return Group.objects.get_or_create(name=name)[0]
 
 
 class UserFactory(DjangoModelFactory):
@@ -28,8 +40,7 @@ class AdminUserFactory(UserFactory):
         if not create:
             return
         
-        admin_group, _ = Group.objects.get_or_create(name='admin')
-        self.groups.add(admin_group)
+        self.groups.add(_group('admin'))
 
 
 class WorkerUserFactory(UserFactory):
@@ -40,8 +51,7 @@ class WorkerUserFactory(UserFactory):
         if not create:
             return
         
-        worker_group, _ = Group.objects.get_or_create(name='worker')
-        self.groups.add(worker_group)
+        self.groups.add(_group('worker'))
 
 
 class SupplierFactory(DjangoModelFactory):
@@ -97,10 +107,20 @@ class ItemFactory(DjangoModelFactory):
 class StockLevelFactory(DjangoModelFactory):
     class Meta:
         model = StockLevel
+        skip_postgeneration_save = True
     
     item = factory.SubFactory(ItemFactory)
     location = factory.SubFactory(LocationFactory)
     quantity = factory.Faker('random_int', min=0, max=500)
+    
+    @factory.post_generation
+    def update_item_total_stock(self, create, extracted, **kwargs):
+        if not create:
+            return
+        
+        # Keep the denormalized item total in sync, as InventoryService does
+        Item.objects.filter(pk=self.item_id).update(total_stock=F('total_stock') + self.quantity)
+        self.item.total_stock += self.quantity
 
 
 class InventoryMovementFactory(DjangoModelFactory):
@@ -120,6 +140,97 @@ class InventoryMovementFactory(DjangoModelFactory):
     shift = factory.Iterator(['morning', 'afternoon', 'night'])
 
 
+def bulk_make_stocklevels(item_location_qty_tuples):
+    """
+    Create stock levels with one INSERT, keeping item totals in sync like StockLevelFactory
+    """
+    stock_levels = StockLevel.objects.bulk_create([
+        StockLevel(item=item, location=location, quantity=quantity)
+        for item, location, quantity in item_location_qty_tuples
+    ])
+    
+    totals = Counter()
+    for stock_level in stock_levels:
+        totals[stock_level.item] += stock_level.quantity
+    for item, quantity in totals.items():
+        Item.objects.filter(pk=item.pk).update(total_stock=F('total_stock') + quantity)
+        item.total_stock += quantity
+    return stock_levels
+
+
+def bulk_make_movements(item_location_action_tuples, quantity=10):
+    """
+    Create inventory movements with one INSERT
+    """
+    return InventoryMovement.objects.bulk_create([
+        InventoryMovement(
+            item=item, location=location, action=action, quantity=quantity,
+            previous_quantity=0, new_quantity=quantity
+        )
+        for item, location, action in item_location_action_tuples
+    ])
+
+
+class CustomerFactory(DjangoModelFactory):
+    class Meta:
+        model = Customer
+    
+    customer_id = factory.Sequence(lambda n: f"CUST-{n:05d}")
+    name = factory.Faker('company')
+    email = factory.Faker('company_email')
+    address = factory.Faker('address')
+    country = factory.Faker('country')
+    is_active = True
+
+
+class OrderFactory(DjangoModelFactory):
+    class Meta:
+        model = Order
+    
+    order_id = factory.Sequence(lambda n: f"ORD-{n:06d}")
+    customer = factory.SubFactory(CustomerFactory)
+    total_value = Decimal('100.00')
+
+
+class CarrierFactory(DjangoModelFactory):
+    class Meta:
+        model = Carrier
+        django_get_or_create = ('code',)
+    
+    name = factory.Faker('company')
+    code = factory.Sequence(lambda n: f"CAR{n:04d}")
+    tracking_url_template = 'https://track.example.com/?n={tracking_number}'
+
+
+class AddressFactory(DjangoModelFactory):
+    class Meta:
+        model = Address
+    
+    full_text = factory.Faker('address')
+    country = 'US'
+    postal_code = factory.Faker('postcode')
+    hash = factory.LazyAttribute(lambda obj: Address.compute_hash(obj.full_text, obj.country, obj.postal_code))
+
+
+class ShipmentFactory(DjangoModelFactory):
+    class Meta:
+        model = Shipment
+    
+    shipment_id = factory.Sequence(lambda n: f"SHIP-{n:06d}")
+    order = factory.SubFactory(OrderFactory)
+    carrier = factory.SubFactory(CarrierFactory)
+    tracking_number = factory.Sequence(lambda n: f"1Z{n:010d}")
+    shipping_cost_cents = 1250
+    weight_g = 1250
+    length_cm = Decimal('10.00')
+    width_cm = Decimal('20.00')
+    height_cm = Decimal('30.00')
+    origin_address = factory.SubFactory(AddressFactory)
+    destination_address = factory.SubFactory(AddressFactory)
+    destination_country = 'US'
+    destination_postal_code = '10001'
+
+
 # Factory for high-value items
 class HighValueItemFactory(ItemFactory):
     is_high_value = True
@@ -0,0 +1,78 @@
+"""
+Analytics model tests
+"""
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+
+from analytics.models import AnomalyDetection, PerformanceReport
+from tests.factories import InventoryMovementFactory
+
+
+@pytest.mark.analytics
+@pytest.mark.unit
+class TestPerformanceReport:
+    """Test performance report generation"""
+    
+    def test_generate_counts_movements_by_action(self, db):
+        """Test report counts movements per action within the period"""
+        InventoryMovementFactory.create_batch(2, action='stock_in')
+        InventoryMovementFactory(action='stock_out')
+        InventoryMovementFactory(action='transfer')
+        
+        period_end = timezone.now() + timedelta(minutes=1)
+        period_start = period_end - timedelta(days=1)
+        
+        report = PerformanceReport.generate('daily', period_start, period_end)
+        
+        assert report.total_transactions == 4
+        assert report.stock_in_count == 2
+        assert report.stock_out_count == 1
+        assert report.adjustment_count == 0
+        assert report.transfer_count == 1
+    
+    def test_generate_updates_existing_report(self, db):
+        """Test regenerating a period updates the existing report"""
+        period_end = timezone.now() + timedelta(minutes=1)
+        period_start = period_end - timedelta(days=1)
+        
+        first = PerformanceReport.generate('daily', period_start, period_end)
+        InventoryMovementFactory(action='adjustment')
+        second = PerformanceReport.generate('daily', period_start, period_end)
+        
+        assert second.pk == first.pk
+        assert second.report_id == first.report_id
+        assert second.adjustment_count == 1
+
+
+@pytest.mark.analytics
+@pytest.mark.unit
+class TestAnomalyRiskLevel:
+    """Test anomaly risk level bucketing"""
+    
+    @pytest.mark.parametrize('score,expected', [
+        ('0.00', 'low'),
+        ('39.99', 'low'),
+        ('40.00', 'medium'),
+        ('59.99', 'medium'),
+        ('60.00', 'high'),
+        ('79.99', 'high'),
+        ('80.00', 'critical'),
+        ('100.00', 'critical'),
+    ])
+    def test_risk_level_matches_annotation(self, db, score, expected):
+        """Test the Python and SQL risk levels agree at bucket boundaries"""
+        detection = AnomalyDetection.objects.create(
+            detection_id=f"DET-{score}",
+            anomaly_type='volume',
+            entity_type='item',
+            entity_id='ITEM-00001',
+            anomaly_score=Decimal(score),
+            threshold=Decimal('50.00')
+        )
+        
+        annotated = AnomalyDetection.objects.with_risk_level().get(pk=detection.pk)
+        
+        assert detection.risk_level == expected
+        assert annotated.risk_level == expected
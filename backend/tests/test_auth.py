@@ -7,6 +7,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from warehouse.permissions import get_group_names
 from tests.factories import AdminUserFactory, WorkerUserFactory, UserFactory
 
 
@@ -119,6 +120,12 @@ class TestPermissions:
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
     
+    def test_group_names_loaded_once_per_user(self, worker_user, django_assert_num_queries):
+        """Test permission checks share one group lookup per user instance"""
+        with django_assert_num_queries(1):
+            assert get_group_names(worker_user) == {'worker'}
+            assert get_group_names(worker_user) == {'worker'}
+    
     def test_admin_full_access(self, admin_client):
         """Test that admin has full access"""
         # Test read access
@@ -2,45 +2,58 @@
 Inventory API tests
 """
 import pytest
+from datetime import datetime, timezone as dt_timezone
 from django.urls import reverse
 from rest_framework import status
 
 from inventory.models import Supplier, Category, Location, Item, StockLevel, InventoryMovement
+from inventory.serializers import ItemSerializer
+from inventory.services import InventoryService
 from tests.factories import (
     SupplierFactory, CategoryFactory, LocationFactory, ItemFactory,
     StockLevelFactory, InventoryMovementFactory, HighValueItemFactory,
-    PerishableItemFactory, LowStockItemFactory
+    PerishableItemFactory, LowStockItemFactory, bulk_make_stocklevels, bulk_make_movements
 )
 
+# Resolved once at import; reverse() walks the URL resolver on every call
+INVENTORYMOVEMENT_ADJUSTMENT_URL = reverse('inventorymovement-adjustment')
+INVENTORYMOVEMENT_BULK_MOVEMENTS_URL = reverse('inventorymovement-bulk-movements')
+INVENTORYMOVEMENT_HIGH_RISK_URL = reverse('inventorymovement-high-risk')
+INVENTORYMOVEMENT_LIST_URL = reverse('inventorymovement-list')
+INVENTORYMOVEMENT_STOCK_IN_URL = reverse('inventorymovement-stock-in')
+INVENTORYMOVEMENT_STOCK_OUT_URL = reverse('inventorymovement-stock-out')
+INVENTORYMOVEMENT_TRANSFER_URL = reverse('inventorymovement-transfer')
+ITEM_LIST_URL = reverse('item-list')
+ITEM_LOW_STOCK_URL = reverse('item-low-stock')
+LOCATION_LIST_URL = reverse('location-list')
+STOCKLEVEL_LIST_URL = reverse('stocklevel-list')
+SUPPLIER_LIST_URL = reverse('supplier-list')
+
 
 @pytest.mark.inventory
 @pytest.mark.api
 class TestSupplierAPI:
     """Test Supplier API endpoints"""
     
-    def test_list_suppliers_admin(self, admin_client):
+    def test_list_suppliers_admin(self, admin_client, suppliers_batch):
         """Test admin can list suppliers"""
-        SupplierFactory.create_batch(3)
-        
-        url = reverse('supplier-list')
+        url = SUPPLIER_LIST_URL
         response = admin_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 3
+        assert len(response.data['results']) == len(suppliers_batch)
     
-    def test_list_suppliers_worker(self, worker_client):
+    def test_list_suppliers_worker(self, worker_client, suppliers_batch):
         """Test worker can list suppliers"""
-        SupplierFactory.create_batch(2)
-        
-        url = reverse('supplier-list')
+        url = SUPPLIER_LIST_URL
         response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 2
+        assert len(response.data['results']) == len(suppliers_batch)
     
     def test_create_supplier_admin(self, admin_client):
         """Test admin can create supplier"""
-        url = reverse('supplier-list')
+        url = SUPPLIER_LIST_URL
         data = {
             'name': 'Test Supplier',
             'contact_info': 'Test contact info',
@@ -54,7 +67,7 @@ class TestSupplierAPI:
     
     def test_create_supplier_worker_forbidden(self, worker_client):
         """Test worker cannot create supplier"""
-        url = reverse('supplier-list')
+        url = SUPPLIER_LIST_URL
         data = {
             'name': 'Test Supplier',
             'country': 'Test Country'
@@ -97,11 +110,38 @@ class TestSupplierAPI:
         SupplierFactory(country='Canada')
         SupplierFactory(country='USA')
         
-        url = reverse('supplier-list')
+        url = SUPPLIER_LIST_URL
         response = admin_client.get(url, {'country': 'USA'})
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 2
+    
+    def test_list_suppliers_cached_until_change(self, worker_client, django_assert_num_queries):
+        """Test supplier lists are served from cache until a supplier is saved"""
+        supplier = SupplierFactory(name='Acme')
+        url = SUPPLIER_LIST_URL
+        
+        first = worker_client.get(url)
+        # Only the JWT user lookup reaches the database
+        with django_assert_num_queries(1):
+            second = worker_client.get(url)
+        
+        assert second.data == first.data
+        
+        supplier.name = 'Acme Corp'
+        supplier.save()
+        response = worker_client.get(url)
+        
+        assert response.data['results'][0]['name'] == 'Acme Corp'
+    
+    def test_list_suppliers_sees_factory_rows(self, worker_client):
+        """Test a supplier created between two list requests shows up in the second"""
+        url = SUPPLIER_LIST_URL
+        assert worker_client.get(url).data['count'] == 0
+        
+        SupplierFactory()
+        
+        assert worker_client.get(url).data['count'] == 1
 
 
 @pytest.mark.inventory
@@ -109,15 +149,13 @@ class TestSupplierAPI:
 class TestLocationAPI:
     """Test Location API endpoints"""
     
-    def test_list_locations(self, worker_client):
+    def test_list_locations(self, worker_client, locations_batch):
         """Test listing locations"""
-        LocationFactory.create_batch(4)
-        
-        url = reverse('location-list')
+        url = LOCATION_LIST_URL
         response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 4
+        assert len(response.data['results']) == len(locations_batch)
     
     def test_filter_locations_by_zone(self, worker_client):
         """Test filtering locations by zone"""
@@ -125,7 +163,7 @@ class TestLocationAPI:
         LocationFactory(zone='B')
         LocationFactory(zone='A')
         
-        url = reverse('location-list')
+        url = LOCATION_LIST_URL
         response = worker_client.get(url, {'zone': 'A'})
         
         assert response.status_code == status.HTTP_200_OK
@@ -137,7 +175,7 @@ class TestLocationAPI:
         LocationFactory(location_type='picking')
         LocationFactory(location_type='storage')
         
-        url = reverse('location-list')
+        url = LOCATION_LIST_URL
         response = worker_client.get(url, {'type': 'storage'})
         
         assert response.status_code == status.HTTP_200_OK
@@ -157,6 +195,18 @@ class TestLocationAPI:
         assert response.data['capacity'] == 1000
         assert response.data['utilization_percentage'] == 25.0
         assert len(response.data['stock_levels']) == 1
+    
+    def test_location_utilization_query_count(self, worker_client, django_assert_max_num_queries):
+        """Test utilization does not issue a query per stock level"""
+        location = LocationFactory()
+        StockLevelFactory.create_batch(5, location=location)
+        
+        url = reverse('location-utilization', kwargs={'pk': location.pk})
+        with django_assert_max_num_queries(3):
+            response = worker_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['stock_levels']) == 5
 
 
 @pytest.mark.inventory
@@ -164,22 +214,112 @@ class TestLocationAPI:
 class TestItemAPI:
     """Test Item API endpoints"""
     
-    def test_list_items(self, worker_client):
+    def test_list_items(self, worker_client, items_batch):
         """Test listing items"""
-        ItemFactory.create_batch(3)
+        url = ITEM_LIST_URL
+        response = worker_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == len(items_batch)
+    
+    def test_item_serializer_fields_built_once(self):
+        """Test serializer instances bind their own copies of the cached fields"""
+        first, second = ItemSerializer(), ItemSerializer()
+        
+        assert list(first.fields) == list(second.fields)
+        assert first.fields['category_name'] is not second.fields['category_name']
+        assert first.fields['category_name'].parent is first
+
+    def test_list_items_total_stock(self, worker_client):
+        """Test total stock reflects the item's stock levels"""
+        item = ItemFactory()
+        StockLevelFactory(item=item, quantity=30)
+        StockLevelFactory(item=item, quantity=12)
+        ItemFactory.create_batch(2)
+
+        url = ITEM_LIST_URL
+        response = worker_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        totals = {row['item_id']: row['total_stock'] for row in response.data['results']}
+        assert totals[item.item_id] == 42
+
+    def test_list_items_summary_fields(self, worker_client):
+        """Test list rows carry related names and the reorder flag"""
+        item = ItemFactory(reorder_point=50)
+        StockLevelFactory(item=item, quantity=20)
         
-        url = reverse('item-list')
+        url = ITEM_LIST_URL
         response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 3
+        row = response.data['results'][0]
+        assert row['category_name'] == item.category.name
+        assert row['supplier_name'] == item.supplier.name
+        assert row['unit_cost'] == str(item.unit_cost)
+        assert row['needs_reorder'] is True
+    
+    def test_list_items_query_count(self, worker_client, django_assert_max_num_queries):
+        """Test listing items does not issue per-row queries"""
+        ItemFactory.create_batch(5)
+        
+        url = ITEM_LIST_URL
+        # One extra aggregate query computes the ETag
+        with django_assert_max_num_queries(4):
+            response = worker_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 5
+    
+    def test_list_items_gzip(self, worker_client):
+        """Test list responses are compressed when the client accepts gzip"""
+        ItemFactory.create_batch(5)
+        
+        url = ITEM_LIST_URL
+        response = worker_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Encoding'] == 'gzip'
+    
+    def test_list_items_not_modified(self, worker_client):
+        """Test an unchanged item list is answered with 304 until stock moves"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        url = ITEM_LIST_URL
+        response = worker_client.get(url)
+        etag = response['ETag']
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert worker_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        
+        InventoryService.stock_in(item_id=item.item_id, location_id=location.id, quantity=5)
+        response = worker_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert response.data['results'][0]['total_stock'] == 5
+    
+    def test_list_items_etag_changes_with_category(self, worker_client):
+        """Test renaming an item's category changes the item list ETag"""
+        item = ItemFactory()
+        
+        url = ITEM_LIST_URL
+        etag = worker_client.get(url)['ETag']
+        
+        item.category.name = 'Renamed'
+        item.category.save()
+        response = worker_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['category_name'] == 'Renamed'
     
     def test_create_item_worker(self, worker_client):
         """Test worker can create item"""
         category = CategoryFactory()
         supplier = SupplierFactory()
         
-        url = reverse('item-list')
+        url = ITEM_LIST_URL
         data = {
             'item_id': 'TEST-001',
             'name': 'Test Item',
@@ -206,7 +346,7 @@ class TestItemAPI:
         ItemFactory(category=clothing)
         ItemFactory(category=electronics)
         
-        url = reverse('item-list')
+        url = ITEM_LIST_URL
         response = worker_client.get(url, {'category': 'Electronics'})
         
         assert response.status_code == status.HTTP_200_OK
@@ -218,22 +358,24 @@ class TestItemAPI:
         ItemFactory(is_perishable=False)
         ItemFactory(is_perishable=True)
         
-        url = reverse('item-list')
+        url = ITEM_LIST_URL
         response = worker_client.get(url, {'is_perishable': 'true'})
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 2
     
-    def test_item_reorder_check(self, worker_client):
+    def test_item_reorder_check(self, worker_client, django_assert_max_num_queries):
         """Test item reorder check endpoint"""
         item = ItemFactory(reorder_point=50)
         location = LocationFactory()
         StockLevelFactory(item=item, location=location, quantity=30)
         
         url = reverse('item-reorder-check', kwargs={'pk': item.pk})
-        response = worker_client.get(url)
+        with django_assert_max_num_queries(4):
+            response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
+        assert response.data['stock_levels'][0]['location_code'] == location.code
         assert response.data['needs_reorder'] is True
         assert response.data['total_stock'] == 30
         assert response.data['reorder_point'] == 50
@@ -246,7 +388,7 @@ class TestItemAPI:
         location = LocationFactory()
         StockLevelFactory(item=normal_item, location=location, quantity=50)  # Above reorder point
         
-        url = reverse('item-low-stock')
+        url = ITEM_LOW_STOCK_URL
         response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
@@ -261,26 +403,34 @@ class TestItemAPI:
 class TestStockLevelAPI:
     """Test StockLevel API endpoints"""
     
-    def test_list_stock_levels(self, user_client):
+    def test_list_stock_levels(self, user_client, stock_levels_batch):
         """Test listing stock levels (read-only for all users)"""
-        StockLevelFactory.create_batch(3)
-        
-        url = reverse('stocklevel-list')
+        url = STOCKLEVEL_LIST_URL
         response = user_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 3
+        assert len(response.data['results']) == len(stock_levels_batch)
+    
+    def test_list_stock_levels_query_count(self, user_client, stock_levels_batch, django_assert_max_num_queries):
+        """Test listing stock levels joins items and locations instead of querying per row"""
+        url = STOCKLEVEL_LIST_URL
+        with django_assert_max_num_queries(4):
+            response = user_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert {row['location_code'] for row in response.data['results']} == {
+            stock_level.location.code for stock_level in stock_levels_batch
+        }
     
     def test_filter_stock_levels_by_item(self, user_client):
         """Test filtering stock levels by item"""
         item1 = ItemFactory(item_id='ITEM-001')
         item2 = ItemFactory(item_id='ITEM-002')
+        location_a, location_b = LocationFactory(), LocationFactory()
         
-        StockLevelFactory(item=item1)
-        StockLevelFactory(item=item2)
-        StockLevelFactory(item=item1)
+        bulk_make_stocklevels([(item1, location_a, 10), (item2, location_a, 10), (item1, location_b, 10)])
         
-        url = reverse('stocklevel-list')
+        url = STOCKLEVEL_LIST_URL
         response = user_client.get(url, {'item_id': 'ITEM-001'})
         
         assert response.status_code == status.HTTP_200_OK
@@ -290,12 +440,11 @@ class TestStockLevelAPI:
         """Test filtering stock levels by zone"""
         location_a = LocationFactory(zone='A')
         location_b = LocationFactory(zone='B')
+        item1, item2 = ItemFactory(), ItemFactory()
         
-        StockLevelFactory(location=location_a)
-        StockLevelFactory(location=location_b)
-        StockLevelFactory(location=location_a)
+        bulk_make_stocklevels([(item1, location_a, 10), (item1, location_b, 10), (item2, location_a, 10)])
         
-        url = reverse('stocklevel-list')
+        url = STOCKLEVEL_LIST_URL
         response = user_client.get(url, {'zone': 'A'})
         
         assert response.status_code == status.HTTP_200_OK
@@ -307,29 +456,82 @@ class TestStockLevelAPI:
 class TestInventoryMovementAPI:
     """Test InventoryMovement API endpoints"""
     
-    def test_list_movements(self, worker_client):
+    def test_list_movements(self, worker_client, movements_batch):
         """Test listing inventory movements"""
-        InventoryMovementFactory.create_batch(3)
-        
-        url = reverse('inventorymovement-list')
+        url = INVENTORYMOVEMENT_LIST_URL
         response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data['results']) == 3
+        assert len(response.data['results']) == len(movements_batch)
+    
+    def test_list_movements_query_count(self, worker_client, movements_batch, django_assert_max_num_queries):
+        """Test listing movements joins items and locations instead of querying per row"""
+        url = INVENTORYMOVEMENT_LIST_URL
+        with django_assert_max_num_queries(4):
+            response = worker_client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert {row['item_name'] for row in response.data['results']} == {
+            movement.item.name for movement in movements_batch
+        }
+    
+    def test_list_movements_cursor_pagination(self, worker_client):
+        """Test movement pages follow the cursor without overlap"""
+        item = ItemFactory()
+        location = LocationFactory()
+        movements = InventoryMovementFactory.create_batch(60, item=item, location=location)
+        
+        url = INVENTORYMOVEMENT_LIST_URL
+        first_page = worker_client.get(url)
+        second_page = worker_client.get(first_page.data['next'])
+        
+        assert first_page.status_code == status.HTTP_200_OK
+        assert 'count' not in first_page.data
+        assert len(first_page.data['results']) == 50
+        assert len(second_page.data['results']) == 10
+        assert second_page.data['next'] is None
+        
+        ids = [row['id'] for row in first_page.data['results'] + second_page.data['results']]
+        assert sorted(ids) == sorted(movement.id for movement in movements)
     
     def test_filter_movements_by_action(self, worker_client):
         """Test filtering movements by action"""
-        InventoryMovementFactory(action='stock_in')
-        InventoryMovementFactory(action='stock_out')
-        InventoryMovementFactory(action='stock_in')
+        item = ItemFactory()
+        location = LocationFactory()
         
-        url = reverse('inventorymovement-list')
+        bulk_make_movements([(item, location, 'stock_in'), (item, location, 'stock_out'), (item, location, 'stock_in')])
+        
+        url = INVENTORYMOVEMENT_LIST_URL
         response = worker_client.get(url, {'action': 'stock_in'})
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 2
     
-    def test_high_risk_movements(self, worker_client):
+    def test_filter_movements_by_date_range(self, worker_client):
+        """Test date filters include whole days at both ends"""
+        item = ItemFactory()
+        location = LocationFactory()
+        before, first_day, last_day, after = InventoryMovementFactory.create_batch(4, item=item, location=location)
+        InventoryMovement.objects.filter(pk=before.pk).update(timestamp=datetime(2024, 3, 9, 23, 59, tzinfo=dt_timezone.utc))
+        InventoryMovement.objects.filter(pk=first_day.pk).update(timestamp=datetime(2024, 3, 10, 0, 0, tzinfo=dt_timezone.utc))
+        InventoryMovement.objects.filter(pk=last_day.pk).update(timestamp=datetime(2024, 3, 12, 23, 59, tzinfo=dt_timezone.utc))
+        InventoryMovement.objects.filter(pk=after.pk).update(timestamp=datetime(2024, 3, 13, 0, 0, tzinfo=dt_timezone.utc))
+        
+        url = INVENTORYMOVEMENT_LIST_URL
+        response = worker_client.get(url, {'date_from': '2024-03-10', 'date_to': '2024-03-12'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert {row['id'] for row in response.data['results']} == {first_day.id, last_day.id}
+    
+    def test_filter_movements_invalid_date(self, worker_client):
+        """Test malformed date filters are rejected"""
+        url = INVENTORYMOVEMENT_LIST_URL
+        response = worker_client.get(url, {'date_from': '10/03/2024'})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'date_from' in response.data
+    
+    def test_high_risk_movements(self, worker_client, django_assert_max_num_queries):
         """Test high risk movements endpoint"""
         # Create high-value item for high risk movement
         high_value_item = HighValueItemFactory()
@@ -352,8 +554,10 @@ class TestInventoryMovementAPI:
             is_business_hours=True
         )
         
-        url = reverse('inventorymovement-high-risk')
-        response = worker_client.get(url)
+        url = INVENTORYMOVEMENT_HIGH_RISK_URL
+        # Authentication and permissions, then one SELECT scoring and joining the movements
+        with django_assert_max_num_queries(3):
+            response = worker_client.get(url)
         
         assert response.status_code == status.HTTP_200_OK
         # Should return at least the high-risk movement
@@ -384,7 +588,7 @@ class TestStockOperations:
         item = ItemFactory()
         location = LocationFactory()
         
-        url = reverse('inventorymovement-stock-in')
+        url = INVENTORYMOVEMENT_STOCK_IN_URL
         data = {
             'item_id': item.item_id,
             'location_id': location.id,
@@ -411,7 +615,7 @@ class TestStockOperations:
         # Create initial stock
         StockLevelFactory(item=item, location=location, quantity=50)
         
-        url = reverse('inventorymovement-stock-out')
+        url = INVENTORYMOVEMENT_STOCK_OUT_URL
         data = {
             'item_id': item.item_id,
             'location_id': location.id,
@@ -438,7 +642,7 @@ class TestStockOperations:
         # Create insufficient stock
         StockLevelFactory(item=item, location=location, quantity=10)
         
-        url = reverse('inventorymovement-stock-out')
+        url = INVENTORYMOVEMENT_STOCK_OUT_URL
         data = {
             'item_id': item.item_id,
             'location_id': location.id,
@@ -459,7 +663,7 @@ class TestStockOperations:
         # Create initial stock at source location
         StockLevelFactory(item=item, location=from_location, quantity=50)
         
-        url = reverse('inventorymovement-transfer')
+        url = INVENTORYMOVEMENT_TRANSFER_URL
         data = {
             'item_id': item.item_id,
             'location_id': from_location.id,
@@ -475,11 +679,10 @@ class TestStockOperations:
         assert len(response.data) == 2  # Two movements: out and in
         
         # Check stock levels updated correctly
-        from_stock = StockLevel.objects.get(item=item, location=from_location)
-        to_stock = StockLevel.objects.get(item=item, location=to_location)
+        quantities = dict(StockLevel.objects.filter(item=item).values_list('location_id', 'quantity'))
         
-        assert from_stock.quantity == 25  # 50 - 25
-        assert to_stock.quantity == 25    # 0 + 25
+        assert quantities[from_location.id] == 25  # 50 - 25
+        assert quantities[to_location.id] == 25    # 0 + 25
     
     def test_stock_adjustment_operation(self, worker_client):
         """Test stock adjustment operation"""
@@ -489,7 +692,7 @@ class TestStockOperations:
         # Create initial stock
         StockLevelFactory(item=item, location=location, quantity=100)
         
-        url = reverse('inventorymovement-adjustment')
+        url = INVENTORYMOVEMENT_ADJUSTMENT_URL
         data = {
             'item_id': item.item_id,
             'location_id': location.id,
@@ -508,13 +711,76 @@ class TestStockOperations:
         stock_level = StockLevel.objects.get(item=item, location=location)
         assert stock_level.quantity == 95  # 100 - 5
     
+    def test_stock_in_json_body(self, worker_client):
+        """Test stock in decodes a JSON body and coerces numeric strings"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        url = INVENTORYMOVEMENT_STOCK_IN_URL
+        data = {
+            'item_id': item.item_id,
+            'location_id': str(location.id),
+            'quantity': '25'
+        }
+        
+        response = worker_client.post(url, data, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['quantity'] == 25
+        assert StockLevel.objects.get(item=item, location=location).quantity == 25
+    
+    def test_stock_in_rejects_invalid_body(self, worker_client):
+        """Test stock in rejects zero quantities and missing fields"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        url = INVENTORYMOVEMENT_STOCK_IN_URL
+        
+        response = worker_client.post(url, {
+            'item_id': item.item_id,
+            'location_id': location.id,
+            'quantity': 0
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'quantity': ['Quantity cannot be zero']}
+        
+        response = worker_client.post(url, {'item_id': item.item_id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'location_id': ['This field is required.']}
+        
+        response = worker_client.post(url, {
+            'item_id': item.item_id,
+            'location_id': 'shelf',
+            'quantity': 5
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(response.data) == ['location_id']
+        assert not StockLevel.objects.filter(item=item).exists()
+    
+    def test_stock_in_accepts_null_text_fields(self, worker_client):
+        """Test null reference and notes are stored blank"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        response = worker_client.post(INVENTORYMOVEMENT_STOCK_IN_URL, {
+            'item_id': item.item_id,
+            'location_id': location.id,
+            'quantity': 5,
+            'reference_id': None,
+            'notes': None
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['reference_id'] == ''
+        assert response.data['notes'] == ''
+    
     def test_bulk_movements_operation(self, worker_client):
         """Test bulk movements operation"""
         item1 = ItemFactory()
         item2 = ItemFactory()
         location = LocationFactory()
         
-        url = reverse('inventorymovement-bulk-movements')
+        url = INVENTORYMOVEMENT_BULK_MOVEMENTS_URL
         data = {
             'movements': [
                 {
@@ -540,11 +806,56 @@ class TestStockOperations:
         assert len(response.data) == 2
         
         # Check that both stock levels were created
-        stock1 = StockLevel.objects.get(item=item1, location=location)
-        stock2 = StockLevel.objects.get(item=item2, location=location)
+        quantities = dict(StockLevel.objects.filter(location=location).values_list('item_id', 'quantity'))
         
-        assert stock1.quantity == 50
-        assert stock2.quantity == 30
+        assert quantities == {item1.id: 50, item2.id: 30}
+    
+    def test_bulk_movements_query_count(self, worker_client, django_assert_max_num_queries):
+        """Test a full batch of movements resolves ids and writes back without per-row queries"""
+        category = CategoryFactory()
+        supplier = SupplierFactory()
+        items = ItemFactory.create_batch(50, category=category, supplier=supplier)
+        locations = LocationFactory.create_batch(2, capacity=1000)
+        
+        url = INVENTORYMOVEMENT_BULK_MOVEMENTS_URL
+        data = {
+            'movements': [
+                {'item_id': item.item_id, 'location_id': location.id, 'quantity': 5, 'action': 'stock_in'}
+                for item in items
+                for location in locations
+            ]
+        }
+        
+        # A fixed number of lookups and bulk writes, independent of the number of movements
+        with django_assert_max_num_queries(11):
+            response = worker_client.post(url, data, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 100
+        assert StockLevel.objects.filter(location__in=locations, quantity=5).count() == 100
+    
+    def test_bulk_movements_reports_all_missing_ids(self, worker_client):
+        """Test bulk movements validation lists every unknown item and location"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        url = INVENTORYMOVEMENT_BULK_MOVEMENTS_URL
+        data = {
+            'movements': [
+                {'item_id': item.item_id, 'location_id': location.id, 'quantity': 5, 'action': 'stock_in'},
+                {'item_id': 'MISSING-1', 'location_id': location.id, 'quantity': 5, 'action': 'stock_in'},
+                {'item_id': 'MISSING-2', 'location_id': 999999, 'quantity': 5, 'action': 'stock_in'}
+            ]
+        }
+        
+        response = worker_client.post(url, data, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['movements'] == [
+            'Items not found: MISSING-1, MISSING-2',
+            'Locations not found: 999999'
+        ]
+        assert not StockLevel.objects.filter(item=item).exists()
     
     def test_unauthorized_stock_operations(self, user_client):
         """Test that regular users cannot perform stock operations"""
@@ -552,11 +863,11 @@ class TestStockOperations:
         location = LocationFactory()
         
         urls = [
-            reverse('inventorymovement-stock-in'),
-            reverse('inventorymovement-stock-out'),
-            reverse('inventorymovement-transfer'),
-            reverse('inventorymovement-adjustment'),
-            reverse('inventorymovement-bulk-movements')
+            INVENTORYMOVEMENT_STOCK_IN_URL,
+            INVENTORYMOVEMENT_STOCK_OUT_URL,
+            INVENTORYMOVEMENT_TRANSFER_URL,
+            INVENTORYMOVEMENT_ADJUSTMENT_URL,
+            INVENTORYMOVEMENT_BULK_MOVEMENTS_URL
         ]
         
         data = {
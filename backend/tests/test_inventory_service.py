@@ -2,12 +2,17 @@
 Inventory service layer tests
 """
 import pytest
+from datetime import datetime, timezone as dt_timezone
 from decimal import Decimal
+from django.http import Http404
 from freezegun import freeze_time
 
-from inventory.models import StockLevel, InventoryMovement
+from inventory.models import Location, StockLevel, InventoryMovement
 from inventory.services import InventoryService
-from tests.factories import ItemFactory, LocationFactory, StockLevelFactory
+from tests.factories import ItemFactory, LocationFactory, StockLevelFactory, InventoryMovementFactory
+
+# The service never reads cached lists, so factory saves skip the invalidation receivers
+pytestmark = pytest.mark.usefixtures('mute_signals')
 
 
 @pytest.mark.inventory
@@ -175,6 +180,20 @@ class TestInventoryService:
         assert from_location.current_utilization == 70   # 100 - 30
         assert to_location.current_utilization == 230    # 200 + 30
     
+    def test_item_total_stock_tracks_movements(self, db):
+        """Test stock operations keep the item total stock in sync"""
+        item = ItemFactory()
+        from_location = LocationFactory(capacity=1000)
+        to_location = LocationFactory(capacity=1000)
+        
+        InventoryService.stock_in(item.item_id, from_location.id, 100, user='testuser')
+        InventoryService.stock_out(item.item_id, from_location.id, 30, user='testuser')
+        InventoryService.stock_adjustment(item.item_id, from_location.id, -5, user='testuser')
+        InventoryService.stock_transfer(item.item_id, from_location.id, to_location.id, 20, user='testuser')
+        
+        item.refresh_from_db()
+        assert item.total_stock == 65
+    
     def test_stock_transfer_same_location_raises_error(self, db):
         """Test stock transfer to same location raises error"""
         item = ItemFactory()
@@ -372,6 +391,92 @@ class TestInventoryService:
         
         assert from_stock.quantity == 75  # 100 - 25
         assert to_stock.quantity == 25    # 0 + 25
+    
+    def test_bulk_movements_applies_sequentially(self, db):
+        """Test bulk movements on the same stock level see each other's changes"""
+        item = ItemFactory()
+        location = LocationFactory(capacity=1000, current_utilization=0)
+        
+        movements_data = [
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': 40, 'action': 'stock_in'},
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': 15, 'action': 'stock_out'},
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': -5, 'action': 'adjustment'},
+        ]
+        
+        movements = InventoryService.bulk_movements(movements_data, user='testuser')
+        
+        assert [(m.previous_quantity, m.new_quantity) for m in movements] == [(0, 40), (40, 25), (25, 20)]
+        assert all(m.pk is not None for m in movements)
+        saved = InventoryMovement.objects.in_bulk([m.pk for m in movements])
+        assert [saved[m.pk].new_quantity for m in movements] == [40, 25, 20]
+        assert all(saved[m.pk].user == 'testuser' for m in movements)
+        
+        assert StockLevel.objects.get(item=item, location=location).quantity == 20
+        location.refresh_from_db()
+        item.refresh_from_db()
+        assert location.current_utilization == 20
+        assert item.total_stock == 20
+    
+    def test_bulk_movements_failure_rolls_back(self, db):
+        """Test a failing movement leaves no partial writes behind"""
+        item = ItemFactory()
+        location = LocationFactory()
+        
+        movements_data = [
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': 10, 'action': 'stock_in'},
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': 50, 'action': 'stock_out'},
+        ]
+        
+        with pytest.raises(ValueError, match="Insufficient stock"):
+            InventoryService.bulk_movements(movements_data, user='testuser')
+        
+        assert not StockLevel.objects.filter(item=item).exists()
+        assert not InventoryMovement.objects.filter(item=item).exists()
+    
+    def test_bulk_movements_keeps_concurrent_utilization(self, db):
+        """Test utilization written by others after the locations were loaded is kept"""
+        item = ItemFactory()
+        location = LocationFactory(capacity=1000, current_utilization=100)
+        locations = {location.pk: location}
+        Location.objects.filter(pk=location.pk).update(current_utilization=300)
+        
+        movements_data = [
+            {'item_id': item.item_id, 'location_id': location.id, 'quantity': 40, 'action': 'stock_in'},
+        ]
+        
+        InventoryService.bulk_movements(movements_data, user='testuser', locations=locations)
+        
+        location.refresh_from_db()
+        assert location.current_utilization == 340
+    
+    def test_bulk_movements_missing_item_raises_404(self, db):
+        """Test an unknown item raises Http404 like the single movement operations"""
+        location = LocationFactory()
+        
+        movements_data = [
+            {'item_id': 'MISSING-1', 'location_id': location.id, 'quantity': 10, 'action': 'stock_in'},
+        ]
+        
+        with pytest.raises(Http404):
+            InventoryService.bulk_movements(movements_data, user='testuser')
+    
+    def test_raw_bulk_insert_counts_queries(self, db, django_assert_num_queries):
+        """Test raw inserts run one counted query per page and set primary keys"""
+        item = ItemFactory()
+        location = LocationFactory()
+        movements = [
+            InventoryMovement(
+                item=item, location=location, action='stock_in', quantity=quantity,
+                previous_quantity=0, new_quantity=quantity
+            )
+            for quantity in range(1, 6)
+        ]
+        
+        with django_assert_num_queries(3):
+            InventoryMovement.objects.raw_bulk_insert(movements, page_size=2)
+        
+        saved = InventoryMovement.objects.in_bulk([m.pk for m in movements])
+        assert [saved[m.pk].quantity for m in movements] == [1, 2, 3, 4, 5]
 
 
 @pytest.mark.inventory
@@ -431,6 +536,43 @@ class TestInventoryServiceBusinessLogic:
             assert movement.is_business_hours is False
             assert movement.shift == 'night'
     
+    @pytest.mark.parametrize('hour,expected_shift,expected_business_hours', [
+        (5, 'night', False),
+        (6, 'morning', False),
+        (8, 'morning', True),
+        (14, 'afternoon', True),
+        (18, 'afternoon', False),
+        (22, 'night', False),
+    ])
+    def test_compute_time_context(self, hour, expected_shift, expected_business_hours):
+        """Test time context boundaries for shifts and business hours"""
+        now = datetime(2024, 1, 15, hour, 0, tzinfo=dt_timezone.utc)
+        
+        context = InventoryService._compute_time_context(now)
+        
+        assert context.shift == expected_shift
+        assert context.is_business_hours is expected_business_hours
+    
+    def test_risk_score_annotation_matches_property(self, db):
+        """Test SQL risk score annotation agrees with the Python computation"""
+        high_risk = InventoryMovementFactory(
+            item=ItemFactory(is_high_value=True, is_perishable=False),
+            quantity=-150,
+            is_business_hours=True
+        )
+        borderline = InventoryMovementFactory(
+            item=ItemFactory(is_high_value=False, is_perishable=True),
+            quantity=150,
+            is_business_hours=False
+        )
+        
+        annotated = InventoryMovement.objects.with_risk_score().in_bulk([high_risk.pk, borderline.pk])
+        
+        assert annotated[high_risk.pk].risk_score == 5
+        assert annotated[borderline.pk].risk_score == 4
+        assert annotated[high_risk.pk].is_high_risk is high_risk.is_high_risk is True
+        assert annotated[borderline.pk].is_high_risk is borderline.is_high_risk is True
+    
     def test_item_not_found_raises_error(self, db):
         """Test that operations with non-existent item raise error"""
         location = LocationFactory()
@@ -0,0 +1,363 @@
+"""
+Order service layer tests
+"""
+import json
+import pytest
+import re
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.urls import reverse
+from freezegun import freeze_time
+
+from inventory.models import StockLevel
+from orders import ingest
+from orders.models import Order, OrderStatus, PickingTask
+from orders.services import OrderService
+from tests.factories import CustomerFactory, ItemFactory, LocationFactory, StockLevelFactory
+
+
+@pytest.mark.orders
+@pytest.mark.unit
+class TestOrderService:
+    """Test order service business logic"""
+    
+    def test_create_order_creates_items_and_status(self, db, django_assert_max_num_queries):
+        """Test create order writes all line items with a fixed number of queries"""
+        customer = CustomerFactory()
+        items = [ItemFactory() for _ in range(5)]
+        items_data = [
+            {'item_id': item.item_id, 'quantity': index + 1, 'unit_price': '2.50'}
+            for index, item in enumerate(items)
+        ]
+        
+        with django_assert_max_num_queries(8):
+            order = OrderService.create_order(customer.customer_id, items_data, user='testuser')
+        
+        order_items = {order_item.item.item_id: order_item for order_item in order.order_items.all()}
+        assert len(order_items) == 5
+        assert order_items[items[4].item_id].quantity == 5
+        assert order_items[items[4].item_id].total_price == Decimal('12.50')
+        assert order.total_value == Decimal('37.50')
+        assert OrderStatus.objects.get(order=order).to_status == 'pending'
+    
+    @freeze_time('2024-03-05 10:00:00')
+    def test_generated_ids_use_the_current_date(self, db):
+        """Test order and picking task ids embed the creation date"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        StockLevelFactory(item=item, quantity=5)
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 2, 'unit_price': '1.00'}]
+        )
+        Order.objects.filter(pk=order.pk).update(status='processing')
+        
+        task, = OrderService.create_picking_tasks(order.order_id)
+        
+        assert re.fullmatch(r'ORD-20240305-[0-9A-F]{8}', order.order_id)
+        assert re.fullmatch(r'PICK-20240305-[0-9A-F]{8}', task.task_id)
+    
+    def test_create_order_missing_item(self, db):
+        """Test create order rejects unknown items without creating the order"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        items_data = [
+            {'item_id': item.item_id, 'quantity': 1, 'unit_price': '1.00'},
+            {'item_id': 'ITEM-MISSING', 'quantity': 1, 'unit_price': '1.00'},
+        ]
+        
+        with pytest.raises(Http404, match='ITEM-MISSING'):
+            OrderService.create_order(customer.customer_id, items_data)
+        
+        assert not Order.objects.exists()
+    
+    def test_bulk_create_orders_writes_envelopes_once(self, db, django_assert_max_num_queries):
+        """Test queued orders are written in bulk and redelivered envelopes are skipped"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        envelopes = [
+            OrderService.prepare_order_envelope(
+                customer.customer_id, [{'item_id': item.item_id, 'quantity': 2, 'unit_price': '1.25'}], user='ingest'
+            )
+            for _ in range(3)
+        ]
+        
+        with django_assert_max_num_queries(8):
+            orders = OrderService.bulk_create_orders(envelopes)
+        OrderService.bulk_create_orders(envelopes[:1])
+        
+        assert len(orders) == 3
+        assert Order.objects.count() == 3
+        order = Order.objects.get(order_id=envelopes[0]['order_id'])
+        assert order.total_value == Decimal('2.50')
+        assert order.order_items.get().quantity == 2
+        assert OrderStatus.objects.get(order=order).changed_by == 'ingest'
+    
+    def test_create_picking_tasks_allocates_largest_stock_first(self, db, django_assert_max_num_queries):
+        """Test picking tasks are allocated across locations with bulk queries"""
+        customer = CustomerFactory()
+        first_item, second_item = ItemFactory(), ItemFactory()
+        small, large = LocationFactory(), LocationFactory()
+        StockLevelFactory(item=first_item, location=small, quantity=3)
+        StockLevelFactory(item=first_item, location=large, quantity=5)
+        StockLevelFactory(item=second_item, location=small, quantity=10)
+        order = OrderService.create_order(customer.customer_id, [
+            {'item_id': first_item.item_id, 'quantity': 6, 'unit_price': '1.00'},
+            {'item_id': second_item.item_id, 'quantity': 4, 'unit_price': '1.00'},
+        ])
+        Order.objects.filter(pk=order.pk).update(status='processing')
+        
+        with django_assert_max_num_queries(12):
+            tasks = OrderService.create_picking_tasks(order.order_id)
+        
+        allocations = sorted(
+            (task.order_item.item_id, task.location_id, task.quantity_to_pick) for task in tasks
+        )
+        assert allocations == sorted([
+            (first_item.id, large.id, 5),
+            (first_item.id, small.id, 1),
+            (second_item.id, small.id, 4),
+        ])
+        assert PickingTask.objects.filter(order=order).count() == 3
+        order.refresh_from_db()
+        assert order.status == 'picking'
+    
+    def test_create_picking_tasks_insufficient_stock(self, db):
+        """Test picking task creation fails when stock does not cover the order"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        StockLevelFactory(item=item, quantity=2)
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 5, 'unit_price': '1.00'}]
+        )
+        Order.objects.filter(pk=order.pk).update(status='processing')
+        
+        with pytest.raises(ValueError, match='Insufficient stock'):
+            OrderService.create_picking_tasks(order.order_id)
+        
+        assert not PickingTask.objects.exists()
+    
+    def test_complete_picking_tasks_packs_order(self, db):
+        """Test the order is packed once every task is completed and all items are picked"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        first_location, second_location = LocationFactory(), LocationFactory()
+        StockLevelFactory(item=item, location=first_location, quantity=4)
+        StockLevelFactory(item=item, location=second_location, quantity=3)
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 6, 'unit_price': '1.00'}]
+        )
+        Order.objects.filter(pk=order.pk).update(status='processing')
+        tasks = OrderService.create_picking_tasks(order.order_id)
+        
+        for index, task in enumerate(tasks):
+            OrderService.assign_picking_task(task.task_id, 'picker', 'admin')
+            OrderService.start_picking_task(task.task_id, 'picker')
+            OrderService.complete_picking_task(task.task_id, task.quantity_to_pick, 'picker')
+            
+            order.refresh_from_db()
+            assert order.status == ('packed' if index == len(tasks) - 1 else 'picking')
+        
+        assert order.order_items.get().picked_quantity == 6
+        assert StockLevel.objects.get(item=item, location=first_location).quantity == 0
+        assert StockLevel.objects.get(item=item, location=second_location).quantity == 1
+    
+    def test_picking_task_transitions_reject_stale_state(self, db):
+        """Test guarded picking task updates report why they did not apply"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        StockLevelFactory(item=item, quantity=5)
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 2, 'unit_price': '1.00'}]
+        )
+        Order.objects.filter(pk=order.pk).update(status='processing')
+        task, = OrderService.create_picking_tasks(order.order_id)
+        
+        with pytest.raises(ValueError, match='Cannot start task with status pending'):
+            OrderService.start_picking_task(task.task_id, 'picker')
+        
+        assigned = OrderService.assign_picking_task(task.task_id, 'picker', 'admin', 'Aisle 3')
+        assert assigned.status == 'assigned'
+        assert assigned.notes == 'Aisle 3'
+        assert assigned.location.code == task.location.code
+        
+        with pytest.raises(ValueError, match='not assigned to this user'):
+            OrderService.start_picking_task(task.task_id, 'someone-else')
+        
+        OrderService.start_picking_task(task.task_id, 'picker')
+        
+        with pytest.raises(ValueError, match='cannot exceed'):
+            OrderService.complete_picking_task(task.task_id, 3, 'picker')
+        
+        completed = OrderService.complete_picking_task(task.task_id, 2, 'picker')
+        assert completed.status == 'completed'
+        assert completed.quantity_picked == 2
+        
+        with pytest.raises(Http404):
+            OrderService.assign_picking_task('PICK-MISSING', 'picker', 'admin')
+    
+    def test_update_order_status_records_transition(self, db):
+        """Test a valid transition updates the order and records its history"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 1, 'unit_price': '1.00'}]
+        )
+        Order.objects.filter(pk=order.pk).update(status='packed')
+        
+        status_record = OrderService.update_order_status(order.order_id, 'shipped', 'admin', 'Handed to carrier')
+        
+        order.refresh_from_db()
+        assert order.status == 'shipped'
+        assert order.shipped_date is not None
+        assert status_record.from_status == 'packed'
+        assert status_record.to_status == 'shipped'
+        
+        with pytest.raises(ValueError, match='Cannot transition'):
+            OrderService.update_order_status(order.order_id, 'pending', 'admin')
+    
+    def test_database_rejects_unknown_status(self, db):
+        """Test the status check constraint rejects values outside the state machine"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        order = OrderService.create_order(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 1, 'unit_price': '1.00'}]
+        )
+        
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Order.objects.filter(pk=order.pk).update(status='lost')
+    
+    def test_check_stock_availability(self, db, django_assert_num_queries):
+        """Test availability reports shortages from a single query"""
+        customer = CustomerFactory()
+        stocked, short = ItemFactory(), ItemFactory()
+        StockLevelFactory(item=stocked, quantity=10)
+        StockLevelFactory(item=short, quantity=2)
+        order = OrderService.create_order(customer.customer_id, [
+            {'item_id': stocked.item_id, 'quantity': 5, 'unit_price': '1.00'},
+            {'item_id': short.item_id, 'quantity': 3, 'unit_price': '1.00'},
+        ])
+        
+        with django_assert_num_queries(1):
+            availability = OrderService.check_stock_availability(order.order_id)
+        
+        shortages = {line['item_id']: line['shortage'] for line in availability['items']}
+        assert shortages == {stocked.item_id: 0, short.item_id: 1}
+        assert availability['fully_available'] is False
+        
+        with pytest.raises(Http404):
+            OrderService.check_stock_availability('ORD-MISSING')
+    
+    def test_order_statistics(self, db):
+        """Test statistics count orders by status and priority"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        for quantity, priority in ((1, 'normal'), (3, 'high')):
+            OrderService.create_order(
+                customer.customer_id,
+                [{'item_id': item.item_id, 'quantity': quantity, 'unit_price': '10.00'}],
+                priority=priority
+            )
+        
+        stats = OrderService.get_order_statistics()
+        
+        assert stats['total_orders'] == 2
+        assert stats['orders_by_status']['pending'] == 2
+        assert stats['orders_by_status']['delivered'] == 0
+        assert stats['orders_by_priority'] == {'low': 0, 'normal': 1, 'high': 1, 'urgent': 0}
+        assert stats['average_order_value'] == Decimal('20.00')
+        assert stats['completion_rate'] == 0
+
+
+class FakeStreamClient:
+    """Delivers one batch from the ingest stream, then stops the consumer"""
+    
+    def __init__(self, envelopes):
+        self.messages = [(f'1-{index}'.encode(), {b'envelope': json.dumps(envelope).encode()})
+                         for index, envelope in enumerate(envelopes)]
+        self.acked = []
+        self.dead = []
+    
+    def xgroup_create(self, *args, **kwargs):
+        pass
+    
+    def xreadgroup(self, *args, **kwargs):
+        if not self.messages:
+            raise KeyboardInterrupt
+        messages, self.messages = self.messages, []
+        return [(ingest.STREAM.encode(), messages)]
+    
+    def xack(self, stream, group, *message_ids):
+        self.acked.extend(message_ids)
+    
+    def xadd(self, stream, fields):
+        assert stream == ingest.DEAD_LETTER_STREAM
+        self.dead.append(fields)
+
+
+@pytest.mark.orders
+@pytest.mark.unit
+class TestOrderIngest:
+    """Test the order stream consumer"""
+    
+    def _envelope(self, customer, item):
+        return OrderService.prepare_order_envelope(
+            customer.customer_id, [{'item_id': item.item_id, 'quantity': 1, 'unit_price': '1.00'}], user='ingest'
+        )
+    
+    def test_prepare_order_envelope_rejects_duplicate_items(self, db):
+        """Test an order listing the same item twice is rejected before it is queued"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        line = {'item_id': item.item_id, 'quantity': 1, 'unit_price': '1.00'}
+        
+        with pytest.raises(ValueError, match='only once'):
+            OrderService.prepare_order_envelope(customer.customer_id, [line, line])
+    
+    def test_consume_dead_letters_failing_envelope(self, db, monkeypatch):
+        """Test one bad envelope is dead-lettered while the rest of its batch is written"""
+        customer = CustomerFactory()
+        item = ItemFactory()
+        good = [self._envelope(customer, item) for _ in range(2)]
+        bad = self._envelope(customer, item)
+        bad['items'] = bad['items'] * 2
+        client = FakeStreamClient([good[0], bad, good[1]])
+        monkeypatch.setattr(ingest, 'get_client', lambda: client)
+        
+        with pytest.raises(KeyboardInterrupt):
+            ingest.consume('test')
+        
+        assert set(Order.objects.values_list('order_id', flat=True)) == {envelope['order_id'] for envelope in good}
+        assert client.acked == [b'1-0', b'1-1', b'1-2']
+        assert len(client.dead) == 1
+        assert json.loads(client.dead[0]['envelope'])['order_id'] == bad['order_id']
+        assert client.dead[0]['error'].startswith('IntegrityError')
+    
+    def test_consume_dead_letters_order_for_deactivated_customer(self, db, monkeypatch):
+        """Test an accepted order whose customer was deactivated is dead-lettered, not dropped"""
+        customer = CustomerFactory()
+        envelope = self._envelope(customer, ItemFactory())
+        customer.is_active = False
+        customer.save()
+        client = FakeStreamClient([envelope])
+        monkeypatch.setattr(ingest, 'get_client', lambda: client)
+        
+        with pytest.raises(KeyboardInterrupt):
+            ingest.consume('test')
+        
+        assert not Order.objects.exists()
+        assert client.acked == [b'1-0']
+        assert 'no longer active' in client.dead[0]['error']
+    
+    @pytest.mark.api
+    def test_ingest_endpoint_accepts_order(self, admin_client, db):
+        """Test the ingest endpoint is routed and writes the order inline without Redis"""
+        customer = CustomerFactory()
+        line = {'item_id': ItemFactory().item_id, 'quantity': 1, 'unit_price': '1.00'}
+        
+        response = admin_client.post(reverse('order-ingest'), {'customer_id': customer.customer_id, 'items': [line]}, format='json')
+        duplicate = admin_client.post(reverse('order-ingest'), {'customer_id': customer.customer_id, 'items': [line, line]}, format='json')
+        
+        assert response.status_code == 202
+        assert Order.objects.filter(order_id=response.data['order_id']).exists()
+        assert duplicate.status_code == 400
@@ -0,0 +1,63 @@
+"""
+Tests for the orjson renderer
+"""
+import pytest
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from warehouse.renderers import ORJSONRenderer
+
+
+@pytest.mark.unit
+class TestORJSONRenderer:
+    """Test ORJSONRenderer output matches DRF's JSONRenderer"""
+    
+    payload = {
+        'count': 2,
+        'next': None,
+        'results': [
+            {
+                'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+                'name': 'Pallet – “Ünïcode”',
+                'unit_cost': Decimal('12.50'),
+                'weight': 1.25,
+                'is_active': True,
+                'created_at': datetime(2025, 8, 10, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+                'expiry_date': date(2025, 9, 1),
+                'pickup_time': time(9, 30),
+                'status': gettext_lazy('Pending'),
+                'notes': 'line\u2028separator\u2029paragraph',
+                'stock_by_location': {1: 10, 2: 0},
+                'tags': ('fragile', 'perishable'),
+            },
+            {'id': None, 'name': '', 'stock_by_location': {}, 'tags': []},
+        ],
+    }
+    
+    def test_matches_json_renderer(self):
+        """Test a representative payload renders byte for byte like JSONRenderer"""
+        assert ORJSONRenderer().render(self.payload) == JSONRenderer().render(self.payload)
+    
+    def test_indent_from_accept_header(self):
+        """Test an indent in the accepted media type is honoured"""
+        media_type = 'application/json; indent=4'
+        
+        rendered = ORJSONRenderer().render(self.payload, media_type)
+        
+        assert rendered == JSONRenderer().render(self.payload, media_type)
+        assert b'\n    "count": 2' in rendered
+    
+    def test_indent_from_renderer_context(self):
+        """Test an indent in the renderer context is honoured"""
+        context = {'indent': 2}
+        
+        assert ORJSONRenderer().render(self.payload, renderer_context=context) == JSONRenderer().render(
+            self.payload, renderer_context=context
+        )
+    
+    def test_none_renders_empty(self):
+        """Test None renders an empty body"""
+        assert ORJSONRenderer().render(None) == b''
@@ -0,0 +1,212 @@
+"""
+Shipment data migration tests, run against seeded rows on a scratch database
+"""
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.db import DatabaseError
+
+from shipments import models as shipment_models
+
+
+def seed_shipment(apps, alias, index=0, **fields):
+    """Create a shipment and the order and carrier it needs with historical models"""
+    Customer = apps.get_model('orders', 'Customer')
+    Order = apps.get_model('orders', 'Order')
+    Carrier = apps.get_model('shipments', 'Carrier')
+    Shipment = apps.get_model('shipments', 'Shipment')
+    
+    customer, _ = Customer.objects.using(alias).get_or_create(
+        customer_id='CUST-00001', defaults={'name': 'Acme', 'email': 'acme@example.com', 'address': '1 Main St', 'country': 'US'}
+    )
+    carrier, _ = Carrier.objects.using(alias).get_or_create(code='UPS', defaults={'name': 'UPS'})
+    order = Order.objects.using(alias).create(
+        order_id=f"ORD-{index:05d}", customer=customer, total_value=Decimal('10.00')
+    )
+    values = {
+        'shipment_id': f"SHIP-{index:05d}",
+        'tracking_number': f"1Z{index:08d}",
+        'order': order,
+        'carrier': carrier,
+        'shipping_cost': Decimal('12.50'),
+        'weight': Decimal('1.250'),
+        'dimensions': '10x20x30',
+        'origin_address': 'Warehouse 1',
+        'destination_address': '1 Main St',
+        'destination_country': 'US',
+        'destination_postal_code': '10001',
+        **fields,
+    }
+    return Shipment.objects.using(alias).create(**values)
+
+
+@pytest.mark.shipments
+class TestShipmentMigrations:
+    """Test shipment migrations convert existing rows"""
+    
+    def test_integer_choice_codes(self, migrator):
+        """Test status, priority and outcome strings become their integer codes"""
+        apps = migrator.migrate('shipments', '0002_hot_path_indexes')
+        delivered = seed_shipment(apps, migrator.alias, 1, status='delivered', priority='same_day')
+        pending = seed_shipment(apps, migrator.alias, 2)
+        ShipmentStatus = apps.get_model('shipments', 'ShipmentStatus')
+        DeliveryAttempt = apps.get_model('shipments', 'DeliveryAttempt')
+        ShipmentStatus.objects.using(migrator.alias).create(
+            shipment=delivered, from_status='', to_status='picked_up', source='webhook'
+        )
+        ShipmentStatus.objects.using(migrator.alias).create(
+            shipment=delivered, from_status='out_for_delivery', to_status='delivered'
+        )
+        DeliveryAttempt.objects.using(migrator.alias).create(
+            shipment=delivered, attempt_number=1, attempt_date=datetime(2025, 1, 2, tzinfo=dt_timezone.utc),
+            outcome='failed_refused'
+        )
+        
+        apps = migrator.migrate('shipments', '0003_integer_choice_codes')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        ShipmentStatus = apps.get_model('shipments', 'ShipmentStatus')
+        DeliveryAttempt = apps.get_model('shipments', 'DeliveryAttempt')
+        codes = dict(Shipment.objects.using(migrator.alias).values_list('pk', 'status'))
+        assert codes == {delivered.pk: 4, pending.pk: 0}
+        assert Shipment.objects.using(migrator.alias).get(pk=delivered.pk).priority == 3
+        assert set(ShipmentStatus.objects.using(migrator.alias).values_list('from_status', 'to_status', 'source')) == {
+            (None, 1, 2), (3, 4, 0)
+        }
+        assert DeliveryAttempt.objects.using(migrator.alias).get().outcome == 2
+        
+        apps = migrator.migrate('shipments', '0002_hot_path_indexes')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        ShipmentStatus = apps.get_model('shipments', 'ShipmentStatus')
+        assert Shipment.objects.using(migrator.alias).get(pk=delivered.pk).status == 'delivered'
+        assert Shipment.objects.using(migrator.alias).get(pk=delivered.pk).priority == 'same_day'
+        assert set(ShipmentStatus.objects.using(migrator.alias).values_list('from_status', 'to_status')) == {
+            ('', 'picked_up'), ('out_for_delivery', 'delivered')
+        }
+    
+    def test_partition_status_history_round_trip(self, migrator):
+        """Test existing status rows survive partitioning and unpartitioning"""
+        apps = migrator.migrate('shipments', '0002_hot_path_indexes')
+        shipment = seed_shipment(apps, migrator.alias, 1)
+        ShipmentStatus = apps.get_model('shipments', 'ShipmentStatus')
+        for day, to_status in [(datetime(2025, 8, 10), 'picked_up'), (datetime(2025, 9, 3), 'in_transit')]:
+            status = ShipmentStatus.objects.using(migrator.alias).create(shipment=shipment, to_status=to_status)
+            ShipmentStatus.objects.using(migrator.alias).filter(pk=status.pk).update(
+                timestamp=day.replace(tzinfo=dt_timezone.utc)
+            )
+        
+        migrator.migrate('shipments', '0009_partition_shipment_status_history')
+        
+        assert migrator.execute(
+            "SELECT tableoid::regclass::text, to_status FROM shipment_status_history ORDER BY timestamp"
+        ) == [('shipment_status_history_y2025m08', 1), ('shipment_status_history_y2025m09', 2)]
+        
+        migrator.migrate('shipments', '0008_shipment_tracking_hash_index')
+        
+        assert migrator.execute("SELECT relkind FROM pg_class WHERE relname = 'shipment_status_history'") == [('r',)]
+        assert migrator.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'shipment_status_history'::regclass AND contype = 'p'"
+        ) == [('shipment_status_history_pkey',)]
+        assert migrator.execute("SELECT pg_get_serial_sequence('shipment_status_history', 'id')") == [
+            ('public.shipment_status_history_id_seq',)
+        ]
+        assert migrator.execute("SELECT count(*) FROM shipment_status_history") == [(2,)]
+        
+        migrator.migrate('shipments', '0009_partition_shipment_status_history')
+        
+        assert migrator.execute("SELECT count(*) FROM shipment_status_history_y2025m08") == [(1,)]
+    
+    def test_dimension_columns(self, migrator):
+        """Test LxWxH text with spaces, units and large values splits into columns"""
+        apps = migrator.migrate('shipments', '0005_shipment_active_partial_indexes')
+        plain = seed_shipment(apps, migrator.alias, 1, dimensions='10x20x30')
+        with_unit = seed_shipment(apps, migrator.alias, 2, dimensions='10.5 X 20 x 30 cm')
+        container = seed_shipment(apps, migrator.alias, 3, dimensions='12000x240x260.125')
+        
+        apps = migrator.migrate('shipments', '0006_shipment_dimension_columns')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        dimensions = {
+            pk: (length, width, height)
+            for pk, length, width, height in Shipment.objects.using(migrator.alias).values_list(
+                'pk', 'length_cm', 'width_cm', 'height_cm'
+            )
+        }
+        assert dimensions == {
+            plain.pk: (Decimal('10.00'), Decimal('20.00'), Decimal('30.00')),
+            with_unit.pk: (Decimal('10.50'), Decimal('20.00'), Decimal('30.00')),
+            container.pk: (Decimal('12000.00'), Decimal('240.00'), Decimal('260.13')),
+        }
+        assert Shipment.objects.using(migrator.alias).get(pk=container.pk).volume_cm3 == Decimal('749174400')
+        
+        apps = migrator.migrate('shipments', '0005_shipment_active_partial_indexes')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        assert dict(Shipment.objects.using(migrator.alias).values_list('pk', 'dimensions')) == {
+            plain.pk: '10.00x20.00x30.00',
+            with_unit.pk: '10.50x20.00x30.00',
+            container.pk: '12000.00x240.00x260.13',
+        }
+    
+    def test_dimension_columns_reject_unparseable_rows(self, migrator):
+        """Test text that is not LxWxH stops the migration instead of being dropped"""
+        apps = migrator.migrate('shipments', '0005_shipment_active_partial_indexes')
+        seed_shipment(apps, migrator.alias, 1)
+        broken = seed_shipment(apps, migrator.alias, 2, dimensions='large box')
+        
+        with pytest.raises(DatabaseError, match=f"{broken.pk} 'large box'"):
+            migrator.migrate('shipments', '0006_shipment_dimension_columns')
+    
+    def test_integer_money_and_weight(self, migrator):
+        """Test money becomes cents and weight grams, and converts back unchanged"""
+        apps = migrator.migrate('shipments', '0002_hot_path_indexes')
+        shipment = seed_shipment(
+            apps, migrator.alias, 1,
+            shipping_cost=Decimal('12.55'), insurance_value=Decimal('1999.99'), weight=Decimal('0.125')
+        )
+        
+        apps = migrator.migrate('shipments', '0007_shipment_integer_money_and_weight')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        assert Shipment.objects.using(migrator.alias).filter(pk=shipment.pk).values(
+            'shipping_cost_cents', 'insurance_value_cents', 'weight_g'
+        ).get() == {'shipping_cost_cents': 1255, 'insurance_value_cents': 199999, 'weight_g': 125}
+        
+        apps = migrator.migrate('shipments', '0006_shipment_dimension_columns')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        assert Shipment.objects.using(migrator.alias).filter(pk=shipment.pk).values(
+            'shipping_cost', 'insurance_value', 'weight'
+        ).get() == {'shipping_cost': Decimal('12.55'), 'insurance_value': Decimal('1999.99'), 'weight': Decimal('0.125')}
+    
+    def test_shipment_addresses(self, migrator):
+        """Test address text moves to shared rows hashed like Address.compute_hash"""
+        apps = migrator.migrate('shipments', '0002_hot_path_indexes')
+        first = seed_shipment(apps, migrator.alias, 1)
+        second = seed_shipment(
+            apps, migrator.alias, 2, destination_address='Straße 5, München',
+            destination_country='DE', destination_postal_code='80331'
+        )
+        
+        apps = migrator.migrate('shipments', '0012_shipment_addresses')
+        
+        Address = apps.get_model('shipments', 'Address')
+        Shipment = apps.get_model('shipments', 'Shipment')
+        addresses = {
+            bytes(address.hash): (address.full_text, address.country, address.postal_code)
+            for address in Address.objects.using(migrator.alias).all()
+        }
+        assert addresses == {
+            shipment_models.Address.compute_hash('Warehouse 1'): ('Warehouse 1', '', ''),
+            shipment_models.Address.compute_hash('1 Main St', 'US', '10001'): ('1 Main St', 'US', '10001'),
+            shipment_models.Address.compute_hash('Straße 5, München', 'DE', '80331'): ('Straße 5, München', 'DE', '80331'),
+        }
+        shipments = Shipment.objects.using(migrator.alias).select_related('origin_address', 'destination_address')
+        assert shipments.get(pk=first.pk).origin_address_id == shipments.get(pk=second.pk).origin_address_id
+        assert shipments.get(pk=second.pk).destination_address.full_text == 'Straße 5, München'
+        
+        apps = migrator.migrate('shipments', '0011_shipment_is_in_transit_db')
+        
+        Shipment = apps.get_model('shipments', 'Shipment')
+        assert Shipment.objects.using(migrator.alias).get(pk=second.pk).destination_address == 'Straße 5, München'
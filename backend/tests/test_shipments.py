@@ -0,0 +1,178 @@
+"""
+Tests for shipment models
+"""
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+
+from orders.models import OrderItem
+from shipments.models import Carrier, DeliveryAttempt, Shipment, ShipmentItem, ShipmentStatus
+from tests.factories import CarrierFactory, ItemFactory, ShipmentFactory
+
+
+@pytest.mark.django_db
+@pytest.mark.shipments
+class TestStatusPartitions:
+    """Test monthly status history partitions"""
+    
+    def _partition_of(self, status):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM shipment_status_history WHERE id = %s", [status.pk])
+            return cursor.fetchone()[0]
+    
+    def test_create_partitions_moves_rows_from_default(self):
+        """Test rows held by the default partition move into a new month's partition"""
+        month = (timezone.now() + timedelta(days=31 * 5)).replace(day=15)
+        status = ShipmentStatus.objects.create(
+            shipment=ShipmentFactory(), to_status=Shipment.Status.PICKED_UP, timestamp=month
+        )
+        assert self._partition_of(status) == 'shipment_status_history_default'
+        
+        created = ShipmentStatus.create_partitions(months_ahead=6)
+        
+        partition = f"shipment_status_history_y{month:%Y}m{month:%m}"
+        assert partition in created
+        assert self._partition_of(status) == partition
+    
+    def test_create_partitions_is_idempotent(self):
+        """Test existing partitions are left alone"""
+        ShipmentStatus.create_partitions(months_ahead=3)
+        
+        assert ShipmentStatus.create_partitions(months_ahead=3) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.shipments
+class TestShipmentStatusManager:
+    """Test bulk status recording and timeline reads"""
+    
+    def test_bulk_record_keeps_event_timestamps(self):
+        """Test events are written in bulk with the time they arrived"""
+        shipment = ShipmentFactory()
+        arrived = timezone.now() - timedelta(minutes=5)
+        
+        ShipmentStatus.objects.bulk_record([
+            {'shipment': shipment, 'to_status': Shipment.Status.PICKED_UP, 'timestamp': arrived},
+            {
+                'shipment': shipment, 'from_status': Shipment.Status.PICKED_UP,
+                'to_status': Shipment.Status.IN_TRANSIT, 'source': ShipmentStatus.Source.WEBHOOK,
+                'timestamp': arrived + timedelta(minutes=1)
+            },
+        ])
+        
+        statuses = list(ShipmentStatus.objects.filter(shipment=shipment).order_by('timestamp'))
+        assert [status.to_status for status in statuses] == [Shipment.Status.PICKED_UP, Shipment.Status.IN_TRANSIT]
+        assert statuses[0].timestamp == arrived
+        assert statuses[1].source == ShipmentStatus.Source.WEBHOOK
+    
+    def test_for_shipments_reads_timelines_newest_first(self, django_assert_num_queries):
+        """Test several shipments' timelines load in one query, newest first per shipment"""
+        first, second = ShipmentFactory.create_batch(2)
+        now = timezone.now()
+        ShipmentStatus.objects.bulk_record([
+            {'shipment': shipment, 'to_status': to_status, 'timestamp': now + timedelta(minutes=minutes)}
+            for shipment in (first, second)
+            for minutes, to_status in [(0, Shipment.Status.PICKED_UP), (1, Shipment.Status.IN_TRANSIT)]
+        ])
+        
+        with django_assert_num_queries(1):
+            timeline = [
+                (status.shipment_id, status.to_status)
+                for status in ShipmentStatus.objects.for_shipments([first.pk, second.pk])
+            ]
+        
+        assert timeline == [
+            (first.pk, Shipment.Status.IN_TRANSIT), (first.pk, Shipment.Status.PICKED_UP),
+            (second.pk, Shipment.Status.IN_TRANSIT), (second.pk, Shipment.Status.PICKED_UP),
+        ]
+
+
+@pytest.mark.shipments
+@pytest.mark.unit
+class TestCarrierTrackingUrl:
+    """Test tracking URLs match str.format on the carrier's template"""
+    
+    @pytest.mark.parametrize('template', [
+        'https://track.example.com/?n={tracking_number}',
+        'https://track.example.com/{tracking_number}/{tracking_number}',
+        '{tracking_number}',
+        'https://track.example.com/?q={{"n": "{tracking_number}"}}',
+        'https://track.example.com/{tracking_number:>12}',
+        'https://track.example.com/{tracking_number!r}',
+    ])
+    def test_matches_str_format(self, template):
+        """Test the specialised formatter renders like str.format"""
+        carrier = Carrier(code='UPS', name='UPS', tracking_url_template=template)
+        
+        assert carrier.get_tracking_url('1Z999') == template.format(tracking_number='1Z999')
+    
+    def test_no_template_or_number(self):
+        """Test no URL is built without a template or a tracking number"""
+        assert Carrier(code='UPS', tracking_url_template='').get_tracking_url('1Z999') is None
+        assert Carrier(code='UPS', tracking_url_template='{tracking_number}').get_tracking_url('') is None
+    
+    def test_save_rebuilds_formatter(self, db):
+        """Test saving a new template replaces the cached formatter"""
+        carrier = CarrierFactory(tracking_url_template='https://old.example.com/{tracking_number}')
+        assert carrier.get_tracking_url('1Z999') == 'https://old.example.com/1Z999'
+        
+        carrier.tracking_url_template = 'https://new.example.com/{tracking_number}'
+        carrier.save()
+        
+        assert carrier.get_tracking_url('1Z999') == 'https://new.example.com/1Z999'
+    
+    def test_get_cached_cleared_on_save(self, db):
+        """Test cached carriers are reloaded after a carrier is saved"""
+        carrier = CarrierFactory(name='Old name')
+        assert Carrier.get_cached(carrier.pk).name == 'Old name'
+        
+        carrier.name = 'New name'
+        carrier.save()
+        
+        assert Carrier.get_cached(carrier.pk).name == 'New name'
+
+
+@pytest.mark.django_db
+@pytest.mark.shipments
+class TestShipmentBulkWrites:
+    """Test batched shipment item and delivery attempt writes"""
+    
+    def test_bulk_attach_skips_attached_items(self, django_assert_num_queries):
+        """Test items are attached in one INSERT and items already on the shipment are unchanged"""
+        shipment = ShipmentFactory()
+        first, second = [
+            OrderItem.objects.create(order=shipment.order, item=ItemFactory(), quantity=5, unit_price='2.00')
+            for _ in range(2)
+        ]
+        ShipmentItem.objects.bulk_attach(shipment, [(first, 3)])
+        
+        with django_assert_num_queries(1):
+            ShipmentItem.objects.bulk_attach(shipment, [(first, 5), (second, 2)])
+        
+        quantities = dict(shipment.shipment_items.values_list('order_item_id', 'quantity_shipped'))
+        assert quantities == {first.pk: 3, second.pk: 2}
+    
+    def test_bulk_import_skips_recorded_attempts(self):
+        """Test attempts already recorded for a shipment are skipped"""
+        shipment = ShipmentFactory()
+        now = timezone.now()
+        DeliveryAttempt.objects.create(
+            shipment=shipment, attempt_number=1, attempt_date=now, outcome=DeliveryAttempt.Outcome.FAILED_NO_ONE_HOME
+        )
+        
+        DeliveryAttempt.objects.bulk_import([
+            {
+                'shipment': shipment, 'attempt_number': 1, 'attempt_date': now,
+                'outcome': DeliveryAttempt.Outcome.SUCCESSFUL
+            },
+            {
+                'shipment': shipment, 'attempt_number': 2, 'attempt_date': now + timedelta(days=1),
+                'outcome': DeliveryAttempt.Outcome.SUCCESSFUL
+            },
+        ])
+        
+        outcomes = list(shipment.delivery_attempts.values_list('attempt_number', 'outcome'))
+        assert outcomes == [
+            (1, DeliveryAttempt.Outcome.FAILED_NO_ONE_HOME), (2, DeliveryAttempt.Outcome.SUCCESSFUL)
+        ]
@@ -0,0 +1,19 @@
+from django.core.cache import cache
+
+
+def _version_key(model):
+    return f"{model._meta.label_lower}:list-version"
+
+
+def get_list_cache_version(model):
+    """Current version of the cached list responses for a model"""
+    return cache.get_or_set(_version_key(model), 1, timeout=None)
+
+
+def bump_list_cache_version(model):
+    """Invalidate every cached list response for a model at once"""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,16 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import exception_handler, set_rollback
+
+
+def custom_exception_handler(exc, context):
+    """
+    Return service layer ValueErrors (invalid transitions, insufficient stock,
+    ...) as 400 {'error': ...} responses and leave everything else to DRF,
+    so unexpected errors are no longer reported as bad requests.
+    """
+    if isinstance(exc, ValueError):
+        set_rollback()
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return exception_handler(exc, context)
@@ -0,0 +1,114 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import get_list_cache_version
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with 304 Not Modified while the client's
+    ETag still matches.
+    The ETag is derived from a single aggregate query over the filtered
+    queryset, so unchanged responses are never serialized.
+    """
+    etag_aggregates = {
+        'last_modified': Max('updated_at'),
+        'row_count': Count('pk'),
+    }
+    # Models serialized alongside the rows that have no updated_at; their
+    # list cache version, bumped on every save and delete, joins the ETag
+    etag_versioned_models = ()
+    
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            self.filter_queryset(self.get_queryset()), super().list, request, *args, **kwargs
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return self._conditional_response(queryset, super().retrieve, request, *args, **kwargs)
+    
+    def get_etag(self, request, queryset):
+        """Hash the request path together with the queryset's change markers"""
+        state = queryset.order_by().aggregate(**self.etag_aggregates)
+        versions = [get_list_cache_version(model) for model in self.etag_versioned_models]
+        fingerprint = f"{request.get_full_path()}|{sorted(state.items())}|{versions}"
+        return quote_etag(hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest())
+    
+    def _conditional_response(self, queryset, handler, request, *args, **kwargs):
+        etag = self.get_etag(request, queryset)
+        
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        
+        response['ETag'] = etag
+        return response
+
+
+class QueryParamFilterMixin:
+    """
+    Apply query parameter filters with a single queryset.filter() call.
+    filter_map maps query parameter names to ORM lookups; parameters listed
+    in boolean_filter_params match when their value is 'true'.
+    """
+    filter_map = {}
+    boolean_filter_params = ()
+    
+    def filter_by_query_params(self, queryset):
+        params = self.request.query_params
+        if not params:
+            return queryset
+        
+        filters = {}
+        
+        for param, lookup in self.filter_map.items():
+            value = params.get(param)
+            if param in self.boolean_filter_params:
+                if value is not None:
+                    filters[lookup] = value.lower() == 'true'
+            elif value:
+                filters[lookup] = value
+        
+        return queryset.filter(**filters) if filters else queryset
+
+
+class CachedListMixin:
+    """
+    Serve list responses from the cache under a versioned key per model.
+    Saving or deleting a row bumps the model's version (see warehouse.cache),
+    which retires every cached page at once. Only for models that are
+    changed through save()/delete(), since queryset updates send no signals.
+    """
+    list_cache_timeout = 3600
+    
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        key = f"{model._meta.label_lower}:v{get_list_cache_version(model)}:{request.get_full_path()}"
+        
+        cached = cache.get(key)
+        if cached is not None:
+            data, etag = cached
+            if etag:
+                not_modified = get_conditional_response(request._request, etag=etag)
+                if not_modified is not None:
+                    not_modified['ETag'] = etag
+                    return not_modified
+            response = Response(data)
+        else:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = response.get('ETag')
+            cache.set(key, (response.data, etag), self.list_cache_timeout)
+        
+        if etag:
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class MovementCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the inventory movement log.
+    Each page is a bounded range scan on (timestamp, id) instead of an
+    OFFSET that grows with page depth.
+    """
+    ordering = ('-timestamp', '-id')
+    page_size = 50
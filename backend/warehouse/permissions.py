@@ -1,6 +1,23 @@
 from rest_framework.permissions import BasePermission
 
 
+def get_group_names(user):
+    """
+    Names of the user's groups. Loaded with one query and cached on the user
+    instance, so every permission check and view in a request shares it.
+    """
+    try:
+        return user._group_names
+    except AttributeError:
+        pass
+    
+    if hasattr(user, 'groups'):
+        user._group_names = frozenset(user.groups.values_list('name', flat=True))
+    else:
+        user._group_names = frozenset()
+    return user._group_names
+
+
 class IsAdmin(BasePermission):
     """
     Permission for admin users only.
@@ -12,10 +29,7 @@ class IsAdmin(BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        return request.user.is_superuser or (
-            hasattr(request.user, 'groups') and 
-            request.user.groups.filter(name='admin').exists()
-        )
+        return request.user.is_superuser or 'admin' in get_group_names(request.user)
 
 
 class IsWorker(BasePermission):
@@ -29,10 +43,7 @@ class IsWorker(BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        return request.user.is_superuser or (
-            hasattr(request.user, 'groups') and 
-            request.user.groups.filter(name__in=['admin', 'worker']).exists()
-        )
+        return request.user.is_superuser or not get_group_names(request.user).isdisjoint(('admin', 'worker'))
 
 
 class IsAdminOrWorker(BasePermission):
@@ -45,10 +56,7 @@ class IsAdminOrWorker(BasePermission):
         if not request.user.is_authenticated:
             return False
         
-        return request.user.is_superuser or (
-            hasattr(request.user, 'groups') and 
-            request.user.groups.filter(name__in=['admin', 'worker']).exists()
-        )
+        return request.user.is_superuser or not get_group_names(request.user).isdisjoint(('admin', 'worker'))
 
 
 class IsAdminOrReadOnly(BasePermission):
@@ -67,10 +75,7 @@ class IsAdminOrReadOnly(BasePermission):
             return True
         
         # Write access only for admins
-        return request.user.is_superuser or (
-            hasattr(request.user, 'groups') and 
-            request.user.groups.filter(name='admin').exists()
-        )
+        return request.user.is_superuser or 'admin' in get_group_names(request.user)
 
 
 class IsWorkerOrReadOnly(BasePermission):
@@ -89,7 +94,4 @@ class IsWorkerOrReadOnly(BasePermission):
             return True
         
         # Write access for workers and admins
-        return request.user.is_superuser or (
-            hasattr(request.user, 'groups') and 
-            request.user.groups.filter(name__in=['admin', 'worker']).exists()
-        )
\ No newline at end of file
+        return request.user.is_superuser or not get_group_names(request.user).isdisjoint(('admin', 'worker'))
\ No newline at end of file
@@ -0,0 +1,27 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+    Datetimes and types orjson does not handle natively (Decimal, lazy
+    strings, querysets) go through DRF's own encoder, so the output matches
+    JSONRenderer. Indented output, requested through the Accept header or
+    renderer_context, is left to JSONRenderer since orjson only indents by
+    two spaces.
+    """
+    _encoder = JSONEncoder()
+    _options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(data, default=self._encoder.default, option=self._options)
+        # Like JSONRenderer, escape the separators that are invalid in JavaScript
+        # string literals, so the output can be embedded in a script tag
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
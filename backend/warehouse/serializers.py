@@ -0,0 +1,19 @@
+import copy
+
+
+class CachedFieldsMixin:
+    """
+    Build a serializer class's fields once per process.
+    ModelSerializer.get_fields() introspects the model and constructs every
+    field on each instantiation; instead the first result is kept per class
+    and each instance binds its own shallow copies of those fields.
+    Only use on serializers whose fields do not depend on context.
+    """
+    _fields_cache = {}
+    
+    def get_fields(self):
+        cls = type(self)
+        fields = CachedFieldsMixin._fields_cache.get(cls)
+        if fields is None:
+            fields = CachedFieldsMixin._fields_cache[cls] = super().get_fields()
+        return {name: copy.copy(field) for name, field in fields.items()}